@@ -0,0 +1,131 @@
+"""Advanced player metrics computed from the per-game table and the team totals of the same season.
+
+``team_context`` turns a season's ``totals-team`` (and, when present, ``totals-opponent``)
+table into one row per team with its possessions, pace and minutes, plus the league-wide
+constants PER needs. ``advanced_stats`` joins that onto the player rows by season and
+team (``Tm`` = ``team_id``) and computes every metric column at once with NumPy, so the
+whole 1950-2023 history is one call. Both take frames with a ``Season`` column for many
+seasons, or without one for a single season.
+
+Formulas follow Basketball-Reference's glossary: possessions are estimated as
+``FGA + 0.44 * FTA - ORB + TOV`` (averaged with the opponents' when their totals exist)
+and PER is Hollinger's, adjusted for pace and scaled so the league average is 15. A metric
+is NaN when a statistic it needs was not recorded that season (e.g. turnovers before 1978).
+"""
+import numpy as np
+import pandas as pd
+
+
+PER36_STATS = ['PTS', 'TRB', 'AST', 'STL', 'BLK', 'TOV']
+PER100_STATS = ['PTS', 'TRB', 'AST']
+ADVANCED_COLUMNS = (['TS%'] + [stat + '/36' for stat in PER36_STATS] + [stat + '/100' for stat in PER100_STATS]
+                    + ['USG%', 'PER'])
+
+# Team totals read for the context; anything missing is treated as not recorded
+TEAM_COLUMNS = ['G', 'MP', 'FG', 'FGA', 'FT', 'FTA', 'ORB', 'TRB', 'AST', 'TOV', 'PF', 'PTS']
+
+# Minutes a team plays per game without overtime, for seasons whose totals have no MP
+REGULATION_MINUTES = 240.0
+
+
+def _numeric(frame, columns):
+    return {c: pd.to_numeric(frame[c], errors='coerce').to_numpy(dtype=float) if c in frame
+            else np.full(len(frame), np.nan) for c in columns}
+
+
+def _possessions(t):
+    return t['FGA'] + 0.44 * t['FTA'] - t['ORB'] + t['TOV']
+
+
+def team_context(totals, opponent_totals=None):
+    """One row per team (and season) with per-game team figures and the league's PER constants."""
+    keys = ['Season', 'team_id'] if 'Season' in totals else ['team_id']
+    if 'team_id' not in totals or not len(totals):
+        return pd.DataFrame(columns=keys)
+    totals = totals.dropna(subset=['team_id']).drop_duplicates(keys)
+    t = _numeric(totals, TEAM_COLUMNS)
+    games = np.where(t['G'] > 0, t['G'], np.nan)
+    possessions = _possessions(t) / games
+    if opponent_totals is not None and len(opponent_totals) and 'team_id' in opponent_totals:
+        opponents = totals[keys].merge(opponent_totals.drop_duplicates(keys), on=keys, how='left')
+        o = _numeric(opponents, TEAM_COLUMNS)
+        opponent_possessions = _possessions(o) / np.where(o['G'] > 0, o['G'], np.nan)
+        possessions = np.where(np.isnan(opponent_possessions), possessions, (possessions + opponent_possessions) / 2)
+    minutes = np.where(np.isnan(t['MP']), REGULATION_MINUTES * games, t['MP']) / games
+    pace = 48 * possessions / (minutes / 5)
+
+    # League constants: sums of every team's totals in the season
+    season = totals['Season'].to_numpy() if 'Season' in totals else np.zeros(len(totals))
+    codes, _ = pd.factorize(season)
+
+    def league(values):
+        return np.bincount(codes, weights=values)[codes]
+
+    lg = {c: league(t[c]) for c in ['FG', 'FGA', 'FT', 'FTA', 'ORB', 'TRB', 'AST', 'TOV', 'PF', 'PTS']}
+    # Seasons before turnovers were recorded (1978) have no pace at all: their league pace is NaN, not a warning
+    with np.errstate(divide='ignore', invalid='ignore'):
+        lg_pace = np.bincount(codes, weights=np.nan_to_num(pace))[codes] / np.bincount(codes, weights=~np.isnan(pace))[codes]
+    context = totals[keys].reset_index(drop=True).assign(
+        t_MP=minutes, t_FG=t['FG'] / games, t_AST=t['AST'] / games,
+        t_FGA=t['FGA'] / games, t_FTA=t['FTA'] / games, t_TOV=t['TOV'] / games,
+        t_Poss=possessions, t_Pace=pace,
+        lg_Pace=lg_pace,
+        lg_factor=2 / 3 - (0.5 * lg['AST'] / lg['FG']) / (2 * lg['FG'] / lg['FT']),
+        lg_VOP=lg['PTS'] / (lg['FGA'] - lg['ORB'] + lg['TOV'] + 0.44 * lg['FTA']),
+        lg_DRBp=(lg['TRB'] - lg['ORB']) / lg['TRB'],
+        lg_FT_PF=lg['FT'] / lg['PF'], lg_FTA_PF=lg['FTA'] / lg['PF'],
+    )
+    return context
+
+
+def advanced_stats(players, context):
+    """``ADVANCED_COLUMNS`` for every row of ``players`` as float32, on the same index."""
+    keys = ['Season', 'team_id'] if 'Season' in players and 'Season' in context else ['team_id']
+    rows = players[keys[:-1] + ['Tm']].rename(columns={'Tm': 'team_id'})
+    rows['team_id'] = rows['team_id'].astype(str)
+    if len(context):
+        context = context.assign(team_id=context['team_id'].astype(str))
+        if 'Season' in keys:
+            rows['Season'] = rows['Season'].astype('int64')
+            context = context.assign(Season=context['Season'].astype('int64'))
+    merged = rows.merge(context, on=keys, how='left') if len(context) else rows
+    t = _numeric(merged, ['t_MP', 't_FG', 't_AST', 't_FGA', 't_FTA', 't_TOV', 't_Poss', 't_Pace', 'lg_Pace',
+                          'lg_factor', 'lg_VOP', 'lg_DRBp', 'lg_FT_PF', 'lg_FTA_PF'])
+    p = _numeric(players, ['G', 'MP', 'FG', 'FGA', '3P', 'FT', 'FTA', 'ORB', 'TRB', 'AST', 'STL', 'BLK', 'TOV', 'PF',
+                           'PTS'])
+    out = {}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out['TS%'] = p['PTS'] / (2 * (p['FGA'] + 0.44 * p['FTA']))
+        for stat in PER36_STATS:
+            out[stat + '/36'] = p[stat] * 36 / p['MP']
+        # A player's share of the team's possessions is taken as their share of its minutes, five on the floor
+        player_possessions = t['t_Poss'] * p['MP'] / (t['t_MP'] / 5)
+        for stat in PER100_STATS:
+            out[stat + '/100'] = p[stat] * 100 / player_possessions
+        out['USG%'] = (100 * (p['FGA'] + 0.44 * p['FTA'] + p['TOV']) * (t['t_MP'] / 5)
+                       / (p['MP'] * (t['t_FGA'] + 0.44 * t['t_FTA'] + t['t_TOV'])))
+
+        # Hollinger's unadjusted PER, per minute; per-game inputs give the same ratios as totals
+        team_assist_rate = t['t_AST'] / t['t_FG']
+        vop, drbp = t['lg_VOP'], t['lg_DRBp']
+        uper = (p['3P'] + 2 / 3 * p['AST']
+                + (2 - t['lg_factor'] * team_assist_rate) * p['FG']
+                + p['FT'] * 0.5 * (1 + (1 - team_assist_rate) + 2 / 3 * team_assist_rate)
+                - vop * p['TOV']
+                - vop * drbp * (p['FGA'] - p['FG'])
+                - vop * 0.44 * (0.44 + 0.56 * drbp) * (p['FTA'] - p['FT'])
+                + vop * (1 - drbp) * (p['TRB'] - p['ORB'])
+                + vop * drbp * p['ORB']
+                + vop * p['STL']
+                + vop * drbp * p['BLK']
+                - p['PF'] * (t['lg_FT_PF'] - 0.44 * t['lg_FTA_PF'] * vop)) / p['MP']
+        aper = uper * t['lg_Pace'] / t['t_Pace']
+        # Scaled so the minutes-weighted league average is 15 in every season
+        season = players['Season'].to_numpy() if 'Season' in players else np.zeros(len(players))
+        codes, _ = pd.factorize(season)
+        weights = np.where(np.isnan(aper), 0.0, np.nan_to_num(p['MP'] * p['G']))
+        league_aper = (np.bincount(codes, weights=np.where(weights > 0, aper, 0.0) * weights)
+                       / np.bincount(codes, weights=weights))[codes]
+        out['PER'] = aper * 15 / league_aper
+    stats = pd.DataFrame(out, index=players.index, columns=ADVANCED_COLUMNS).astype('float32')
+    return stats.where(np.isfinite(stats))
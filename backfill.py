@@ -0,0 +1,109 @@
+"""Bulk-ingest every season into the local season cache so the app starts warm.
+
+    python backfill.py                      # all seasons, 1950-2023
+    python backfill.py --start 2000 --workers 2 --rate 0.5
+    NBA_BASE_URL=http://127.0.0.1:8765 python backfill.py   # against bench/standin.py
+
+Completed seasons are recorded in a checkpoint file, so an interrupted run picks
+up where it stopped. Use --force to scrape every season again, ignoring both the
+checkpoint and the seasons already in the season cache.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import http_client
+import settings
+from nba_data import expire_season, load_data, load_league_tables, memory_usage_mb
+from player_store import player_store
+from shared_dataset import shared_dataset
+from season_cache import atomic_write
+
+
+FIRST_SEASON = 1950
+LAST_SEASON = 2023
+
+
+class Checkpoint:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path) as fh:
+                self.done = set(json.load(fh)["done"])
+        except (OSError, ValueError, KeyError):
+            self.done = set()
+
+    def mark(self, year):
+        with self._lock:
+            self.done.add(year)
+            atomic_write(self.path, json.dumps({"done": sorted(self.done)}).encode())
+
+
+def ingest_season(year):
+    # Page requests are paced by http_client's process-wide rate limiter; cached seasons cost none
+    players = load_data(year)
+    league = load_league_tables(year)
+    return len(players), len(league.totals), memory_usage_mb(players)
+
+
+def backfill(seasons, workers=4, rate=1.0, checkpoint_path=None, force=False, out=sys.stdout):
+    checkpoint = Checkpoint(checkpoint_path or os.path.join(settings.CACHE_DIR, "backfill-checkpoint.json"))
+    pending = [year for year in seasons if force or year not in checkpoint.done]
+    skipped = len(seasons) - len(pending)
+    if skipped:
+        print(f"Resuming: {skipped} season(s) already ingested", file=out)
+    if force:
+        # Stored copies stay as the fallback should a page fail to load
+        for year in pending:
+            expire_season(year)
+    http_client.rate_limiter.configure(rate)
+    failed = {}
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(ingest_season, year): year for year in pending}
+        for done, future in enumerate(as_completed(futures), 1):
+            year = futures[future]
+            try:
+                players, teams, memory = future.result()
+            except Exception as exc:
+                failed[year] = repr(exc)
+                print(f"[{done}/{len(pending)}] {year} FAILED: {exc!r}", file=out)
+                continue
+            checkpoint.mark(year)
+            print(f"[{done}/{len(pending)}] {year}: {players} players ({memory:.2f} MB), {teams} teams "
+                  f"({time.monotonic() - started:.1f}s elapsed)", file=out)
+    # Publish once at the end rather than after every season, and swap running apps over to it
+    shared_dataset.publish()
+    version, history = shared_dataset.snapshot()
+    if history is not None:
+        print(f"Store: {len(player_store.seasons())} seasons, {history.num_rows} player-seasons, "
+              f"{history.nbytes / 2 ** 20:.1f} MB shared dataset (version {version})", file=out)
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-ingest NBA seasons into the local season cache.")
+    parser.add_argument("--start", type=int, default=FIRST_SEASON)
+    parser.add_argument("--end", type=int, default=LAST_SEASON)
+    parser.add_argument("--workers", type=int, default=4, help="concurrent season downloads")
+    parser.add_argument("--rate", type=float, default=1.0, help="maximum page requests per second, across all workers")
+    parser.add_argument("--base-url", help="scrape from this host instead of basketball-reference")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: inside NBA_CACHE_DIR)")
+    parser.add_argument("--force", action="store_true", help="scrape every season again, ignoring the checkpoint and the season cache")
+    args = parser.parse_args(argv)
+    if args.base_url:
+        settings.BASE_URL = args.base_url.rstrip("/")
+    failed = backfill(range(args.start, args.end + 1), args.workers, args.rate, args.checkpoint, args.force)
+    if failed:
+        print(f"{len(failed)} season(s) failed: {sorted(failed)}; rerun to retry them", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
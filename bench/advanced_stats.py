@@ -0,0 +1,164 @@
+"""Check the advanced metrics against hand-computed values and time them over a full history.
+
+    python -m bench.advanced_stats
+    python -m bench.advanced_stats --seasons 74 --players 500 --budget-ms 1000
+
+A two-team league with round numbers is checked against values worked out by hand (the
+working is next to each number). PER has too many terms for that, so it is checked against
+a row-by-row implementation of Hollinger's formula and for a minutes-weighted league
+average of exactly 15. The timing runs ``team_context`` and ``advanced_stats`` once over a
+generated history the size of 1950-2023. Exits non-zero when a check fails or the run is
+over budget.
+"""
+import argparse
+import math
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from advanced_stats import advanced_stats, team_context
+
+
+TEAMS = pd.DataFrame([
+    # Per game: MP 240, FGA 90, FTA 25, ORB 10, TOV 15 -> 106 possessions, pace 106
+    dict(team_id='AAA', G=10, MP=2400, FG=400, FGA=900, FT=200, FTA=250, ORB=100, TRB=450, AST=250, TOV=150, PF=200, PTS=1100),
+    # Per game: MP 242.5, FGA 85, FTA 22.5, ORB 12, TOV 17 -> 99.9 possessions
+    dict(team_id='BBB', G=10, MP=2425, FG=380, FGA=850, FT=180, FTA=225, ORB=120, TRB=420, AST=200, TOV=170, PF=210, PTS=1020),
+])
+
+PLAYERS = pd.DataFrame([
+    dict(Player='One', Tm='AAA', G=10, MP=30.0, FG=8.0, FGA=16.0, **{'3P': 2.0}, FT=4.0, FTA=5.0, ORB=1.0, TRB=6.0,
+         AST=5.0, STL=1.0, BLK=1.0, TOV=2.0, PF=3.0, PTS=22.0),
+    dict(Player='Two', Tm='BBB', G=8, MP=20.0, FG=3.0, FGA=8.0, **{'3P': 0.0}, FT=2.0, FTA=4.0, ORB=2.0, TRB=5.0,
+         AST=1.0, STL=0.5, BLK=0.5, TOV=1.0, PF=2.0, PTS=8.0),
+])
+
+EXPECTED = {
+    'One': {
+        'TS%': 22 / 36.4,            # 22 / (2 * (16 + 0.44 * 5))
+        'PTS/36': 26.4,              # 22 * 36 / 30
+        'AST/36': 6.0,               # 5 * 36 / 30
+        'TOV/36': 2.4,               # 2 * 36 / 30
+        'PTS/100': 33.207547,        # 22 * 100 / (106 * 30 / 48)
+        'AST/100': 7.547170,         # 5 * 100 / 66.25
+        'USG%': 27.862069,           # 100 * (16 + 2.2 + 2) * 48 / (30 * (90 + 11 + 15))
+    },
+    'Two': {
+        'TS%': 8 / 19.52,            # 8 / (2 * (8 + 0.44 * 4))
+        'PTS/36': 14.4,              # 8 * 36 / 20
+        'PTS/100': 19.419419,        # 8 * 100 / (99.9 * 20 / 48.5)
+        'USG%': 23.318141,           # 100 * (8 + 1.76 + 1) * 48.5 / (20 * (85 + 9.9 + 17))
+    },
+}
+
+
+def reference_per(players, teams):
+    # Hollinger's PER one row at a time, straight from the formula with season totals
+    lg = teams.sum(numeric_only=True)
+    factor = 2 / 3 - (0.5 * lg.AST / lg.FG) / (2 * lg.FG / lg.FT)
+    vop = lg.PTS / (lg.FGA - lg.ORB + lg.TOV + 0.44 * lg.FTA)
+    drbp = (lg.TRB - lg.ORB) / lg.TRB
+    pace = {}
+    for team in teams.itertuples():
+        possessions = team.FGA + 0.44 * team.FTA - team.ORB + team.TOV
+        pace[team.team_id] = 48 * possessions / (team.MP / 5)
+    lg_pace = statistics.mean(pace.values())
+    teams_by_id = {team['team_id']: team for team in teams.to_dict('records')}
+    aper, minutes = [], []
+    for p in players.to_dict('records'):
+        team = teams_by_id[p['Tm']]
+        # Season totals from the per-game line
+        t = {stat: p[stat] * p['G'] for stat in ['MP', 'FG', 'FGA', '3P', 'FT', 'FTA', 'ORB', 'TRB', 'AST', 'STL',
+                                                 'BLK', 'TOV', 'PF']}
+        assist_rate = team['AST'] / team['FG']
+        uper = (1 / t['MP']) * (t['3P'] + 2 / 3 * t['AST'] + (2 - factor * assist_rate) * t['FG']
+                                + t['FT'] * 0.5 * (1 + (1 - assist_rate) + 2 / 3 * assist_rate)
+                                - vop * t['TOV'] - vop * drbp * (t['FGA'] - t['FG'])
+                                - vop * 0.44 * (0.44 + 0.56 * drbp) * (t['FTA'] - t['FT'])
+                                + vop * (1 - drbp) * (t['TRB'] - t['ORB']) + vop * drbp * t['ORB']
+                                + vop * t['STL'] + vop * drbp * t['BLK']
+                                - t['PF'] * (lg.FT / lg.PF - 0.44 * lg.FTA / lg.PF * vop))
+        aper.append(uper * lg_pace / pace[p['Tm']])
+        minutes.append(t['MP'])
+    lg_aper = sum(a * m for a, m in zip(aper, minutes)) / sum(minutes)
+    return [a * 15 / lg_aper for a in aper]
+
+
+def check_fixture():
+    stats = advanced_stats(PLAYERS, team_context(TEAMS)).set_index(PLAYERS['Player'])
+    ok = True
+    for player, expected in EXPECTED.items():
+        for column, value in expected.items():
+            got = float(stats.loc[player, column])
+            match = math.isclose(got, value, rel_tol=1e-5)
+            ok &= match
+            print(f"{player:4} {column:8} {got:12.6f}  hand {value:12.6f}{'' if match else '  MISMATCH'}")
+    for player, value in zip(PLAYERS['Player'], reference_per(PLAYERS, TEAMS)):
+        got = float(stats.loc[player, 'PER'])
+        match = math.isclose(got, value, rel_tol=1e-5)
+        ok &= match
+        print(f"{player:4} {'PER':8} {got:12.6f}  row-by-row {value:12.6f}{'' if match else '  MISMATCH'}")
+    minutes = PLAYERS['MP'] * PLAYERS['G']
+    average = float((stats['PER'].to_numpy() * minutes.to_numpy()).sum() / minutes.sum())
+    print(f"league average PER {average:.6f} (must be 15)")
+    return ok and math.isclose(average, 15, rel_tol=1e-5)
+
+
+def generated_history(seasons, players_per_season, teams_per_season=30, seed=0):
+    # Plausible per-game lines and team totals for `seasons` seasons, for timing only
+    rng = np.random.default_rng(seed)
+    rows = seasons * players_per_season
+    season = np.repeat(np.arange(2024 - seasons, 2024), players_per_season)
+    team = rng.integers(0, teams_per_season, rows)
+    fga = rng.uniform(1, 20, rows)
+    fta = rng.uniform(0, 8, rows)
+    players = pd.DataFrame({
+        'Season': season.astype(np.int16), 'Tm': pd.Categorical(['T%02d' % t for t in team]),
+        'G': rng.integers(1, 83, rows), 'MP': rng.uniform(5, 40, rows), 'FG': fga * 0.45, 'FGA': fga,
+        '3P': fga * 0.1, 'FT': fta * 0.75, 'FTA': fta, 'ORB': rng.uniform(0, 4, rows), 'TRB': rng.uniform(1, 12, rows),
+        'AST': rng.uniform(0, 10, rows), 'STL': rng.uniform(0, 2, rows), 'BLK': rng.uniform(0, 2, rows),
+        'TOV': rng.uniform(0, 4, rows), 'PF': rng.uniform(0, 4, rows), 'PTS': fga * 1.1 + fta * 0.75,
+    }).astype({c: np.float32 for c in ['MP', 'FG', 'FGA', '3P', 'FT', 'FTA', 'ORB', 'TRB', 'AST', 'STL', 'BLK',
+                                       'TOV', 'PF', 'PTS']})
+    team_rows = seasons * teams_per_season
+    fga = rng.uniform(6800, 7400, team_rows)
+    totals = pd.DataFrame({
+        'Season': np.repeat(np.arange(2024 - seasons, 2024), teams_per_season),
+        'team_id': ['T%02d' % t for t in np.tile(np.arange(teams_per_season), seasons)],
+        'G': 82, 'MP': 19780, 'FG': fga * 0.46, 'FGA': fga, 'FT': rng.uniform(1300, 1700, team_rows),
+        'FTA': rng.uniform(1700, 2200, team_rows), 'ORB': rng.uniform(800, 1000, team_rows),
+        'TRB': rng.uniform(3500, 3800, team_rows), 'AST': rng.uniform(1900, 2200, team_rows),
+        'TOV': rng.uniform(1100, 1300, team_rows), 'PF': rng.uniform(1600, 1800, team_rows),
+        'PTS': rng.uniform(8800, 9600, team_rows),
+    })
+    return players, totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seasons", type=int, default=74)
+    parser.add_argument("--players", type=int, default=500, help="player rows per season")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1000.0)
+    args = parser.parse_args()
+
+    ok = check_fixture()
+    players, totals = generated_history(args.seasons, args.players)
+    samples = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        advanced_stats(players, team_context(totals))
+        samples.append((time.perf_counter() - start) * 1000)
+    median = statistics.median(samples)
+    over = median > args.budget_ms
+    print(f"history: {len(players)} player-seasons over {args.seasons} seasons in {median:.1f} ms "
+          f"(budget {args.budget_ms:.0f} ms){'  OVER BUDGET' if over else ''}")
+    print("OK" if ok and not over else "FAILED")
+    return 0 if ok and not over else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
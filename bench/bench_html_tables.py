@@ -0,0 +1,74 @@
+"""Benchmark the streaming table extractor against the BeautifulSoup + read_html path.
+
+Run from the repository root after recording fixtures::
+
+    python -m bench.bench_html_tables
+"""
+import io
+import statistics
+import time
+
+import pandas as pd
+from bs4 import BeautifulSoup, Comment
+
+from html_tables import extract_tables
+from nba_data import LEAGUE_TABLE_IDS
+from bench.fixtures import fixture_path, recorded_pages
+
+
+def table_ids_for(page):
+    if page.endswith("_per_game.html"):
+        return ["per_game_stats"]
+    return list(LEAGUE_TABLE_IDS.values())
+
+
+def soup_path(content, table_ids):
+    # What basketballEDA.py used to do: full soup, then re-serialize and re-parse each table. Upstream
+    # ships most league tables inside HTML comments, so those are parsed into the tree first, or
+    # this path would find (and time) fewer tables than the streaming one
+    soup = BeautifulSoup(content, "html.parser")
+    for comment in soup.find_all(string=lambda text: isinstance(text, Comment) and "<table" in text):
+        comment.replace_with(BeautifulSoup(comment, "html.parser"))
+    frames = {}
+    for group in table_ids:
+        for table_id in (group,) if isinstance(group, str) else group:
+            table = soup.find("table", {"id": table_id})
+            if table is not None:
+                frames[table_id] = pd.read_html(io.StringIO(str(table)))[0]
+                break
+    return frames
+
+
+def streaming_path(content, table_ids):
+    return extract_tables(content, table_ids)
+
+
+def timed(fn, *args, repeat=5):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+
+def main():
+    pages = recorded_pages()
+    if not pages:
+        raise SystemExit("No fixtures recorded yet, run `python -m bench.fixtures` first")
+    print(f"{'page':40} {'soup ms':>10} {'stream ms':>10} {'speedup':>8} tables")
+    for page in pages:
+        with open(fixture_path(page), "rb") as fh:
+            content = fh.read()
+        table_ids = table_ids_for(page)
+        soup_time, soup_frames = timed(soup_path, content, table_ids)
+        stream_time, stream_frames = timed(streaming_path, content, table_ids)
+        # A ratio only means something when both paths did the same work
+        if sorted(soup_frames) != sorted(stream_frames):
+            raise SystemExit(f"{page}: soup found {sorted(soup_frames)}, streaming found {sorted(stream_frames)}")
+        print(f"{page:40} {soup_time * 1000:10.1f} {stream_time * 1000:10.1f} "
+              f"{soup_time / stream_time:7.1f}x {len(soup_frames)}/{len(stream_frames)}")
+
+
+if __name__ == "__main__":
+    main()
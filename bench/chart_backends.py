@@ -0,0 +1,111 @@
+"""Server CPU time per rerun of the app's charts with each chart backend, fully offline.
+
+    python -m bench.chart_backends
+    python -m bench.chart_backends --backends matplotlib vega-lite --repeat 5
+
+Drives the app through Streamlit's app-testing harness against the stand-in server, once per
+backend (``NBA_CHART_BACKEND``), and measures the process CPU time of each rerun:
+``leaderboard_cold`` switches through every team leaderboard option with an empty chart cache,
+``leaderboard_warm`` does it again with the charts cached, and ``comparison`` reruns with the
+player comparison charts shown (they are drawn on every rerun). Plotting libraries are
+imported before measuring, as they would be in a process that has drawn a chart already, and
+no prerendered files are used. Prints the median CPU ms per rerun of every scenario for each
+backend; with ``--output``, writes them as JSON.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+# Repo modules read their cache locations at import time, so point them at a scratch directory first
+SCRATCH_DIR = tempfile.mkdtemp(prefix="nba-charts-")
+os.environ["NBA_CACHE_DIR"] = SCRATCH_DIR
+
+import charts
+import http_client
+import settings
+from bench.fixtures import ERAS, fixture_path, season_pages
+from bench.standin import StandInServer
+
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "basketballEDA.py")
+
+BACKENDS = ["matplotlib", charts.VEGA_LITE]
+
+
+def cpu_ms(at):
+    # CPU time of one rerun, including Streamlit turning the page into messages
+    start = time.process_time()
+    at.run()
+    if at.exception:
+        raise RuntimeError("app failed: %s" % at.exception[0].value)
+    return (time.process_time() - start) * 1000
+
+
+def bench_backend(backend, year, repeat, players):
+    from streamlit.testing.v1 import AppTest
+
+    settings.CHART_BACKEND = backend
+    charts.chart_cache.clear()
+    at = AppTest.from_file(APP, default_timeout=300)
+    at.session_state["year"] = year
+    at.run()
+    options = list(charts.TEAM_LEADERBOARDS) + [charts.BOTTOM_TEAM_POINTS]
+    results = {}
+    for scenario in ("leaderboard_cold", "leaderboard_warm"):
+        samples = []
+        for option in options:
+            at.radio(key="team_leaderboard").set_value(option)
+            samples.append(cpu_ms(at))
+        results[scenario] = samples
+    selection = at.multiselect(key="players")
+    selection.set_value(list(selection.options)[:players])
+    cpu_ms(at)
+    at.checkbox(key="show_charts").check()
+    cpu_ms(at)
+    results["comparison"] = [cpu_ms(at) for _ in range(repeat)]
+    return {scenario: {"median_cpu_ms": round(statistics.median(samples), 1), "reruns": len(samples)}
+            for scenario, samples in results.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=BACKENDS)
+    parser.add_argument("--repeat", type=int, default=5, help="reruns of the comparison charts")
+    parser.add_argument("--players", type=int, default=3, help="players in the comparison charts")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    year = ERAS["2020s"]
+    missing = [page for page in season_pages(year) if not os.path.exists(fixture_path(page))]
+    if missing:
+        raise SystemExit("Missing fixtures " + ", ".join(missing) + ", run `python -m bench.fixtures` first")
+    # Paid once per process whichever backend draws first; not what a rerun costs
+    import matplotlib.pyplot  # noqa: F401
+    import seaborn  # noqa: F401
+
+    server = StandInServer().start()
+    settings.BASE_URL = server.base_url
+    http_client.rate_limiter.configure(0)
+    settings.PREFETCH = False
+    try:
+        results = {backend: bench_backend(backend, year, args.repeat, args.players) for backend in args.backends}
+    finally:
+        server.shutdown()
+        shutil.rmtree(SCRATCH_DIR, ignore_errors=True)
+
+    print(f"{'scenario':18}" + "".join(f"{backend:>14}" for backend in args.backends) + "   (median CPU ms per rerun)")
+    for scenario in next(iter(results.values())):
+        print(f"{scenario:18}" + "".join(f"{results[backend][scenario]['median_cpu_ms']:14.1f}" for backend in args.backends))
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
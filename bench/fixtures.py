@@ -0,0 +1,265 @@
+"""Recorded basketball-reference pages used by the offline benchmarks.
+
+Pages live under ``bench/fixtures/`` mirroring their URL path, e.g.
+``/leagues/NBA_2023.html`` is stored as ``bench/fixtures/leagues/NBA_2023.html``.
+The committed pages are small synthetic ones laid out like the real pages (same table ids,
+commented-out tables, repeated header rows, traded players' TOT rows, player and team
+links), so every stand-in check runs offline out of the box. They are regenerated with
+``python -m bench.fixtures --synthetic``. Record the real pages instead (for timings at
+the real page sizes) with ``python -m bench.fixtures``; set ``NBA_FIXTURE_DIR`` to keep
+them somewhere else.
+"""
+import argparse
+import os
+import random
+import time
+
+FIXTURE_DIR = os.environ.get(
+    "NBA_FIXTURE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+)
+UPSTREAM = "https://www.basketball-reference.com"
+
+# One season per era: short 1950s tables without 3-point or opponent stats, the 1980s, and today
+ERAS = {"1950s": 1955, "1980s": 1985, "2020s": 2023}
+
+
+def season_pages(year):
+    return ["/leagues/NBA_%d.html" % year, "/leagues/NBA_%d_per_game.html" % year]
+
+
+FIXTURE_PAGES = [page for year in ERAS.values() for page in season_pages(year)]
+
+# Seasons committed as synthetic pages: the eras, plus the neighbours bench.prefetch walks through
+SYNTHETIC_SEASONS = sorted(set(ERAS.values()) | {1984, 1986, 1999, 2000, 2001})
+
+
+def fixture_path(url_path):
+    return os.path.join(FIXTURE_DIR, *url_path.lstrip("/").split("/"))
+
+
+def recorded_pages():
+    return [page for page in FIXTURE_PAGES if os.path.exists(fixture_path(page))]
+
+
+def record(pages=FIXTURE_PAGES, delay=3.0):
+    import requests
+
+    for page in pages:
+        path = fixture_path(page)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        response = requests.get(UPSTREAM + page, timeout=30)
+        response.raise_for_status()
+        with open(path, "wb") as fh:
+            fh.write(response.content)
+        print(f"recorded {page} ({len(response.content)} bytes)")
+        # basketball-reference rate-limits aggressive clients
+        time.sleep(delay)
+
+
+################# Synthetic pages ################
+
+# Franchises per era, the first half listed as the Eastern conference
+TEAMS = {
+    1950: ['BOS', 'NYK', 'PHW', 'SYR', 'FTW', 'MLH', 'MNL', 'ROC'],
+    1980: ['ATL', 'BOS', 'CHI', 'CLE', 'DET', 'IND', 'MIL', 'NJN', 'NYK', 'PHI', 'WSB', 'DAL', 'DEN', 'GSW', 'HOU',
+           'KCK', 'LAC', 'LAL', 'PHO', 'POR', 'SAS', 'SEA', 'UTA'],
+    2000: ['ATL', 'BOS', 'BRK', 'CHI', 'CHO', 'CLE', 'DET', 'IND', 'MIA', 'MIL', 'NYK', 'ORL', 'PHI', 'TOR', 'WAS',
+           'DAL', 'DEN', 'GSW', 'HOU', 'LAC', 'LAL', 'MEM', 'MIN', 'NOP', 'OKC', 'PHO', 'POR', 'SAC', 'SAS', 'UTA'],
+}
+PLAYERS_PER_TEAM = 6
+
+FIRST_NAMES = ['John', 'Mike', 'Chris', 'Kevin', 'Anthony', 'James', 'Marcus', 'Tim', 'Paul', 'Eric', 'Larry', 'Bob']
+LAST_NAMES = ['Smith', 'Jones', 'Brown', 'Davis', 'Miller', 'Wilson', 'Moore', 'Taylor', 'Anderson', 'Thomas',
+              'Jackson', 'White', 'Harris', 'Martin', 'Walker', 'Young', 'King', 'Wright', 'Hill', 'Green']
+POSITIONS = ['PG', 'SG', 'SF', 'PF', 'C']
+
+PLAYER_COLUMNS = ['G', 'GS', 'MP', 'FG', 'FGA', 'FG%', '3P', '3PA', '3P%', '2P', '2PA', '2P%', 'eFG%', 'FT', 'FTA',
+                  'FT%', 'ORB', 'DRB', 'TRB', 'AST', 'STL', 'BLK', 'TOV', 'PF', 'PTS']
+TEAM_COLUMNS = ['G', 'MP', 'FG', 'FGA', 'FG%', '3P', '3PA', '3P%', '2P', '2PA', '2P%', 'FT', 'FTA', 'FT%', 'ORB', 'DRB',
+                'TRB', 'AST', 'STL', 'BLK', 'TOV', 'PF', 'PTS']
+# First season each group of columns was recorded in; blank before that, as upstream
+RECORDED_FROM = [(1980, {'3P', '3PA', '3P%'}), (1978, {'TOV'}), (1974, {'ORB', 'DRB', 'STL', 'BLK'}), (1982, {'GS'})]
+
+
+def _era_teams(year):
+    return TEAMS[max(era for era in TEAMS if era <= year)]
+
+
+def _blank(column, year):
+    return any(year < first and column in columns for first, columns in RECORDED_FROM)
+
+
+def _ratio(made, attempts):
+    return f"{made / attempts:.3f}".lstrip("0") if attempts else ""
+
+
+def _line(shots, threes, free_throws, rebounds, extras):
+    # Every derived column from the made/attempted pairs, per game or per season alike
+    fg, fga = shots
+    tp, tpa = threes
+    ft, fta = free_throws
+    orb, drb = rebounds
+    line = {'FG': fg, 'FGA': fga, 'FG%': _ratio(fg, fga), '3P': tp, '3PA': tpa, '3P%': _ratio(tp, tpa),
+            '2P': fg - tp, '2PA': fga - tpa, '2P%': _ratio(fg - tp, fga - tpa), 'eFG%': _ratio(fg + 0.5 * tp, fga),
+            'FT': ft, 'FTA': fta, 'FT%': _ratio(ft, fta), 'ORB': orb, 'DRB': drb, 'TRB': orb + drb,
+            'PTS': 2 * fg + tp + ft}
+    line.update(extras)
+    return line
+
+
+def _cells(line, columns, year, number_format):
+    cells = []
+    for column in columns:
+        value = line.get(column, "")
+        if _blank(column, year):
+            value = ""
+        elif not isinstance(value, str):
+            value = number_format(column, value)
+        cells.append(f'<td>{value}</td>')
+    return "".join(cells)
+
+
+def _per_game_format(column, value):
+    return str(int(value)) if column in ('G', 'GS') else f"{value:.1f}"
+
+
+def _player_lines(year):
+    # (id, name, position, age, team, games, per-game line) per row; a traded player gets a TOT row first
+    pick = random.Random(year)
+    teams = _era_teams(year)
+    three_rate = 0.0 if year < 1980 else 0.1 if year < 2000 else 0.35
+    rows = []
+    for number in range(len(teams) * PLAYERS_PER_TEAM):
+        # Every 50th player shares the previous one's name, as happens upstream; only the id tells them apart
+        namesake = number % 50 == 49
+        name_number = number - 1 if namesake else number
+        first, last = FIRST_NAMES[name_number % len(FIRST_NAMES)], LAST_NAMES[name_number // len(FIRST_NAMES) % len(LAST_NAMES)]
+        player_id = (last[:5] + first[:2]).lower() + ("02" if namesake else "01")
+        minutes = pick.uniform(8, 38)
+        fga = minutes * pick.uniform(0.3, 0.5)
+        fg = fga * pick.uniform(0.38, 0.55)
+        tpa = fga * three_rate * pick.uniform(0.5, 1.5)
+        fta = minutes * pick.uniform(0.05, 0.25)
+        line = _line((round(fg, 1), round(fga, 1)), (round(min(tpa * 0.36, fg), 1), round(tpa, 1)),
+                     (round(fta * 0.75, 1), round(fta, 1)), (round(minutes * 0.04, 1), round(minutes * 0.12, 1)),
+                     {'MP': round(minutes, 1), 'AST': round(minutes * pick.uniform(0.03, 0.2), 1),
+                      'STL': round(minutes * 0.03, 1), 'BLK': round(minutes * 0.02, 1),
+                      'TOV': round(minutes * 0.05, 1), 'PF': round(minutes * 0.08, 1)})
+        games = pick.randint(10, 70)
+        line['GS'] = pick.randint(0, games)
+        player = (player_id, f"{first} {last}", pick.choice(POSITIONS), pick.randint(19, 36))
+        if number % 25 == 24:
+            # Traded mid-season: one TOT line over both stints, then one line per team
+            other = teams[(number + 1) % len(teams)]
+            rows.append(player + ('TOT', games + 12, line))
+            rows.append(player + (teams[number % len(teams)], games, line))
+            rows.append(player + (other, 12, line))
+        else:
+            rows.append(player + (teams[number % len(teams)], games, line))
+    return rows
+
+
+def synthetic_per_game_page(year):
+    """A small leagues/NBA_<year>_per_game.html: the per_game_stats table with a header row every 20 rows."""
+    header = ("<tr><th>Rk</th><th>Player</th><th>Pos</th><th>Age</th><th>Tm</th>"
+              + "".join(f"<th>{column}</th>" for column in PLAYER_COLUMNS) + "</tr>")
+    rows = []
+    for rank, (player_id, name, position, age, team, games, line) in enumerate(_player_lines(year), 1):
+        if rank % 20 == 0:
+            rows.append(header.replace("<tr>", '<tr class="thead">', 1))
+        team_cell = team if team == 'TOT' else f'<a href="/teams/{team}/{year}.html">{team}</a>'
+        rows.append(f'<tr><th scope="row">{rank}</th>'
+                    f'<td data-append-csv="{player_id}" data-stat="player">'
+                    f'<a href="/players/{player_id[0]}/{player_id}.html">{name}</a></td>'
+                    f'<td>{position}</td><td>{age}</td><td>{team_cell}</td>'
+                    + _cells(dict(line, G=games), PLAYER_COLUMNS, year, _per_game_format) + "</tr>")
+    return (f'<html><head><meta charset="utf-8"><title>{year - 1}-{year % 100:02d} NBA Player Stats: Per Game</title>'
+            f'</head><body><div id="wrap"><div id="all_per_game_stats" class="table_wrapper">'
+            f'<table id="per_game_stats"><thead>{header}</thead><tbody>{"".join(rows)}</tbody></table>'
+            f'</div></div></body></html>').encode()
+
+
+def _team_lines(year, seed, per_game):
+    pick = random.Random(year * 10 + seed)
+    games = 72 if year < 1968 else 82
+    scale = 1 if per_game else games
+    three_rate = 0.0 if year < 1980 else 0.1 if year < 2000 else 0.4
+    lines = {}
+    for team in _era_teams(year):
+        fga = pick.uniform(84, 100)
+        fg = fga * pick.uniform(0.42, 0.49)
+        tpa = fga * three_rate
+        fta = pick.uniform(18, 28)
+        line = _line((fg * scale, fga * scale), (tpa * 0.36 * scale, tpa * scale), (fta * 0.76 * scale, fta * scale),
+                     (pick.uniform(9, 12) * scale, pick.uniform(31, 36) * scale),
+                     {'G': games, 'MP': (240.6 if per_game else 240.6 * games), 'AST': pick.uniform(20, 27) * scale,
+                      'STL': pick.uniform(6, 9) * scale, 'BLK': pick.uniform(4, 6) * scale,
+                      'TOV': pick.uniform(12, 16) * scale, 'PF': pick.uniform(18, 23) * scale})
+        lines[team] = line
+    return lines
+
+
+def _team_table(table_id, year, seed, per_game):
+    def number_format(column, value):
+        if column == 'G':
+            return str(int(value))
+        return f"{value:.1f}" if per_game else str(int(round(value)))
+
+    header = "<tr><th>Rk</th><th>Team</th>" + "".join(f"<th>{column}</th>" for column in TEAM_COLUMNS) + "</tr>"
+    lines = _team_lines(year, seed, per_game)
+    rows = [f'<tr><th scope="row">{rank}</th><td><a href="/teams/{team}/{year}.html">Team {team}</a>{"*" if rank <= 4 else ""}'
+            f'</td>' + _cells(line, TEAM_COLUMNS, year, number_format) + "</tr>"
+            for rank, (team, line) in enumerate(lines.items(), 1)]
+    average = {column: sum(line[column] for line in lines.values() if not isinstance(line[column], str)) / len(lines)
+               for column in TEAM_COLUMNS if not column.endswith('%')}
+    rows.append('<tr><th scope="row"></th><td>League Average</td>' + _cells(average, TEAM_COLUMNS, year, number_format)
+                + "</tr>")
+    return f'<table id="{table_id}"><thead>{header}</thead><tbody>{"".join(rows)}</tbody></table>'
+
+
+def _standings(table_id, year, teams):
+    rows = "".join(f'<tr><th><a href="/teams/{team}/{year}.html">Team {team}</a>*</th><td>{50 - i * 3}</td>'
+                   f'<td>{32 + i * 3}</td></tr>' for i, team in enumerate(teams))
+    return (f'<table id="{table_id}"><thead><tr><th>Conference</th><th>W</th><th>L</th></tr></thead>'
+            f'<tbody>{rows}</tbody></table>')
+
+
+def synthetic_league_page(year):
+    """A small leagues/NBA_<year>.html: standings, then the team tables, most of them inside HTML comments."""
+    teams = _era_teams(year)
+    half = len(teams) // 2
+    parts = [_standings("confs_standings_E", year, teams[:half]), _standings("confs_standings_W", year, teams[half:]),
+             '<div id="all_per_game-team">' + _team_table("per_game-team", year, 1, True) + '</div>',
+             '<div id="all_totals-team"><!--\n' + _team_table("totals-team", year, 2, False) + '\n--></div>']
+    if year >= 1971:
+        # The opponent tables only exist from the 1970s on
+        parts += ['<div id="all_totals-opponent"><!--\n' + _team_table("totals-opponent", year, 3, False) + '\n--></div>',
+                  '<div id="all_per_game-opponent"><!--\n' + _team_table("per_game-opponent", year, 4, True) + '\n--></div>']
+    return (f'<html><head><meta charset="utf-8"><title>{year - 1}-{year % 100:02d} NBA Season Summary</title></head>'
+            f'<body><div id="wrap">{"".join(parts)}</div></body></html>').encode()
+
+
+def write_synthetic(years=SYNTHETIC_SEASONS):
+    for year in years:
+        for page, body in zip(season_pages(year), (synthetic_league_page(year), synthetic_per_game_page(year))):
+            path = fixture_path(page)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as fh:
+                fh.write(body)
+            print(f"wrote {page} ({len(body)} bytes)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record the fixture pages, or write synthetic ones.")
+    parser.add_argument("pages", nargs="*", help="URL paths to record (default: every fixture page)")
+    parser.add_argument("--synthetic", type=int, nargs="*", metavar="YEAR",
+                        help="write synthetic season pages instead (default: SYNTHETIC_SEASONS)")
+    args = parser.parse_args()
+    if args.synthetic is not None:
+        write_synthetic(args.synthetic or SYNTHETIC_SEASONS)
+    else:
+        record(args.pages or FIXTURE_PAGES)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Check the app's cold-start import cost against a budget.
+
+Each stage is imported in a fresh interpreter, several times, and the median is compared
+with its budget. Streamlit itself is imported before the clock starts: it is paid by every
+app and is not ours to trim::
+
+    python -m bench.import_budget
+    python -m bench.import_budget --landing-ms 30 --app-ms 600
+
+``landing`` is what has to load before the landing page is sent; ``app`` is every section
+with the data layer, as on the first rerun. Neither may pull in the plotting libraries or
+the scraper's HTTP and HTML stack, which only load once a chart is drawn or a page fetched.
+Exits non-zero when a stage is over budget or imports a module it must not.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STAGES = {
+    "landing": ["telemetry", "sections.landing"],
+    "app": ["sections.career", "sections.diagnostics", "sections.player_comparison", "sections.player_filters",
+            "sections.player_table", "sections.team_leaderboards", "sections.team_stats", "nba_data",
+            "prefetch"],
+}
+
+# Loaded on demand only: charts, the comparison plots, page fetches and parsing
+DEFERRED = ["matplotlib", "seaborn", "requests", "lxml", "bs4"]
+
+# About 1.5x what the stages take today (5 and 450 ms). Importing the plotting and scraping
+# libraries up front again adds about 1200 ms to a stage, so either budget catches it.
+LANDING_BUDGET_MS = 50.0
+APP_BUDGET_MS = 700.0
+
+PROBE = """
+import importlib, json, sys, time
+import streamlit
+start = time.perf_counter()
+for name in sys.argv[1:]:
+    importlib.import_module(name)
+elapsed = time.perf_counter() - start
+print(json.dumps({"ms": elapsed * 1000, "modules": sorted({m.split('.')[0] for m in sys.modules})}))
+"""
+
+
+def probe(modules):
+    output = subprocess.run([sys.executable, "-c", PROBE, *modules], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure(stage, repeat=5):
+    """(median import ms, deferred modules it loaded) of one stage, each run in a fresh interpreter."""
+    runs = [probe(STAGES[stage]) for _ in range(repeat)]
+    return statistics.median(run["ms"] for run in runs), sorted(set(DEFERRED) & set(runs[0]["modules"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--landing-ms", type=float, default=LANDING_BUDGET_MS)
+    parser.add_argument("--app-ms", type=float, default=APP_BUDGET_MS)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    budgets = {"landing": args.landing_ms, "app": args.app_ms}
+
+    failed = False
+    for stage in STAGES:
+        median, loaded = measure(stage, args.repeat)
+        over = median > budgets[stage]
+        print(f"{stage:8} {median:8.1f} ms (budget {budgets[stage]:.0f} ms){'  OVER BUDGET' if over else ''}")
+        if loaded:
+            print(f"{stage:8} imports {', '.join(loaded)}, which should only load on demand")
+        failed |= over or bool(loaded)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
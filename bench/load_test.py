@@ -0,0 +1,206 @@
+"""Load-test one app process with N concurrent simulated sessions against the stand-in server.
+
+    python -m bench.load_test
+    python -m bench.load_test --sessions 1 4 16 --steps 12 --rate 0 --output load.json
+
+For each N in ``--sessions``, N threads each drive their own session of ``basketballEDA.py``
+through Streamlit's app-testing harness, all starting together: open the app, pick a season,
+show the team stats, switch the leaderboard, select players and open their charts, then keep
+doing one of those at random (seeded per session) until ``--steps`` actions are done. Every
+level runs in a process of its own with an empty cache directory, so nothing it loads, parses,
+ranks or draws is left over from the level before: its upstream requests and latencies are
+what N sessions arriving on a cold worker cost. The libraries every worker imports before its
+first rerun are imported before the clock starts. Upstream pacing uses ``--rate`` and
+``--burst`` as the app would. Seasons are picked from the ones with fixture pages.
+
+Reports per level: reruns, rerun latency p50/p95/p99 and max, reruns per second, upstream
+requests seen by the stand-in, and the peak RSS of the process while the level ran.
+"""
+import argparse
+import importlib
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+# Repo modules read their cache locations at import time. A level's process gets its cache directory
+# from the parent (see run_level); the parent points them at a scratch directory that holds those.
+LEVEL_FLAG = "--level"
+if LEVEL_FLAG not in sys.argv:
+    SCRATCH_DIR = tempfile.mkdtemp(prefix="nba-load-")
+    os.environ["NBA_CACHE_DIR"] = SCRATCH_DIR
+
+import charts
+import http_client
+import prefetch
+import settings
+from bench.fixtures import fixture_path, season_pages
+from bench.import_budget import STAGES
+from bench.rss_check import current_rss_mb
+from bench.standin import StandInServer
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "basketballEDA.py")
+
+
+OPENING = ["year", "team_stats", "leaderboard", "players", "charts"]
+
+
+def fixture_years():
+    return [year for year in range(prefetch.FIRST_SEASON, prefetch.LAST_SEASON + 1)
+            if all(os.path.exists(fixture_path(page)) for page in season_pages(year))]
+
+
+def act(at, action, pick, years):
+    # Sets one widget the way a user would; the caller reruns the script
+    if action == "year":
+        at.selectbox(key="year").select(pick.choice(years))
+    elif action == "team_stats":
+        checkbox = at.checkbox(key="show_team_stats")
+        checkbox.set_value(not checkbox.value)
+    elif action == "leaderboard":
+        at.radio(key="team_leaderboard").set_value(pick.choice(list(charts.TEAM_LEADERBOARDS) + [charts.BOTTOM_TEAM_POINTS]))
+    elif action == "players":
+        players = at.multiselect(key="players")
+        players.set_value(pick.sample(list(players.options), min(len(players.options), pick.randint(1, 3))))
+    elif action == "charts":
+        checkbox = at.checkbox(key="show_charts")
+        checkbox.set_value(not checkbox.value)
+
+
+def run_session(number, steps, years, seed, start, results):
+    from streamlit.testing.v1 import AppTest
+
+    pick = random.Random(seed * 1000 + number)
+    latencies, errors, skipped = [], 0, 0
+    at = AppTest.from_file(APP, default_timeout=600)
+    start.wait()
+    actions = [None] + [OPENING[i] if i < len(OPENING) else pick.choice(OPENING) for i in range(steps)]
+    for action in actions:
+        if action is not None:
+            try:
+                act(at, action, pick, years)
+            except KeyError:
+                # The widget is not on the page in this state (e.g. no players selected yet for the charts)
+                skipped += 1
+                continue
+        started = time.perf_counter()
+        at.run()
+        latencies.append((time.perf_counter() - started) * 1000)
+        errors += len(at.exception)
+    results[number] = (latencies, errors, skipped)
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def level(sessions, steps, years, seed):
+    """Run one level in this process, which must not have served anything yet; returns its results."""
+    # Paid once by every worker before its first rerun, whatever its sessions do
+    for name in STAGES["app"] + ["matplotlib.pyplot", "seaborn", "streamlit.testing.v1"]:
+        importlib.import_module(name)
+    results = {}
+    start = threading.Barrier(sessions + 1)
+    threads = [threading.Thread(target=run_session, args=(i, steps, years, seed, start, results), name=f"session-{i}")
+               for i in range(sessions)]
+    for thread in threads:
+        thread.start()
+    peak = [current_rss_mb()]
+    start.wait()
+    started = time.perf_counter()
+    while any(thread.is_alive() for thread in threads):
+        peak[0] = max(peak[0], current_rss_mb())
+        time.sleep(0.05)
+    elapsed = time.perf_counter() - started
+    # Background prefetches still queued belong to this level; let the parent count only what went out
+    prefetch.prefetcher.cancel()
+    while prefetch.prefetcher._running is not None:
+        time.sleep(0.05)
+    latencies = [ms for session_latencies, _, _ in results.values() for ms in session_latencies]
+    return {
+        "sessions": sessions,
+        "reruns": len(latencies),
+        "errors": sum(errors for _, errors, _ in results.values()),
+        "skipped": sum(skipped for _, _, skipped in results.values()),
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+        "max_ms": round(max(latencies), 1),
+        "mean_ms": round(statistics.mean(latencies), 1),
+        "reruns_per_s": round(len(latencies) / elapsed, 2),
+        "peak_rss_mb": round(peak[0], 1),
+    }
+
+
+def run_level(server, sessions, args):
+    # A new process on a new cache directory: nothing on disk or in memory is left from the last level
+    cache_dir = tempfile.mkdtemp(dir=SCRATCH_DIR)
+    env = dict(os.environ, NBA_CACHE_DIR=cache_dir, NBA_BASE_URL=server.base_url)
+    command = [sys.executable, "-m", "bench.load_test", LEVEL_FLAG, str(sessions), "--steps", str(args.steps),
+               "--rate", str(args.rate), "--burst", str(args.burst), "--seed", str(args.seed)]
+    if args.no_prefetch:
+        command.append("--no-prefetch")
+    server.reset()
+    child = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True)
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    if child.returncode:
+        raise SystemExit(f"Level with {sessions} session(s) failed:\n{child.stderr[-4000:]}")
+    result = json.loads(child.stdout.strip().splitlines()[-1])
+    result["upstream_requests"] = sum(server.snapshot().values())
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8], help="concurrent sessions per level")
+    parser.add_argument("--steps", type=int, default=8, help="widget actions per session")
+    parser.add_argument("--rate", type=float, default=settings.UPSTREAM_RATE, help="upstream requests per second (0 = unlimited)")
+    parser.add_argument("--burst", type=int, default=settings.UPSTREAM_BURST)
+    parser.add_argument("--latency", type=float, default=0.1, help="seconds the stand-in takes per page")
+    parser.add_argument("--no-prefetch", action="store_true", help="turn the background prefetcher off")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument(LEVEL_FLAG, type=int, help=argparse.SUPPRESS)  # run one level in this process
+    args = parser.parse_args()
+
+    years = fixture_years()
+    if not years:
+        raise SystemExit("No season fixtures found, run `python -m bench.fixtures --synthetic` first")
+    if args.level is not None:
+        http_client.rate_limiter.configure(args.rate, args.burst)
+        settings.PREFETCH = not args.no_prefetch
+        print(json.dumps(level(args.level, args.steps, years, args.seed)))
+        return 0
+    server = StandInServer(latency=args.latency).start()
+    levels = []
+    try:
+        print(f"{'sessions':>8} {'reruns':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'reruns/s':>9} "
+              f"{'upstream':>9} {'peak RSS MB':>12} {'errors':>7}")
+        for sessions in args.sessions:
+            result = run_level(server, sessions, args)
+            levels.append(result)
+            print(f"{result['sessions']:8d} {result['reruns']:7d} {result['p50_ms']:8.0f} {result['p95_ms']:8.0f} "
+                  f"{result['p99_ms']:8.0f} {result['max_ms']:8.0f} {result['reruns_per_s']:9.2f} "
+                  f"{result['upstream_requests']:9d} {result['peak_rss_mb']:12.1f} {result['errors']:7d}")
+    finally:
+        server.shutdown()
+        shutil.rmtree(SCRATCH_DIR, ignore_errors=True)
+    if args.output:
+        meta = {"steps": args.steps, "rate": args.rate, "burst": args.burst, "latency": args.latency,
+                "prefetch": not args.no_prefetch, "years": len(years), "created": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        with open(args.output, "w") as fh:
+            json.dump({"meta": meta, "levels": levels}, fh, indent=2)
+    return 1 if any(result["errors"] for result in levels) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+"""Time every stage of the fetch -> parse -> transform -> render pipeline, fully offline.
+
+Fixture pages for one season per era (see ``bench.fixtures.ERAS``) are served by an
+in-process stand-in server, and all caches live in a throwaway directory::
+
+    python -m bench.fixtures                                   # optional: the real pages instead of the synthetic ones
+    python -m bench.pipeline --output bench-results.json       # measure
+    python -m bench.pipeline --baseline bench-baseline.json    # measure and compare
+
+Stages per era: ``fetch`` (HTTP only), ``parse`` (HTML to frames), ``transform`` (cleaning
+and typing), ``render`` (leaderboard, filter and chart), ``load_cold`` (``load_data`` and
+``load_league_tables`` with empty caches) and, through Streamlit's app-testing harness,
+``rerun_select`` (choosing the season in the app) and ``rerun_warm`` (a rerun once it is
+loaded). With ``--baseline`` the exit status is non-zero when a stage's median got slower
+than the baseline by more than ``--tolerance`` (and by at least ``--min-delta-ms``).
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+# Repo modules read their cache locations at import time, so point them at a scratch directory first
+SCRATCH_DIR = tempfile.mkdtemp(prefix="nba-bench-")
+os.environ["NBA_CACHE_DIR"] = SCRATCH_DIR
+
+import pandas as pd
+
+import charts
+import filters
+import http_client
+import leaderboards
+import nba_data
+import settings
+from html_tables import extract_tables
+from season_cache import SeasonCache
+from bench.fixtures import ERAS, fixture_path, season_pages
+from bench.standin import StandInServer
+
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "basketballEDA.py")
+
+
+def timed(fn, repeat, setup=None):
+    # Median and min wall time in ms; setup runs before every sample and is not timed
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {"median_ms": round(statistics.median(samples), 3), "min_ms": round(min(samples), 3), "samples": repeat}
+
+
+def fresh_caches():
+    # Empty on-disk season cache and HTTP validators, and no in-process memo, as on a cold start
+    scratch = tempfile.mkdtemp(dir=SCRATCH_DIR)
+    nba_data.season_cache = SeasonCache(os.path.join(scratch, "seasons"))
+    nba_data.clear_memos()
+    http_client.client = http_client.HttpClient(os.path.join(scratch, "http"))
+
+
+def bench_era(year, repeat):
+    league_page, per_game_page = season_pages(year)
+    bodies = {}
+    for page in (league_page, per_game_page):
+        with open(fixture_path(page), "rb") as fh:
+            bodies[page] = fh.read()
+    league_ids = list(nba_data.LEAGUE_TABLE_IDS.values())
+
+    def fetch():
+        client = http_client.HttpClient(tempfile.mkdtemp(dir=SCRATCH_DIR))
+        for page in (league_page, per_game_page):
+            client.get(settings.BASE_URL + page)
+
+    def parse():
+        extract_tables(bodies[per_game_page], ["per_game_stats"])
+        extract_tables(bodies[league_page], league_ids)
+
+    raw_players = extract_tables(bodies[per_game_page], ["per_game_stats"])["per_game_stats"]
+    raw_league = extract_tables(bodies[league_page], league_ids)
+
+    def transform():
+        nba_data.clean_player_table(raw_players)
+        for table in raw_league.values():
+            nba_data.clean_team_table(table)
+
+    players = nba_data.clean_player_table(raw_players)
+    totals = nba_data.clean_team_table(raw_league["totals-team"]) if "totals-team" in raw_league else None
+
+    def render():
+        # What one rerun of the leaderboard and player sections computes, without any cached result
+        index = filters.FilterIndex(players)
+        players[index.mask(positions=["PG", "SG"], min_games=10)]
+        board = leaderboards.Leaderboard(totals if totals is not None else players,
+                                         'Team' if totals is not None else 'Player')
+        ranked = board.rank('PTS', 10)
+        charts.render_barh(ranked[board.label_column], ranked['PTS'], 'Points', 'PTS', 'Team')
+
+    render()  # the first chart also pays for importing matplotlib, which is not what this stage measures
+
+    def load_cold():
+        nba_data.load_data(year)
+        nba_data.load_league_tables(year)
+
+    return {
+        "rows": len(players),
+        "page_bytes": sum(len(body) for body in bodies.values()),
+        "fetch": timed(fetch, repeat),
+        "parse": timed(parse, repeat),
+        "transform": timed(transform, repeat),
+        "render": timed(render, repeat),
+        "load_cold": timed(load_cold, repeat, setup=fresh_caches),
+    }
+
+
+def bench_app(year, repeat):
+    from streamlit.testing.v1 import AppTest
+
+    def rerun_select():
+        at.selectbox(key="year").select(year).run()
+        if at.exception:
+            raise RuntimeError("app failed: %s" % at.exception[0].value)
+
+    def setup():
+        nonlocal at
+        fresh_caches()
+        # Land on another season first, so the timed rerun is the one that loads this season
+        at = AppTest.from_file(APP, default_timeout=300)
+        at.session_state["year"] = ERAS["2020s"] if year != ERAS["2020s"] else ERAS["1980s"]
+        at.run()
+
+    at = None
+    results = {"rerun_select": timed(rerun_select, repeat, setup=setup)}
+    results["rerun_warm"] = timed(lambda: at.run(), repeat)
+    return results
+
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    # Print every stage against the baseline; returns the stages that regressed
+    regressions = []
+    print(f"{'era':8} {'stage':14} {'baseline ms':>12} {'now ms':>10} {'change':>8}")
+    for era, stages in results["eras"].items():
+        for stage, now in stages.items():
+            before = baseline.get("eras", {}).get(era, {}).get(stage)
+            if not isinstance(now, dict) or not isinstance(before, dict):
+                continue
+            change = now["median_ms"] / before["median_ms"] - 1 if before["median_ms"] else 0.0
+            # Stages of a few ms jitter by more than any sensible tolerance; they need an absolute slowdown too
+            slower = change > tolerance and now["median_ms"] - before["median_ms"] > min_delta_ms
+            flag = " <-- slower" if slower else ""
+            print(f"{era:8} {stage:14} {before['median_ms']:12.1f} {now['median_ms']:10.1f} {change:+8.0%}{flag}")
+            if flag:
+                regressions.append((era, stage))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--eras", nargs="+", choices=list(ERAS), default=list(ERAS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--app-repeat", type=int, default=3, help="samples of the app reruns, which are slower")
+    parser.add_argument("--no-app", action="store_true", help="skip the Streamlit reruns")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown per stage (0.25 = 25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="slowdowns smaller than this never count")
+    args = parser.parse_args()
+
+    missing = [page for era in args.eras for page in season_pages(ERAS[era]) if not os.path.exists(fixture_path(page))]
+    if missing:
+        raise SystemExit("Missing fixtures " + ", ".join(missing) + ", run `python -m bench.fixtures` first")
+
+    server = StandInServer().start()
+    settings.BASE_URL = server.base_url
+    # Stages time the work itself, not the pacing of upstream requests or background prefetches
+    http_client.rate_limiter.configure(0)
+    settings.PREFETCH = False
+    try:
+        results = {
+            "meta": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "pandas": pd.__version__,
+                "repeat": args.repeat,
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            },
+            "eras": {},
+        }
+        for era in args.eras:
+            year = ERAS[era]
+            print(f"benchmarking {era} ({year})...", file=sys.stderr)
+            stages = bench_era(year, args.repeat)
+            if not args.no_app:
+                stages.update(bench_app(year, args.app_repeat))
+            results["eras"][era] = stages
+            for stage, value in stages.items():
+                if isinstance(value, dict):
+                    print(f"  {stage:14} {value['median_ms']:10.1f} ms (min {value['min_ms']:.1f})", file=sys.stderr)
+    finally:
+        server.shutdown()
+        shutil.rmtree(SCRATCH_DIR, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+    if args.baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+        if compare(results, baseline, args.tolerance, args.min_delta_ms):
+            return 1
+    elif not args.output:
+        json.dump(results, sys.stdout, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""Check the background prefetcher against the stand-in server, offline.
+
+    python -m bench.prefetch
+
+``warm``: after a season is scheduled, its league page and both neighbouring seasons'
+player pages end up in the season cache, with those three requests and no more.
+``priority``: a foreground load started while prefetches are queued gets its rate-limit
+token without waiting behind them. ``cancel``: moving on to another season before a queued
+prefetch got its turn means that page is never requested. ``urgent``: a foreground load of
+the season being prefetched joins it instead of fetching again, and is not held back by
+background priority. ``busy``: the same for the league page being prefetched while other
+sessions' foreground requests keep the rate limit busy, which would otherwise starve the
+prefetch the session joined. Needs fixture pages for 1984-1986 and 1999-2001 (committed
+as synthetic pages, see ``bench.fixtures``); exits non-zero when a check fails.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+# Repo modules read their cache locations at import time, so point them at a scratch directory first
+SCRATCH_DIR = tempfile.mkdtemp(prefix="nba-prefetch-")
+os.environ["NBA_CACHE_DIR"] = SCRATCH_DIR
+
+import http_client
+import nba_data
+import settings
+import telemetry
+from bench.fixtures import fixture_path, season_pages
+from bench.standin import StandInServer
+from prefetch import Prefetcher
+from season_cache import SeasonCache
+
+
+YEARS = [1984, 1985, 1986, 1999, 2000, 2001]
+
+
+def fresh(server, rate, burst):
+    # Empty caches, hit counter and bucket, as on a freshly started process
+    scratch = tempfile.mkdtemp(dir=SCRATCH_DIR)
+    nba_data.season_cache = SeasonCache(os.path.join(scratch, "seasons"))
+    nba_data.clear_memos()
+    http_client.client = http_client.HttpClient(os.path.join(scratch, "http"))
+    http_client.rate_limiter.configure(rate, burst)
+    server.reset()
+    return Prefetcher()
+
+
+def wait_idle(prefetcher, timeout=60):
+    deadline = time.monotonic() + timeout
+    while prefetcher.pending() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return not prefetcher.pending()
+
+
+def drain(limiter):
+    # Use up every token, as a burst of foreground requests would
+    while limiter._tokens >= 1:
+        limiter.acquire()
+
+
+def foreground_load(year):
+    telemetry.begin_rerun()
+    nba_data.load_data(year)
+    spans = telemetry.current_rerun()
+    return (sum(span.attrs.get("wait_ms", 0) for span in spans if span.name == "throttle"),
+            next(span.attrs.get("cache") for span in spans if span.name == "load_data"))
+
+
+def check_warm(server):
+    prefetcher = fresh(server, rate=4, burst=2)
+    prefetcher.schedule(1985, owner="a")
+    idle = wait_idle(prefetcher)
+    cached = [nba_data.season_cache.has("players", 1984), nba_data.season_cache.has("players", 1986),
+              nba_data.season_cache.has("league-totals", 1985)]
+    hits = server.snapshot()
+    planned = {season_pages(1985)[0], season_pages(1984)[1], season_pages(1986)[1]}
+    print(f"warm:     1984 and 1986 players, 1985 league cached: {cached}; upstream hits {sorted(hits)}")
+    # The plan's three pages, each once; the neighbours' league pages are not prefetched
+    return idle and all(cached) and hits == dict.fromkeys(planned, 1)
+
+
+def check_priority(server):
+    prefetcher = fresh(server, rate=2, burst=3)
+    prefetcher.schedule(2000, owner="a")
+    time.sleep(0.05)
+    wait_ms, _ = foreground_load(1985)
+    wait_idle(prefetcher)
+    print(f"priority: foreground load of 1985 with 3 prefetches queued waited {wait_ms:.0f} ms for its token")
+    return wait_ms < 100
+
+
+def check_cancel(server):
+    prefetcher = fresh(server, rate=1, burst=2)
+    drain(http_client.rate_limiter)
+    prefetcher.schedule(1985, owner="a")
+    time.sleep(0.3)
+    prefetcher.schedule(2000, owner="a")
+    wait_idle(prefetcher)
+    hits = server.snapshot()
+    print(f"cancel:   after moving from 1985 to 2000, upstream hits {sorted(hits)}")
+    return not any(page in hits for page in season_pages(1985) + season_pages(1984) + season_pages(1986))
+
+
+def check_urgent(server):
+    prefetcher = fresh(server, rate=1, burst=2)
+    drain(http_client.rate_limiter)
+    prefetcher.schedule(1985, owner="a")
+    # Wait until the prefetcher holds the 1984 load, then ask for the same season in the foreground
+    while getattr(prefetcher._running, "key", None) != ("players", 1984):
+        time.sleep(0.01)
+    started = time.perf_counter()
+    _, cache = foreground_load(1984)
+    elapsed = time.perf_counter() - started
+    prefetcher.cancel()
+    wait_idle(prefetcher)
+    hits = server.snapshot().get(season_pages(1984)[1], 0)
+    print(f"urgent:   foreground 1984 load {cache} with the prefetch in {elapsed:.2f}s, page requested {hits} time(s)")
+    return cache == "coalesced" and hits == 1
+
+
+def check_busy(server):
+    prefetcher = fresh(server, rate=2, burst=2)
+    drain(http_client.rate_limiter)
+    stop = threading.Event()
+
+    def busy():
+        # Other sessions' foreground requests, one after another
+        while not stop.is_set():
+            http_client.rate_limiter.acquire()
+
+    prefetcher.schedule(1985, owner="a")
+    while getattr(prefetcher._running, "key", None) != ("league", 1985):
+        time.sleep(0.01)
+    others = [threading.Thread(target=busy, daemon=True) for _ in range(2)]
+    for thread in others:
+        thread.start()
+    started = time.perf_counter()
+    done = threading.Event()
+    threading.Thread(target=lambda: (nba_data.load_league_tables(1985), done.set()), daemon=True).start()
+    finished = done.wait(10)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    prefetcher.cancel()
+    wait_idle(prefetcher)
+    print(f"busy:     foreground 1985 league load joined the prefetch and "
+          f"{'finished in %.2fs' % elapsed if finished else 'was still blocked after 10s'} with 2 other busy sessions")
+    return finished
+
+
+def main():
+    missing = [page for year in YEARS for page in season_pages(year) if not os.path.exists(fixture_path(page))]
+    if missing:
+        raise SystemExit("Missing fixtures " + ", ".join(missing) + ", record them with `python -m bench.fixtures <pages>`")
+    settings.PREFETCH = True
+    server = StandInServer(latency=0.05).start()
+    settings.BASE_URL = server.base_url
+    try:
+        results = [check(server) for check in (check_warm, check_priority, check_cancel, check_urgent, check_busy)]
+    finally:
+        server.shutdown()
+        shutil.rmtree(SCRATCH_DIR, ignore_errors=True)
+    print("OK" if all(results) else "FAILED")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
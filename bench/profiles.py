@@ -0,0 +1,224 @@
+"""Check the player-page profile parser and the profile store's incremental refresh, offline.
+
+    python -m bench.profiles
+    python -m bench.profiles --seasons 20 --extra-tables 30
+
+``parse``: a generated player page laid out like Basketball-Reference's (bio block, the
+per-game table, the advanced table inside an HTML comment, then many other tables) must
+give back the bio fields, one row per season played (not the "Did Not Play" season), the
+Career row and the advanced table. Its parse time is shown next to a full BeautifulSoup
+parse of the same page, which is what the profile loop used to do. ``refresh``: with a
+retired and an active player stored, nothing is fetched while the current season is
+unchanged; once it has been scraped again, only the active player's page is requested.
+``outage``: while upstream answers 503 (or 429), a player with a stored copy gets it even
+if it is out of date, one without gets None that is not remembered, and once upstream is
+back the latter's page is fetched; a 404 is remembered as no profile. Headshots likewise:
+a failed download is asked for again, a missing photo (404) is not. Exits non-zero when
+a check fails.
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+# Repo modules read their cache and fixture locations at import time, so point them at a scratch directory first
+SCRATCH_DIR = tempfile.mkdtemp(prefix="nba-profiles-")
+os.environ["NBA_CACHE_DIR"] = SCRATCH_DIR
+os.environ["NBA_FIXTURE_DIR"] = os.path.join(SCRATCH_DIR, "fixtures")
+
+import pandas as pd
+
+import http_client
+import nba_data
+import profiles
+import settings
+from bench.fixtures import fixture_path
+from bench.standin import StandInServer
+from season_cache import SeasonCache
+
+
+STATS = ['G', 'GS', 'MP', 'FG', 'FGA', 'FG%', '3P', '3PA', '3P%', 'FT', 'FTA', 'FT%', 'TRB', 'AST', 'STL', 'BLK',
+         'TOV', 'PF', 'PTS']
+ADVANCED = ['G', 'MP', 'PER', 'TS%', 'USG%', 'WS', 'BPM', 'VORP']
+
+
+def _row(season, cells):
+    return (f'<tr><th data-stat="season"><a href="/leagues/NBA_{season}.html">{season - 1}-{season % 100:02d}</a></th>'
+            f'<td>{season - 1980}</td><td><a href="/teams/CLE/{season}.html">CLE</a></td><td>NBA</td><td>SF</td>'
+            + "".join(f"<td>{value}</td>" for value in cells) + "</tr>")
+
+
+def _table(table_id, columns, first, last, value, skip=None):
+    head = "<tr><th>Season</th><th>Age</th><th>Tm</th><th>Lg</th><th>Pos</th>" + "".join(f"<th>{c}</th>" for c in columns) + "</tr>"
+    body = []
+    for season in range(first, last + 1):
+        if season == skip:
+            body.append(f'<tr><th>{season - 1}-{season % 100:02d}</th><td>{season - 1980}</td>'
+                        f'<td colspan="{len(columns) + 3}">Did Not Play (injury)</td></tr>')
+        else:
+            body.append(_row(season, [value(season, c) for c in columns]))
+    foot = ('<tr><th>Career</th><td></td><td></td><td>NBA</td><td></td>'
+            + "".join(f"<td>{value(0, c)}</td>" for c in columns) + "</tr>")
+    return (f'<table id="{table_id}"><thead>{head}</thead><tbody>{"".join(body)}</tbody>'
+            f'<tfoot>{foot}</tfoot></table>')
+
+
+def player_page(name, first, last, extra_tables, skip=None):
+    # A page shaped like players/{x}/{id}.html: bio, per-game, commented advanced, then everything else
+    per_game = _table("per_game_stats", STATS, first, last, lambda s, c: f"{(s % 7) + len(c):.1f}" if s else "20.0", skip)
+    advanced = _table("advanced", ADVANCED, first, last, lambda s, c: f"{(s % 5) + 10:.1f}" if s else "15.5", skip)
+    others = "".join(_table(f"other_{i}", STATS, first, last, lambda s, c: "1.0") for i in range(extra_tables))
+    return f"""<html><head><title>{name} Stats</title></head><body>
+<div id="header"><nav>{"<a href='/x'>link</a>" * 200}</nav></div>
+<div id="info"><div id="meta"><div class="media-item"><img src="/x.jpg"></div><div>
+<h1><span>{name}</span></h1>
+<p><strong>Position:</strong> Small Forward and Power Forward <strong>&#9642;</strong> <strong>Shoots:</strong> Right</p>
+<p><span>6-9</span>,&nbsp;<span>250lb</span>&nbsp;(206cm,&nbsp;113kg)</p>
+<p><strong>Born:</strong> <span id="necro-birth" data-birth="{first - 20}-12-30">December 30, {first - 20}</span></p>
+<p><strong>College:</strong> <a href="/c">Somewhere</a></p>
+<p><strong>Draft:</strong> Cleveland Cavaliers, 1st round (1st pick, 1st overall), {first - 1} NBA Draft</p>
+<p><strong>NBA Debut:</strong> October 29, {first - 1}</p>
+<p><strong>Experience:</strong> {last - first + 1} years</p>
+</div></div></div>
+<div id="all_per_game_stats">{per_game}</div>
+<div id="all_advanced"><!--{advanced}--></div>
+<div id="all_other">{others}</div>
+</body></html>""".encode()
+
+
+def write_page(player_id, body):
+    path = fixture_path("/players/%s/%s.html" % (player_id[0], player_id))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as fh:
+        fh.write(body)
+
+
+def check_parse(body, first, last, skip, repeat):
+    profile = profiles.parse_player_page(body)
+    expected_seasons = [season for season in range(first, last + 1) if season != skip]
+    checks = {
+        "bio": profile.bio.get("Position") == "Small Forward and Power Forward" and profile.bio.get("Shoots") == "Right"
+        and profile.bio.get("Height") == "6-9" and profile.bio.get("Weight") == "250"
+        and profile.bio.get("Born") == f"{first - 20}-12-30" and profile.bio.get("Experience") == f"{last - first + 1} years",
+        "seasons": list(profile.per_game["Season"]) == expected_seasons,
+        "career": profile.career.get("PTS") == 20.0 and profile.career.get("G") == 20.0,
+        "advanced": list(profile.advanced["Season"]) == expected_seasons and float(profile.advanced["PER"].iloc[0]) == first % 5 + 10,
+        "last_season": profile.meta["last_season"] == last,
+    }
+    print("parse:    " + ", ".join(f"{name} {'ok' if ok else 'MISMATCH'}" for name, ok in checks.items()))
+    if not all(checks.values()):
+        print(profile.bio, profile.career, profile.per_game.head(), sep="\n")
+
+    def timed(fn):
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - start) * 1000)
+        return statistics.median(samples)
+
+    selective = timed(lambda: profiles.parse_player_page(body))
+    try:
+        from bs4 import BeautifulSoup
+        full = timed(lambda: BeautifulSoup(body, "lxml"))
+        print(f"          {len(body) / 1024:.0f} KB page: profile parse {selective:.1f} ms, full BeautifulSoup tree {full:.1f} ms")
+    except ImportError:
+        print(f"          {len(body) / 1024:.0f} KB page: profile parse {selective:.1f} ms")
+    return all(checks.values())
+
+
+def check_refresh(server, seasons, extra_tables):
+    current = settings.current_season()
+    players = {"retired01": (1990, 2005), "active01": (current - seasons + 1, current)}
+    for player_id, (first, last) in players.items():
+        write_page(player_id, player_page(player_id, first, last, extra_tables))
+    nba_data.season_cache = SeasonCache(os.path.join(SCRATCH_DIR, "seasons"))
+    profiles.profile_store = profiles.ProfileStore(os.path.join(SCRATCH_DIR, "profiles"))
+    profiles.profile_cache.clear()
+    # The current season was scraped before anyone opened these players
+    nba_data.season_cache.put("players", current, pd.DataFrame({"Player": ["x"]}))
+    time.sleep(0.01)
+    profiles.fetch_profiles(players)
+    first_hits = sum(server.snapshot().values())
+    server.reset()
+    profiles.fetch_profiles(players)
+    unchanged = profiles.refresh_active()
+    quiet_hits = sum(server.snapshot().values())
+    # The current season is scraped again: the active player's page is now out of date, the retired one's is not
+    time.sleep(0.01)
+    nba_data.season_cache.put("players", current, pd.DataFrame({"Player": ["x", "y"]}))
+    refreshed = profiles.refresh_active()
+    hits = server.snapshot()
+    print(f"refresh:  first open {first_hits} page(s); unchanged season {quiet_hits} request(s), refreshed {unchanged}; "
+          f"after the season update refreshed {refreshed}, upstream hits {sorted(hits)}")
+    return (first_hits == 2 and quiet_hits == 0 and not unchanged and refreshed == ["active01"]
+            and list(hits) == ["/players/a/active01.html"])
+
+
+def check_outage(server, extra_tables):
+    current = settings.current_season()
+    write_page("stored01", player_page("stored01", current - 3, current, extra_tables))
+    write_page("unseen01", player_page("unseen01", current - 3, current, extra_tables))
+    profiles.profile_cache.clear()
+    profiles.fetch_profiles(["stored01"])
+    # stored01 is now out of date, so both players would be fetched
+    time.sleep(0.01)
+    nba_data.season_cache.put("players", current, pd.DataFrame({"Player": ["x", "y", "z"]}))
+    profiles.profile_cache.clear()
+    retries, http_client.client.max_retries = http_client.client.max_retries, 0
+    try:
+        results = {}
+        for status in (503, 429):
+            server.outage = status
+            results[status] = profiles.fetch_profiles(["stored01", "unseen01"])
+            profiles.fetch_headshots(["unseen01"])
+        # A throttled or failed photo download is asked for again; a missing photo is not
+        headshot_retried = profiles.headshot_cache.get("unseen01", "retried") == "retried"
+        server.outage = None
+        server.reset()
+        back = profiles.fetch_profiles(["unseen01", "nobody01"])
+        missing = profiles.fetch_profiles(["nobody01"])
+        profiles.fetch_headshots(["unseen01"])
+        no_headshot = profiles.headshot_cache.get("unseen01", "retried") is None
+    finally:
+        server.outage = None
+        http_client.client.max_retries = retries
+    hits = server.snapshot()
+    during = all(result["stored01"] is not None and result["unseen01"] is None for result in results.values())
+    print(f"outage:   stale copy served {all(r['stored01'] is not None for r in results.values())}, "
+          f"unstored player None {all(r['unseen01'] is None for r in results.values())}; "
+          f"after recovery fetched {sorted(hits)}, 404 is None {missing['nobody01'] is None}; "
+          f"failed headshot asked again {headshot_retried}, missing headshot remembered {no_headshot}")
+    return (during and headshot_retried and no_headshot and back["unseen01"] is not None and back["nobody01"] is None and missing["nobody01"] is None
+            and hits == {"/players/u/unseen01.html": 1, "/players/n/nobody01.html": 1,
+                         "/req/202106291/images/headshots/unseen01.jpg": 1})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seasons", type=int, default=20, help="seasons on the generated career")
+    parser.add_argument("--extra-tables", type=int, default=30, help="tables after the advanced one")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    first, last = 2000, 2000 + args.seasons - 1
+    skip = first + 3
+    server = StandInServer().start()
+    settings.BASE_URL = server.base_url
+    http_client.rate_limiter.configure(0)
+    try:
+        ok = check_parse(player_page("Generated Player", first, last, args.extra_tables, skip), first, last, skip, args.repeat)
+        ok &= check_refresh(server, args.seasons, args.extra_tables)
+        ok &= check_outage(server, args.extra_tables)
+    finally:
+        server.shutdown()
+        shutil.rmtree(SCRATCH_DIR, ignore_errors=True)
+    print("OK" if ok else "FAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
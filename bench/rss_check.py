@@ -0,0 +1,78 @@
+"""Check that process memory stays flat while team leaderboard charts are rendered over and over.
+
+Simulates thousands of reruns that each ask for a leaderboard chart, with a chart cache
+small enough to keep evicting, so both fresh renders and cache hits are exercised::
+
+    python -m bench.rss_check --reruns 5000   # a render takes ~0.2 s, so budget a few minutes
+
+Exits non-zero if RSS grows by more than --max-growth-mb after the warm-up reruns.
+"""
+import argparse
+import random
+import resource
+import sys
+
+import numpy as np
+import pandas as pd
+
+import charts
+from leaderboards import Leaderboard
+from lru import LRUCache
+
+
+METRICS = ['PTS', '3P', '3P%', '2P', '2P%', 'FTA', 'FT%', 'ORB', 'DRB', 'STL', 'BLK', 'TOV', 'PF']
+
+
+def current_rss_mb():
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * resource.getpagesize() / 2 ** 20
+    except OSError:
+        # No procfs (macOS): fall back to the peak, which still catches steady growth
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def fake_season(rng):
+    teams = ['Team %d' % i for i in range(30)]
+    return pd.DataFrame({'Team': teams, **{metric: rng.uniform(0, 9000, 30).round(1) for metric in METRICS}})
+
+
+def rss_growth(reruns, seasons=20, warmup=300, report=print):
+    """RSS growth in MB from the end of the warm-up to the last of ``reruns`` leaderboard renders."""
+    # Room for a couple of dozen images, far fewer than the distinct charts requested
+    previous_cache = charts.chart_cache
+    charts.chart_cache = LRUCache(maxsize=4096, max_bytes=2 * 1024 * 1024)
+    try:
+        rng = np.random.default_rng(0)
+        boards = {year: Leaderboard(fake_season(rng), 'Team') for year in range(2000, 2000 + seasons)}
+        pick = random.Random(0)
+        baseline = None
+        for rerun in range(1, reruns + 1):
+            year = pick.choice(list(boards))
+            metric = pick.choice(METRICS)
+            charts.leaderboard_chart(year, 'totals-team', boards[year], metric, bottom=pick.random() < 0.2)
+            if rerun == warmup:
+                baseline = current_rss_mb()
+            if rerun % 500 == 0:
+                report(f"rerun {rerun:6d}: rss {current_rss_mb():7.1f} MB, cache {len(charts.chart_cache)} images "
+                       f"({charts.chart_cache.bytes / 2 ** 20:.1f} MB), hits {charts.chart_cache.hits}")
+        return current_rss_mb() - baseline
+    finally:
+        charts.chart_cache = previous_cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=1500)
+    parser.add_argument("--seasons", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=300)
+    parser.add_argument("--max-growth-mb", type=float, default=15.0)
+    args = parser.parse_args()
+
+    growth = rss_growth(args.reruns, args.seasons, args.warmup)
+    print(f"RSS growth after warm-up: {growth:.1f} MB (budget {args.max_growth_mb} MB)")
+    return 0 if growth <= args.max_growth_mb else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""Check the player-season similarity search against brute force and time it over a full history.
+
+    python -m bench.similarity
+    python -m bench.similarity --seasons 74 --players 500 --budget-ms 50
+
+Over a generated history the size of 1950-2023 (with the advanced metrics computed from
+it), ``SimilarityIndex.neighbours`` is compared for a sample of query rows with a float64
+brute force that scores every row and sorts: both must pick the same player-seasons, and
+the distances must agree to float32 precision. The timing is the median of single queries
+on the built index; the build is reported separately since the app does it once per dataset
+version. Exits non-zero when a check fails or a query is over budget.
+"""
+import argparse
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from advanced_stats import advanced_stats, team_context
+from bench.advanced_stats import generated_history
+from similarity import MIN_GAMES, SimilarityIndex, _standardize
+
+
+def generated_players(seasons, players_per_season):
+    # The generated history plus what the features need beyond it, one player per row id
+    players, totals = generated_history(seasons, players_per_season)
+    rng = np.random.default_rng(1)
+    players = players.assign(
+        Player=[f"Player {i % (len(players) // 8)}" for i in range(len(players))],
+        DRB=players['TRB'] - players['ORB'], **{'3PA': players['3P'] / 0.35},
+        **{'eFG%': (players['FG'] + 0.5 * players['3P']) / players['FGA'], 'FT%': rng.uniform(0.5, 0.95, len(players))},
+    )
+    return players.join(advanced_stats(players, team_context(totals)))
+
+
+def brute_force(frame, features, row, k):
+    # Every row scored in float64 and fully sorted
+    seasons = frame['Season'].factorize()[0]
+    vectors = np.column_stack([_standardize(frame[f].to_numpy(dtype=float), seasons) for f in features])
+    distances = np.sqrt(((vectors - vectors[row]) ** 2).sum(axis=1))
+    players = frame['Player'].to_numpy()
+    excluded = (frame['G'].to_numpy() < MIN_GAMES) | (players == players[row])
+    distances[excluded] = np.inf
+    order = np.argsort(distances, kind='stable')[:k]
+    return order, distances[order]
+
+
+def check(index, frame, queries, k):
+    ok = True
+    for row in queries:
+        rows, distances = index.neighbours([row], k)
+        expected_rows, expected = brute_force(frame, index.features, row, k)
+        same = set(rows[0]) == set(expected_rows)
+        close = np.allclose(distances[0], expected, rtol=1e-3, atol=1e-3)
+        ok &= same and close
+        if not (same and close):
+            print(f"row {row}: {sorted(rows[0])} vs brute force {sorted(expected_rows)}  MISMATCH")
+    print(f"{len(queries)} queries, k={k}: {'same neighbours and distances as brute force' if ok else 'MISMATCH'}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seasons", type=int, default=74)
+    parser.add_argument("--players", type=int, default=500, help="player rows per season")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    frame = generated_players(args.seasons, args.players)
+    start = time.perf_counter()
+    index = SimilarityIndex(frame)
+    build_ms = (time.perf_counter() - start) * 1000
+    queries = np.random.default_rng(2).integers(0, len(frame), args.repeat)
+    ok = check(index, frame, queries[:5], args.k)
+
+    samples = []
+    for row in queries:
+        start = time.perf_counter()
+        index.similar(row, args.k)
+        samples.append((time.perf_counter() - start) * 1000)
+    median = statistics.median(samples)
+    over = median > args.budget_ms
+    print(f"index: {len(frame)} player-seasons x {len(index.features)} features built in {build_ms:.0f} ms")
+    print(f"query: {args.k} nearest in {median:.1f} ms (budget {args.budget_ms:.0f} ms){'  OVER BUDGET' if over else ''}")
+    print("OK" if ok and not over else "FAILED")
+    return 0 if ok and not over else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
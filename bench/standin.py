@@ -0,0 +1,109 @@
+"""Local stand-in for basketball-reference that replays recorded fixture pages.
+
+Start it with ``python -m bench.standin --port 8765`` and point the app or the
+backfill at it with ``NBA_BASE_URL=http://127.0.0.1:8765``. Every request is
+counted and answered with an ETag, so conditional requests get a 304 like
+upstream. ``GET /__hits`` returns the counts per path as JSON and
+``POST /__hits`` resets them.
+"""
+import argparse
+import collections
+import hashlib
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bench.fixtures import fixture_path
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=b"", content_type="text/html; charset=utf-8", headers=()):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0].split("#", 1)[0]
+        if path == "/__hits":
+            body = json.dumps(self.server.snapshot()).encode()
+            return self._send(200, body, "application/json")
+        self.server.count(path)
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if self.server.outage:
+            # Every page answers with this status, like upstream throttling or down for maintenance
+            return self._send(self.server.outage, b"Unavailable")
+        try:
+            with open(fixture_path(path), "rb") as fh:
+                body = fh.read()
+        except OSError:
+            return self._send(404, b"Not Found")
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()
+        if self.headers.get("If-None-Match") == etag:
+            return self._send(304, headers=[("ETag", etag)])
+        content_type = "image/jpeg" if path.endswith(".jpg") else "text/html; charset=utf-8"
+        self._send(200, body, content_type, headers=[("ETag", etag)])
+
+    def do_POST(self):
+        if self.path == "/__hits":
+            self.server.reset()
+            return self._send(204)
+        self._send(404)
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0), latency=0.0):
+        super().__init__(address, StandInHandler)
+        self.latency = latency
+        self.outage = None  # set to a status code to fail every page with it
+        self._hits = collections.Counter()
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, path):
+        with self._lock:
+            self._hits[path] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._hits)
+
+    def reset(self):
+        with self._lock:
+            self._hits.clear()
+
+    def start(self):
+        # Serve from a daemon thread so benchmarks and load tests can drive it in-process
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    args = parser.parse_args()
+    server = StandInServer((args.host, args.port), latency=args.latency)
+    print(f"Serving fixtures from {os.path.dirname(fixture_path('/x'))} on {server.base_url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
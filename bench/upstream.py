@@ -0,0 +1,128 @@
+"""Check request coalescing and the upstream rate limit against the stand-in server, offline.
+
+    python -m bench.upstream
+    python -m bench.upstream --sessions 50 --rate 4 --burst 2
+
+``coalesce``: ``--sessions`` threads load the same season at once, as when everyone
+opens a freshly published season; the stand-in must see each page exactly once.
+``rate limit``: one thread per recorded page fetches it at the same moment; the pages
+must go out no faster than ``--rate`` per second after the first ``--burst``. Prints the
+stand-in's hit counts, the wait per request and the deepest queue seen, and exits non-zero
+when either check fails. Uses the pages recorded by ``python -m bench.fixtures``.
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+# Repo modules read their cache locations at import time, so point them at a scratch directory first
+SCRATCH_DIR = tempfile.mkdtemp(prefix="nba-upstream-")
+os.environ["NBA_CACHE_DIR"] = SCRATCH_DIR
+
+import http_client
+import nba_data
+import settings
+import telemetry
+from bench.fixtures import ERAS, fixture_path, season_pages
+from bench.standin import StandInServer
+
+
+def run_together(count, target):
+    # Starts `count` threads that all call target(i) at the same moment; returns their results in order
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def worker(i):
+        barrier.wait()
+        results[i] = target(i)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def check_coalescing(server, year, sessions):
+    server.reset()
+    http_client.rate_limiter.configure(0)
+
+    def open_season(i):
+        telemetry.begin_rerun()
+        nba_data.load_data(year)
+        nba_data.load_league_tables(year)
+        return [span.attrs.get("cache") for span in telemetry.current_rerun() if span.name == "load_data"]
+
+    results = run_together(sessions, open_season)
+    hits = server.snapshot()
+    coalesced = sum(result.count("coalesced") for result in results)
+    print(f"coalesce:   {sessions} sessions loading {year}: upstream hits {hits}, {coalesced} sessions shared a load")
+    return all(hits.get(page) == 1 for page in season_pages(year))
+
+
+def check_rate_limit(server, pages, rate, burst):
+    server.reset()
+    http_client.rate_limiter.configure(rate, burst)
+    peak = [0]
+    done = threading.Event()
+
+    def watch_queue():
+        while not done.is_set():
+            peak[0] = max(peak[0], http_client.rate_limiter.waiting)
+            time.sleep(0.005)
+
+    def fetch(i):
+        telemetry.begin_rerun()
+        http_client.get(settings.BASE_URL + pages[i])
+        return sum(span.attrs["wait_ms"] for span in telemetry.current_rerun() if span.name == "throttle")
+
+    watcher = threading.Thread(target=watch_queue)
+    watcher.start()
+    started = time.perf_counter()
+    waits = run_together(len(pages), fetch)
+    elapsed = time.perf_counter() - started
+    done.set()
+    watcher.join()
+
+    hits = sum(server.snapshot().values())
+    floor = max(len(pages) - http_client.rate_limiter.burst, 0) / rate
+    print(f"rate limit: {hits} requests in {elapsed:.2f}s at {rate}/s with a burst of {http_client.rate_limiter.burst} "
+          f"(at least {floor:.2f}s expected)")
+    print(f"            wait per request: median {statistics.median(waits):.0f} ms, max {max(waits):.0f} ms; "
+          f"deepest queue {peak[0]}")
+    # The token reservations are exact; allow a little for the clock
+    return hits == len(pages) and elapsed >= floor * 0.95
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--rate", type=float, default=4.0)
+    parser.add_argument("--burst", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds the stand-in takes per page")
+    args = parser.parse_args()
+
+    pages = [page for year in ERAS.values() for page in season_pages(year) if os.path.exists(fixture_path(page))]
+    if not pages:
+        raise SystemExit("No fixtures recorded, run `python -m bench.fixtures` first")
+
+    server = StandInServer(latency=args.latency).start()
+    settings.BASE_URL = server.base_url
+    try:
+        year = next(year for year in ERAS.values() if all(page in pages for page in season_pages(year)))
+        ok = check_coalescing(server, year, args.sessions)
+        ok &= check_rate_limit(server, pages, args.rate, args.burst)
+    finally:
+        server.shutdown()
+        shutil.rmtree(SCRATCH_DIR, ignore_errors=True)
+    print("OK" if ok else "FAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
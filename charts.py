@@ -0,0 +1,241 @@
+import hashlib
+import io
+import json
+import os
+import threading
+
+import settings
+import telemetry
+from lru import LRUCache
+
+
+# Rendered chart images kept per process; evicts by total image size, not just count
+CHART_CACHE_BYTES = int(os.environ.get("NBA_CHART_CACHE_BYTES", 64 * 1024 * 1024))
+
+chart_cache = LRUCache(maxsize=4096, max_bytes=CHART_CACHE_BYTES)
+
+# Where prerender.py writes chart files and their manifest
+PRERENDERED_DIR = os.environ.get("NBA_CHART_DIR", os.path.join(settings.CACHE_DIR, "charts"))
+
+# image_format of a chart the browser draws from a Vega-Lite spec instead of an image rendered here
+VEGA_LITE = "vega-lite"
+
+# Bar colour matplotlib uses when none is given, so both backends draw the same chart
+DEFAULT_COLOR = "#1f77b4"
+
+# Each option lists the team totals charts it shows: (metric, title, x label, color, value format)
+TEAM_LEADERBOARDS = {
+    "Top 10 Total Points scored by Team": [
+        ('PTS', 'Top 10 Teams with the Highest Total Points (PTS)', 'Total Points (PTS)', None, "{:.0f}")],
+    "Top 10 Total and Conversion Rate of 3P per Team": [
+        ('3P', 'Top 10 Teams with the Most 3-Point Field Goals (3P)', '3-Point Field Goals (3P)', 'skyblue', "{:.0f}"),
+        ('3P%', 'Top 10 Teams with the Highest 3-Point Field Goal Percentage (3P%)', '3-Point Field Goal Percentage (3P%)', 'lightcoral', "{:.2f}")],
+    "Top 10 Total And Conversion Rate of 2P per Team": [
+        ('2P', 'Top 10 Teams with the Most 2-Point Field Goals (2P)', '2-Point Field Goals (2P)', 'lightgreen', "{:.0f}"),
+        ('2P%', 'Top 10 Teams with the Highest 2-Point Field Goal Percentage (2P%)', '2-Point Field Goal Percentage (2P%)', 'lightcoral', "{:.2f}")],
+    "Top 10 Total and Conversion Rate of FTA and FT% per Team": [
+        ('FTA', 'Top 10 Teams with the Most Free Throws Attempt (FTA)', 'Free Throws Attempt (FTA)', 'lightgreen', "{:.0f}"),
+        ('FT%', 'Top 10 Teams with the Highest Free Throw Conversion (FT%)', 'Free Throw Conversion (FT%)', 'lightcoral', "{:.2f}")],
+    "Top 10 Total ORB AND DRB per Team": [
+        ('ORB', 'Top 10 Teams with the Highest Offensive Rebounds (ORB)', 'Offensive Rebound (ORB)', 'lightgreen', "{:.0f}"),
+        ('DRB', 'Top 10 Teams with the Highest Defensive Rebounds (DRB)', 'Defensive Rebound (DRB)', 'lightcoral', "{:.0f}")],
+    "Top 10 Total STL BLK per Team": [
+        ('STL', 'Top 10 Teams with the Highest Steals (STL)', 'Steal (STL)', 'lightgreen', "{:.0f}"),
+        ('BLK', 'Top 10 Teams with the Highest Blocks (BLK)', 'Block (BLK)', 'lightcoral', "{:.0f}")],
+    "Top 10 Total TOV AND PF per Team": [
+        ('TOV', 'Top 10 Teams with the Highest Turnovers (TOV)', 'Turnover (TOV)', 'lightgreen', "{:.0f}"),
+        ('PF', 'Top 10 Teams with the Highest Personal Fouls (PF)', 'Personal Foul (PF)', 'lightcoral', "{:.0f}")],
+}
+BOTTOM_TEAM_POINTS = "Bottom 10 Total Points scored by Team"
+BOTTOM_TEAM_CHARTS = [('PTS', 'Bottom 10 Teams with the Lowest Total Points (PTS)', 'Total Points (PTS)', None, "{:.0f}")]
+
+
+def team_charts(option):
+    return BOTTOM_TEAM_CHARTS if option == BOTTOM_TEAM_POINTS else TEAM_LEADERBOARDS[option]
+
+
+def render_barh(labels, values, title, xlabel, ylabel, color=None, value_format="{:.0f}", image_format="png"):
+    # matplotlib is only imported on a cache miss. The Figure is created without pyplot, so it is
+    # never registered in pyplot's global figure list, and it is cleared once the bytes are out.
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(12, 6))
+    FigureCanvasAgg(fig)
+    try:
+        ax = fig.add_subplot()
+        bars = ax.barh(labels, values, color=color)
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(ylabel)
+        ax.set_title(title)
+
+        # Annotate the values
+        offset = max(values, default=0) * 0.005
+        for bar in bars:
+            ax.text(bar.get_width() + offset, bar.get_y() + bar.get_height() / 2, value_format.format(bar.get_width()), va='center')
+
+        ax.grid(False)
+        fig.tight_layout()
+        buf = io.BytesIO()
+        fig.savefig(buf, format=image_format)
+        return buf.getvalue()
+    finally:
+        fig.clear()
+
+
+def app_format():
+    # What the app's leaderboard charts are produced as, per NBA_CHART_BACKEND
+    return VEGA_LITE if settings.CHART_BACKEND == VEGA_LITE else "png"
+
+
+def _d3_format(value_format):
+    # "{:.2f}" -> ".2f": the same number format in the d3-format syntax Vega-Lite uses
+    return value_format.strip("{}").lstrip(":")
+
+
+def _number(value):
+    # JSON has no NaN; a missing value is drawn as no bar
+    value = float(value)
+    return None if value != value else value
+
+
+def barh_spec(labels, values, title, xlabel, ylabel, color=None, value_format="{:.0f}"):
+    """Vega-Lite spec, data included, of the chart ``render_barh`` draws: same bars, order, labels and values."""
+    # barh draws the first label at the bottom
+    rows = [{"label": str(label), "value": _number(value)} for label, value in zip(labels, values)][::-1]
+    return {
+        "title": title,
+        "data": {"values": rows},
+        "height": {"step": 28},
+        "encoding": {
+            "y": {"field": "label", "type": "nominal", "sort": None, "title": ylabel},
+            "x": {"field": "value", "type": "quantitative", "title": xlabel},
+        },
+        "layer": [
+            {"mark": {"type": "bar", "color": color or DEFAULT_COLOR}},
+            {"mark": {"type": "text", "align": "left", "dx": 3},
+             "encoding": {"text": {"field": "value", "type": "quantitative", "format": _d3_format(value_format)}}},
+        ],
+    }
+
+
+def grouped_bar_spec(rows, order, title, ylabel="Performance Metrics", value_format="{:.2f}"):
+    """Vega-Lite spec of a grouped bar chart from long-format ``rows`` of (group, series, value), one group per x position."""
+    values = [{"group": str(group), "series": str(series), "value": _number(value)} for group, series, value in rows]
+    return {
+        "title": title,
+        "data": {"values": values},
+        "width": "container",
+        "encoding": {
+            "x": {"field": "group", "type": "nominal", "sort": [str(group) for group in order], "title": None,
+                  "axis": {"labelAngle": 0}},
+            "xOffset": {"field": "series", "type": "nominal"},
+            "y": {"field": "value", "type": "quantitative", "title": ylabel},
+            "color": {"field": "series", "type": "nominal", "title": None},
+        },
+        "layer": [
+            {"mark": "bar"},
+            {"mark": {"type": "text", "dy": -6},
+             "encoding": {"text": {"field": "value", "type": "quantitative", "format": _d3_format(value_format)}}},
+        ],
+    }
+
+
+def render_chart(labels, values, title, xlabel, ylabel, color=None, value_format="{:.0f}", image_format="png"):
+    # Chart bytes in ``image_format``: an image drawn here, or the JSON of a Vega-Lite spec
+    if image_format == VEGA_LITE:
+        return json.dumps(barh_spec(labels, values, title, xlabel, ylabel, color, value_format)).encode()
+    return render_barh(labels, values, title, xlabel, ylabel, color, value_format, image_format)
+
+
+class ChartAssets:
+    """Chart files rendered ahead of time, listed in ``manifest.json`` by the digest of their chart key.
+
+    The manifest is re-read whenever prerender.py replaces it, so new files are picked up
+    without a restart. A file only matches a chart whose data fingerprint is unchanged.
+    """
+
+    def __init__(self, root=PRERENDERED_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        self._charts = {}
+        self._mtime = None
+
+    def manifest_path(self):
+        return os.path.join(self.root, "manifest.json")
+
+    def _entries(self):
+        try:
+            mtime = os.stat(self.manifest_path()).st_mtime_ns
+        except OSError:
+            return {}
+        with self._lock:
+            if mtime != self._mtime:
+                try:
+                    with open(self.manifest_path()) as fh:
+                        self._charts = json.load(fh)["charts"]
+                except (OSError, ValueError, KeyError):
+                    self._charts = {}
+                self._mtime = mtime
+            return self._charts
+
+    def get(self, digest):
+        entry = self._entries().get(digest)
+        if entry is None:
+            return None
+        try:
+            with open(os.path.join(self.root, entry["file"]), "rb") as fh:
+                return fh.read()
+        except OSError:
+            return None
+
+
+assets = ChartAssets()
+
+
+def chart_key(season, table, board, metric, n=10, bottom=False,
+              title='', xlabel='', ylabel='Team', color=None, value_format="{:.0f}", image_format="png"):
+    # The board's fingerprint changes with its data, so a refreshed in-progress season never reuses a stale image
+    return (int(season), table, metric, n, bottom, title, xlabel, ylabel, color, value_format, image_format,
+            board.fingerprint)
+
+
+def key_digest(key):
+    # Stable across processes, so the batch renderer and the app name the same chart the same way
+    return hashlib.sha1(repr(key).encode()).hexdigest()[:24]
+
+
+def leaderboard_chart(season, table, board, metric, n=10, bottom=False,
+                      title='', xlabel='', ylabel='Team', color=None, value_format="{:.0f}", image_format="png"):
+    """Bytes of a top/bottom-n horizontal bar chart of ``metric`` from a Leaderboard, rendered once per input.
+
+    An image for ``"png"``/``"svg"``; for ``VEGA_LITE``, the JSON of a spec the browser draws.
+    """
+    key = chart_key(season, table, board, metric, n, bottom, title, xlabel, ylabel, color, value_format, image_format)
+    with telemetry.span("render", chart=metric, cache="hit") as span:
+        image = chart_cache.get(key)
+        if image is None:
+            image = assets.get(key_digest(key))
+            if image is not None:
+                span.set(cache="prerendered")
+            else:
+                span.set(cache="miss")
+                ranked = board.rank(metric, n, bottom)
+                image = render_chart(ranked[board.label_column], ranked[metric], title, xlabel, ylabel, color, value_format, image_format)
+            chart_cache.put(key, image)
+        span.set(bytes=len(image))
+        return image
+
+
+def custom_chart_args(board, metric, n, bottom, source):
+    # Title and value format of a custom leaderboard chart
+    title = ('Bottom ' if bottom else 'Top ') + str(n) + ' by ' + metric + ' (' + source + ')'
+    # Rates and per-game numbers need decimals, totals do not
+    value_format = "{:.2f}" if board.rank(metric, n, bottom)[metric].abs().max() < 10 else "{:.0f}"
+    return title, value_format
+
+
+def custom_leaderboard_chart(season, table, board, metric, n, bottom, source, ylabel, image_format="png"):
+    title, value_format = custom_chart_args(board, metric, n, bottom, source)
+    return leaderboard_chart(season, table, board, metric, n, bottom, title=title, xlabel=metric, ylabel=ylabel,
+                             value_format=value_format, image_format=image_format)
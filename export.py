@@ -0,0 +1,127 @@
+import io
+import tempfile
+import zlib
+
+import pandas as pd
+
+import telemetry
+
+
+# Rows converted per step, so no single intermediate string or buffer grows with the export
+CHUNK_ROWS = 20000
+
+
+class _ChunkSink(io.RawIOBase):
+    # Write-only file object that hands what pyarrow writes back to the generator driving it
+    def __init__(self):
+        self.buffer = bytearray()
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.buffer += data
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        return data
+
+
+def _plain(frame):
+    # Categories differ from season to season; plain columns keep one schema across the whole export
+    categorical = [c for c in frame.columns if isinstance(frame[c].dtype, pd.CategoricalDtype)]
+    return frame.astype({c: object for c in categorical}) if categorical else frame
+
+
+def _slices(frames):
+    rows, empty = 0, None
+    for frame in frames:
+        if empty is None:
+            empty = frame.iloc[:0]
+        rows += len(frame)
+        for start in range(0, len(frame), CHUNK_ROWS):
+            yield _plain(frame.iloc[start:start + CHUNK_ROWS])
+    # No rows at all: one empty slice still gives the CSV its header and the Arrow files their schema
+    if not rows and empty is not None:
+        yield _plain(empty)
+
+
+def iter_csv(frames):
+    header = True
+    for chunk in _slices(frames):
+        yield chunk.to_csv(index=False, header=header).encode()
+        header = False
+
+
+def iter_csv_gzip(frames):
+    compressor = zlib.compressobj(wbits=31)  # gzip container
+    for data in iter_csv(frames):
+        compressed = compressor.compress(data)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def _iter_arrow(frames, open_writer, write):
+    import pyarrow as pa
+
+    sink = _ChunkSink()
+    writer = None
+    schema = None
+    for chunk in _slices(frames):
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            # A column that is entirely missing in the first slice (e.g. ids in an early season) would
+            # otherwise be typed null and reject later values
+            schema = pa.schema([pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f for f in table.schema],
+                               metadata=table.schema.metadata)
+            writer = open_writer(sink, schema)
+        write(writer, table.cast(schema))
+        data = sink.drain()
+        if data:
+            yield data
+    if writer is not None:
+        writer.close()
+    yield sink.drain()
+
+
+def iter_parquet(frames):
+    import pyarrow.parquet as pq
+    return _iter_arrow(frames, pq.ParquetWriter, lambda writer, table: writer.write_table(table))
+
+
+def iter_arrow_ipc(frames):
+    import pyarrow as pa
+    return _iter_arrow(frames, pa.ipc.new_file, lambda writer, table: writer.write_table(table))
+
+
+# Label -> (file extension, MIME type, chunk generator)
+FORMATS = {
+    "CSV": (".csv", "text/csv", iter_csv),
+    "CSV (gzip)": (".csv.gz", "application/gzip", iter_csv_gzip),
+    "Parquet": (".parquet", "application/vnd.apache.parquet", iter_parquet),
+    "Arrow IPC": (".arrow", "application/vnd.apache.arrow.file", iter_arrow_ipc),
+}
+
+
+def iter_export(frames, fmt):
+    """Yield the export of ``frames`` (an iterable of DataFrames sharing columns) as byte chunks."""
+    return FORMATS[fmt][2](frames)
+
+
+def spool(chunks, max_memory=8 * 1024 * 1024):
+    """Collect chunks into a temporary file that only spills to disk once it is large; rewound for reading."""
+    fh = tempfile.SpooledTemporaryFile(max_size=max_memory)
+    with telemetry.span("export") as span:
+        for chunk in chunks:
+            fh.write(chunk)
+        span.set(bytes=fh.tell())
+    fh.seek(0)
+    return fh
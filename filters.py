@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+import telemetry
+from lru import LRUCache
+from shared_dataset import column_codes, column_values, to_pandas
+
+
+POSITIONS = ['C', 'PF', 'SF', 'PG', 'SG']
+
+# Older seasons list players as plain guards/forwards; they match both specific positions
+POSITION_ALIASES = {'G': ('PG', 'SG'), 'F': ('SF', 'PF')}
+
+_indexes = LRUCache(maxsize=128)
+
+
+def _positions_of(label):
+    positions = set()
+    for part in str(label).split('-'):
+        positions.update(POSITION_ALIASES.get(part, (part,)))
+    return positions
+
+
+class FilterIndex:
+    """Precomputed boolean masks over one player frame, answering combined filters by intersection.
+
+    Each team and each position gets a mask over the rows, built once from the categorical
+    codes; a multi-position player such as ``PG-SG`` is set in both masks. A query ORs the
+    masks of the chosen teams, ORs those of the chosen positions, ANDs both together with
+    the games/minutes thresholds, and never touches the string columns.
+    """
+
+    def __init__(self, frame):
+        self.rows = len(frame)
+        self.team_masks = self._masks(*column_codes(frame, 'Tm'), lambda team: (team,))
+        self.position_masks = self._masks(*column_codes(frame, 'Pos'), _positions_of)
+        self.games = column_values(frame, 'G')
+        self.minutes = column_values(frame, 'MP')
+
+    def _masks(self, codes, categories, keys_of):
+        masks = {}
+        for code, label in enumerate(categories):
+            hit = codes == code
+            for key in keys_of(label):
+                masks[key] = masks[key] | hit if key in masks else hit
+        return masks
+
+    def _any(self, masks, keys):
+        mask = np.zeros(self.rows, dtype=bool)
+        for key in keys:
+            if key in masks:
+                mask |= masks[key]
+        return mask
+
+    def mask(self, teams=None, positions=None, min_games=None, min_minutes=None):
+        mask = np.ones(self.rows, dtype=bool)
+        if teams is not None:
+            mask &= self._any(self.team_masks, teams)
+        if positions is not None:
+            mask &= self._any(self.position_masks, positions)
+        # NaN compares False, so players without a recorded value drop out once a threshold is set
+        if min_games:
+            mask &= self.games >= min_games
+        if min_minutes:
+            mask &= self.minutes >= min_minutes
+        return mask
+
+
+def filter_index(key, frame, fingerprint=None):
+    """Cached FilterIndex for ``frame``; ``key`` names the data, e.g. the season.
+
+    ``frame`` may be a ``pyarrow.Table`` such as the shared all-seasons dataset; pass its
+    version as ``fingerprint`` then, as Arrow tables are not hashed.
+    """
+    if fingerprint is None:
+        fingerprint = int(pd.util.hash_pandas_object(frame, index=False).sum())
+    cache_key = (key, fingerprint)
+    index = _indexes.get(cache_key)
+    if index is None:
+        telemetry.annotate(cache="miss")
+        index = FilterIndex(frame)
+        _indexes.put(cache_key, index)
+    return index
+
+
+def select(frame, key, teams=None, positions=None, min_games=None, min_minutes=None, fingerprint=None):
+    with telemetry.span("filter", cache="hit") as span:
+        mask = filter_index(key, frame, fingerprint).mask(teams, positions, min_games, min_minutes)
+        # From an Arrow table only the selected rows are copied out into pandas
+        selected = frame[mask] if isinstance(frame, pd.DataFrame) else to_pandas(frame.filter(mask))
+        span.set(rows=len(selected))
+        return selected
+
+
+def count(frame, key, teams=None, positions=None, min_games=None, min_minutes=None, fingerprint=None):
+    # Rows select() would return, from the cached masks without copying any of them
+    with telemetry.span("filter", cache="hit"):
+        return int(filter_index(key, frame, fingerprint).mask(teams, positions, min_games, min_minutes).sum())
+
+
+def select_by_season(frame, key, teams=None, positions=None, min_games=None, min_minutes=None, fingerprint=None):
+    """Like ``select``, but yields the selected rows one season at a time, in stored order.
+
+    Only one season's selected rows are copied out of an Arrow table at once, so a consumer
+    such as the export holds a season rather than the whole history.
+    """
+    with telemetry.span("filter", cache="hit"):
+        mask = filter_index(key, frame, fingerprint).mask(teams, positions, min_games, min_minutes)
+    seasons = column_values(frame, 'Season')
+    # Runs of one season: the stored history is concatenated season by season
+    starts = np.flatnonzero(seasons[1:] != seasons[:-1]) + 1
+    for start, end in zip(np.r_[0, starts], np.r_[starts, len(seasons)]):
+        if not mask[start:end].any():
+            continue
+        if isinstance(frame, pd.DataFrame):
+            yield frame.iloc[start:end][mask[start:end]]
+        else:
+            yield to_pandas(frame.slice(start, end - start).filter(mask[start:end]))
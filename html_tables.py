@@ -0,0 +1,157 @@
+import copy
+import re
+
+import pandas as pd
+from lxml import etree, html
+
+
+CHUNK_SIZE = 64 * 1024
+
+# Links whose target identifies the row's player or team, e.g. /players/j/jamesle01.html or /teams/BOS/2023.html
+_ID_LINK = re.compile(r"/(players|teams)/(?:[a-z]/)?([A-Za-z0-9]+)(?:/|\.html)")
+
+# Rows basketball-reference repeats inside a table body (mid-table headers, spacer rows)
+_SKIP_ROW_CLASSES = ("thead", "over_header", "spacer")
+
+
+def _text(element):
+    return "".join(element.itertext()).strip()
+
+
+def _row_class(tr):
+    return tr.get("class") or ""
+
+
+def _header(table):
+    rows = [tr for tr in table.iterfind("thead/tr") if "over_header" not in _row_class(tr)]
+    if not rows:
+        rows = table.xpath(".//tr[th][1]")
+    names = []
+    for i, cell in enumerate(rows[-1].xpath("th|td") if rows else []):
+        name = _text(cell)
+        names.append(name if name else "Unnamed: " + str(i))
+    return names
+
+
+def _typed(values):
+    series = pd.Series(values, dtype=object)
+    series = series.where(series != "")
+    numeric = pd.to_numeric(series.str.replace(",", "", regex=False), errors="coerce")
+    # A column is numeric only if every non-empty cell parsed as a number
+    if numeric.notna().sum() == series.notna().sum():
+        return numeric
+    return series
+
+
+def _row_ids(cells):
+    # The canonical slugs basketball-reference keys its pages on, captured as player_id / team_id
+    ids = {}
+    for cell in cells:
+        player_id = cell.get("data-append-csv")
+        if player_id:
+            ids.setdefault("player_id", player_id)
+            continue
+        for link in cell.iterfind("a"):
+            match = _ID_LINK.search(link.get("href") or "")
+            if match:
+                ids.setdefault(match.group(1)[:-1] + "_id", match.group(2))
+    return ids
+
+
+def table_to_frame(table):
+    columns = _header(table)
+    rows = []
+    row_ids = []
+    for tr in table.xpath("tbody/tr|tfoot/tr|tr"):
+        if any(cls in _row_class(tr).split() for cls in _SKIP_ROW_CLASSES):
+            continue
+        cells = tr.xpath("th|td")
+        if not cells:
+            continue
+        row = []
+        for cell in cells:
+            row.extend([_text(cell)] * int(cell.get("colspan", 1)))
+        rows.append(row[:len(columns)] + [""] * (len(columns) - len(row)))
+        row_ids.append(_row_ids(cells))
+    data = {}
+    for i, name in enumerate(columns):
+        data[name] = _typed([row[i] for row in rows])
+    for name in ("player_id", "team_id"):
+        if any(name in ids for ids in row_ids):
+            data[name] = pd.Series([ids.get(name) for ids in row_ids], dtype=object)
+    return pd.DataFrame(data)
+
+
+def _iter_chunks(source, chunk_size):
+    if isinstance(source, (bytes, bytearray)):
+        for start in range(0, len(source), chunk_size):
+            yield bytes(source[start:start + chunk_size])
+    else:
+        yield from source
+
+
+def extract_tables(source, table_ids, chunk_size=CHUNK_SIZE, encoding="utf-8"):
+    """Pull the tables with the given ids out of an HTML document in one streaming pass.
+
+    ``source`` is the page as bytes or as an iterable of byte chunks (e.g. a streamed
+    response). Each entry of ``table_ids`` is an id or a tuple of alternative ids; the
+    first alternative found wins. Reading stops as soon as every entry is satisfied, and
+    tables basketball-reference ships inside HTML comments are found too. Returns a dict
+    from the found id to a DataFrame with numeric columns already converted.
+    """
+    return extract_page(source, table_ids, (), chunk_size, encoding)[0]
+
+
+def extract_page(source, table_ids, block_ids=(), chunk_size=CHUNK_SIZE, encoding="utf-8"):
+    """``extract_tables`` that also keeps the elements with the ids in ``block_ids`` (e.g. a bio ``div``).
+
+    Returns (tables by id, detached lxml elements by id); reading stops once every table
+    entry and every block has been found.
+    """
+    groups = [(t,) if isinstance(t, str) else tuple(t) for t in table_ids]
+    wanted = {table_id for group in groups for table_id in group}
+    blocks_wanted = set(block_ids)
+    found = {}
+    blocks = {}
+    comment_pattern = re.compile(r'<table[^>]+id="(%s)"' % "|".join(map(re.escape, wanted))) if wanted else None
+
+    def done():
+        return (all(any(table_id in found for table_id in group) for group in groups)
+                and blocks_wanted <= blocks.keys())
+
+    parser = etree.HTMLPullParser(events=("start", "end", "comment"), encoding=encoding)
+    open_targets = 0
+    for chunk in _iter_chunks(source, chunk_size):
+        parser.feed(chunk)
+        for event, element in parser.read_events():
+            if event == "comment":
+                text = element.text or ""
+                if comment_pattern is not None and comment_pattern.search(text):
+                    for table in html.fragment_fromstring(text, create_parent="div").iter("table"):
+                        table_id = table.get("id")
+                        if table_id in wanted and table_id not in found:
+                            found[table_id] = table_to_frame(table)
+            elif element.tag == "table" and element.get("id") in wanted:
+                if event == "start":
+                    open_targets += 1
+                else:
+                    open_targets -= 1
+                    if element.get("id") not in found:
+                        found[element.get("id")] = table_to_frame(element)
+                    element.clear()
+            elif element.get("id") in blocks_wanted:
+                # Children are kept while the block is open, then the block is copied out of the tree
+                if event == "start":
+                    open_targets += 1
+                else:
+                    open_targets -= 1
+                    blocks.setdefault(element.get("id"), copy.deepcopy(element))
+                    element.clear()
+            elif event == "end" and element.tag in ("div", "table") and not open_targets:
+                # Keep memory flat on multi-megabyte pages: nothing below here is needed any more
+                element.clear()
+        if done():
+            break
+    else:
+        parser.close()
+    return found, blocks
@@ -0,0 +1,266 @@
+import collections
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import settings
+import telemetry
+from season_cache import atomic_write
+from singleflight import Cancelled, SingleFlight
+
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# How often a background request waiting for an idle moment looks at the bucket again
+IDLE_POLL = 0.05
+
+_local = threading.local()
+
+
+@contextmanager
+def background(job):
+    """Send this thread's requests at background priority on behalf of ``job``.
+
+    ``job.cancelled()`` and ``job.urgent()`` are polled while a request waits for its turn:
+    a cancelled job raises ``Cancelled``, an urgent one (a foreground caller is now waiting
+    for its result) queues like any foreground request from then on.
+    """
+    previous = getattr(_local, "job", None)
+    _local.job = job
+    try:
+        yield job
+    finally:
+        _local.job = previous
+
+
+class TokenBucket:
+    """Caps requests at ``rate`` per second on average, allowing bursts of up to ``burst``.
+
+    ``acquire()`` reserves the next token under the lock and sleeps outside it, so waiting
+    callers are served in arrival order. ``waiting`` is how many are asleep right now.
+    Background requests never reserve ahead: they take a token only while nobody is
+    waiting and one more is left for the next foreground request. That needs room for two
+    tokens, so a smaller ``burst`` is raised to ``MIN_BURST``.
+    """
+
+    MIN_BURST = 2
+
+    def __init__(self, rate, burst=MIN_BURST):
+        self._lock = threading.Lock()
+        self.waiting = 0
+        self.configure(rate, burst)
+
+    def configure(self, rate, burst=None):
+        with self._lock:
+            self.rate = rate
+            self.burst = max(burst if burst is not None else self.burst, self.MIN_BURST)
+            self._tokens = float(self.burst)
+            self._stamp = time.monotonic()
+
+    def acquire(self, job=None):
+        """Take one token, sleeping until it is available; returns the seconds waited."""
+        if job is not None:
+            waited = self._acquire_idle(job)
+            if waited is not None:
+                return waited
+        with self._lock:
+            if self.rate <= 0:
+                return 0.0
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            if wait:
+                self.waiting += 1
+        if wait:
+            try:
+                time.sleep(wait)
+            finally:
+                with self._lock:
+                    self.waiting -= 1
+        return wait
+
+    def _acquire_idle(self, job):
+        # Seconds waited for a spare token, or None once the job turned urgent and should queue normally
+        start = time.monotonic()
+        while True:
+            if job.urgent():
+                return None
+            with self._lock:
+                if self.rate <= 0:
+                    return 0.0
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                # The token taken plus one always kept for the foreground
+                if not self.waiting and self._tokens >= 2:
+                    self._tokens -= 1
+                    return now - start
+            if job.cancelled():
+                raise Cancelled(job)
+            time.sleep(IDLE_POLL)
+
+
+# One budget for everything this process sends upstream, whichever client or session sends it
+rate_limiter = TokenBucket(settings.UPSTREAM_RATE, settings.UPSTREAM_BURST)
+
+
+class HostStats:
+    def __init__(self):
+        self.requests = 0
+        self.not_modified = 0
+        self.retries = 0
+        self.errors = 0
+        self.bytes = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def as_dict(self):
+        stats = dict(vars(self))
+        stats["latency_avg"] = self.latency_total / self.requests if self.requests else 0.0
+        return stats
+
+
+class ValidatorStore:
+    # Last body and ETag/Last-Modified seen per URL, so unchanged pages can be revalidated with a 304
+    def __init__(self, root):
+        self.root = root
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode()).hexdigest()
+        base = os.path.join(self.root, key[:2], key)
+        return base + ".json", base + ".body"
+
+    def get(self, url):
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path) as fh:
+                meta = json.load(fh)
+            with open(body_path, "rb") as fh:
+                return meta, fh.read()
+        except (OSError, ValueError):
+            return None, None
+
+    def put(self, url, response):
+        meta = {name: response.headers[header] for name, header in
+                (("etag", "ETag"), ("last_modified", "Last-Modified")) if header in response.headers}
+        if not meta:
+            return
+        meta_path, body_path = self._paths(url)
+        # Body first: a meta file must never point at a body that is not there yet
+        atomic_write(body_path, response.content)
+        atomic_write(meta_path, json.dumps(meta).encode())
+
+
+class HttpClient:
+    """Shared fetch layer for every scrape: pooled keep-alive connections, conditional
+    revalidation, jittered exponential backoff on 429/5xx and per-host counters.
+
+    Concurrent ``get`` calls for the same URL share one request, and every request,
+    retries included, first takes a token from the process-wide ``rate_limiter``."""
+
+    def __init__(self, cache_dir=None, timeout=(5, 30), max_retries=4, backoff=0.5, max_backoff=30.0, pool_size=16,
+                 limiter=None):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.validators = ValidatorStore(cache_dir or os.path.join(settings.CACHE_DIR, "http"))
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = "NBA-Player-Statistic-Explorer (+https://nba-player-statistic-explorer.streamlit.app/)"
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._stats = collections.defaultdict(HostStats)
+        self._lock = threading.Lock()
+        self.limiter = limiter or rate_limiter
+        self._flights = SingleFlight()
+
+    def _delay(self, attempt, response=None):
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.max_backoff)
+        # "Full jitter": spreads retries from concurrent workers instead of synchronizing them
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def _record(self, host, elapsed, response=None, retried=False):
+        with self._lock:
+            stats = self._stats[host]
+            stats.requests += 1
+            stats.latency_total += elapsed
+            stats.latency_max = max(stats.latency_max, elapsed)
+            stats.retries += retried
+            if response is None:
+                stats.errors += 1
+            else:
+                stats.bytes += len(response.content)
+                stats.not_modified += response.status_code == 304
+                stats.errors += response.status_code >= 400
+
+    def get(self, url):
+        with telemetry.span("fetch", url=url) as span:
+            (body, cached), shared = self._flights.do(url, self._get, url)
+            span.set(bytes=len(body), cache="coalesced" if shared else "hit" if cached else "miss")
+            return body
+
+    def _throttle(self):
+        # Queue depth is taken on arrival, i.e. how many requests were already waiting ahead of this one
+        job = getattr(_local, "job", None)
+        with telemetry.span("throttle", queued=self.limiter.waiting, background=job is not None) as span:
+            span.set(wait_ms=round(self.limiter.acquire(job) * 1000, 3))
+
+    def _get(self, url):
+        # (body, whether the body came from the validator store after a 304)
+        host = urlsplit(url).netloc
+        meta, cached_body = self.validators.get(url)
+        headers = {}
+        if meta:
+            if "etag" in meta:
+                headers["If-None-Match"] = meta["etag"]
+            if "last_modified" in meta:
+                headers["If-Modified-Since"] = meta["last_modified"]
+        for attempt in range(self.max_retries + 1):
+            self._throttle()
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                self._record(host, time.perf_counter() - start, retried=attempt > 0)
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self._delay(attempt))
+                continue
+            self._record(host, time.perf_counter() - start, response, retried=attempt > 0)
+            if response.status_code == 304 and cached_body is not None:
+                return cached_body, True
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                time.sleep(self._delay(attempt, response))
+                continue
+            response.raise_for_status()
+            self.validators.put(url, response)
+            return response.content, False
+
+    def stats(self):
+        with self._lock:
+            return {host: stats.as_dict() for host, stats in self._stats.items()}
+
+
+client = HttpClient()
+
+telemetry.metrics.gauge("nba_upstream_queue_depth", "Requests waiting for a rate limiter token.",
+                        lambda: rate_limiter.waiting)
+telemetry.metrics.gauge("nba_upstream_in_flight", "Distinct URLs being fetched right now.",
+                        lambda: client._flights.in_flight())
+
+
+def get(url):
+    return client.get(url)
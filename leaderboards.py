@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+import telemetry
+from lru import LRUCache
+from shared_dataset import column_values, numeric_columns, to_pandas
+
+
+# Deepest leaderboard that is precomputed; any n up to this is a slice of the stored ranking
+MAX_N = 50
+
+_boards = LRUCache(maxsize=256)
+
+
+class Leaderboard:
+    """Top-k and bottom-k rankings for every numeric column of a frame, built in one pass.
+
+    ``np.argpartition`` selects the k best and k worst rows of each column, so only those
+    2k rows per column are ever sorted. NaN never ranks. ``frame`` may also be a
+    ``pyarrow.Table`` (e.g. the memory-mapped all-seasons dataset): columns are then read
+    one at a time, zero-copy where Arrow allows it, and only ranked rows become pandas.
+    """
+
+    def __init__(self, frame, label_column, k=MAX_N, fingerprint=None, exclude=()):
+        self.fingerprint = _fingerprint(frame) if fingerprint is None else fingerprint
+        self.arrow = not isinstance(frame, pd.DataFrame)
+        self.frame = frame if self.arrow else frame.reset_index(drop=True)
+        self.label_column = label_column
+        self.metrics = [c for c in numeric_columns(self.frame) if c != label_column and c not in exclude]
+        self.k = min(k, len(self.frame))
+        self.valid = np.zeros(len(self.metrics), dtype=np.intp)
+        self.top = np.empty((self.k, len(self.metrics)), dtype=np.intp)
+        self.bottom = np.empty((self.k, len(self.metrics)), dtype=np.intp)
+        for i, metric in enumerate(self.metrics):
+            values = column_values(self.frame, metric)
+            missing = np.isnan(values)
+            self.valid[i] = len(values) - missing.sum()
+            self.top[:, i] = self._select(np.where(missing, -np.inf, values), descending=True)
+            self.bottom[:, i] = self._select(np.where(missing, np.inf, values), descending=False)
+        self._column = {metric: i for i, metric in enumerate(self.metrics)}
+
+    def _select(self, values, descending):
+        if self.k == 0:
+            return np.empty(0, dtype=np.intp)
+        keyed = -values if descending else values
+        candidates = np.argpartition(keyed, self.k - 1)[:self.k]
+        return candidates[np.argsort(keyed[candidates], kind='stable')]
+
+    def rank(self, metric, n=10, bottom=False):
+        # Rows of the n best (or worst) values of metric, best (or worst) first
+        column = self._column[metric]
+        n = min(n, self.k, self.valid[column])
+        rows = (self.bottom if bottom else self.top)[:n, column]
+        if self.arrow:
+            return to_pandas(self.frame.take(rows))
+        return self.frame.iloc[rows]
+
+
+def player_rows(playerstats):
+    # Players traded mid-season have a row per team, so label bars with the team too
+    labels = playerstats['Player'].astype(str) + ' (' + playerstats['Tm'].astype(str) + ')'
+    return playerstats.assign(Label=labels).drop(columns=['Player', 'Tm'])
+
+
+def _fingerprint(frame):
+    if not isinstance(frame, pd.DataFrame):
+        raise TypeError("Arrow tables are not hashed; pass the data's version as fingerprint")
+    return int(pd.util.hash_pandas_object(frame, index=False).sum())
+
+
+def leaderboard(key, frame, label_column, fingerprint=None, exclude=(), version=None):
+    """Cached Leaderboard for ``frame``; ``key`` names the data, e.g. (season, table id).
+
+    Pass ``fingerprint`` when the caller already knows the data's version (e.g. the
+    all-seasons store) to skip hashing a large frame on every call. A season's table is
+    looked up by ``version`` instead (``nba_data.data_version``) and only hashed when its
+    board is built, so the board's fingerprint, and with it the chart keys, is the same as
+    prerender.py's. With either, ``frame`` may be a zero-argument callable, so the frame is
+    only built when the board is not cached.
+    """
+    with telemetry.span("leaderboard", cache="hit") as span:
+        if version is None:
+            if fingerprint is None:
+                frame = frame() if callable(frame) else frame
+                fingerprint = _fingerprint(frame)
+            version = fingerprint
+        cache_key = (key, label_column, version)
+        board = _boards.get(cache_key)
+        if board is None:
+            span.set(cache="miss")
+            board = Leaderboard(frame() if callable(frame) else frame, label_column, fingerprint=fingerprint, exclude=exclude)
+            _boards.put(cache_key, board)
+        span.set(rows=len(board.frame))
+        return board
@@ -0,0 +1,53 @@
+import collections
+import threading
+
+
+class LRUCache:
+    # Thread-safe mapping that evicts the least recently used entries once it holds more than
+    # maxsize items or, when max_bytes is set, more than max_bytes as measured by sizeof(value)
+    def __init__(self, maxsize=128, max_bytes=None, sizeof=len):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.bytes = 0
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def _size(self, value):
+        return self.sizeof(value) if self.max_bytes is not None and value is not None else 0
+
+    def put(self, key, value):
+        with self._lock:
+            if key in self._data:
+                self.bytes -= self._size(self._data[key])
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self.bytes += self._size(value)
+            while len(self._data) > self.maxsize or (
+                self.max_bytes is not None and self.bytes > self.max_bytes and len(self._data) > 1
+            ):
+                _, evicted = self._data.popitem(last=False)
+                self.bytes -= self._size(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
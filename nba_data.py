@@ -0,0 +1,255 @@
+import functools
+import time
+from typing import NamedTuple
+
+import pandas as pd
+
+import settings
+import telemetry
+from advanced_stats import advanced_stats, team_context
+from lru import LRUCache
+from player_index import player_index
+from player_store import player_store
+from season_cache import SeasonCache
+from singleflight import Cancelled, SingleFlight
+
+
+season_cache = SeasonCache()
+
+# Sessions asking for the same season at once (e.g. the day it is published) share one load and one scrape
+season_flights = SingleFlight()
+
+# (year, generation) -> the player table with its advanced metrics, as load_data serves it
+_advanced = LRUCache(maxsize=32)
+
+
+def fetch_tables(url, table_ids):
+    # Only a cache miss gets here, so warm reruns never import requests or lxml
+    import http_client
+    from html_tables import extract_tables
+
+    # The whole body is kept so the next fetch can be revalidated; parsing still stops at the last table
+    body = http_client.get(url)
+    with telemetry.span("parse", bytes=len(body)) as span:
+        tables = extract_tables(body, table_ids)
+        span.set(rows=sum(len(table) for table in tables.values()), tables=len(tables))
+    if not tables:
+        raise ValueError("No tables " + ", ".join(map(str, table_ids)) + " found on " + url)
+    return tables
+
+
+################# Web Scraping of NBA player Stats ################
+
+# Dtypes of the cleaned per-game player frame: categoricals for the repeated labels, small
+# nullable ints for counts and float32 for per-game numbers and rates. NaN means "not recorded"
+# (e.g. 3-pointers before 1980) and is kept apart from a real 0.
+CATEGORY_COLUMNS = ['Player', 'Pos', 'Tm', 'player_id']
+COUNT_COLUMNS = {'Age': 'Int8', 'G': 'Int16', 'GS': 'Int16'}
+RATE_COLUMNS = ['MP', 'FG', 'FGA', 'FG%', '3P', '3PA', '3P%', '2P', '2PA', '2P%', 'eFG%', 'FT', 'FTA', 'FT%',
+                'ORB', 'DRB', 'TRB', 'AST', 'STL', 'BLK', 'TOV', 'PF', 'PTS']
+
+
+def apply_player_schema(df):
+    columns = CATEGORY_COLUMNS + list(COUNT_COLUMNS) + RATE_COLUMNS
+    # Every season gets the same columns, so seasons concatenate into one frame cleanly
+    typed = df.reindex(columns=columns + [c for c in df.columns if c not in columns])
+    for column in CATEGORY_COLUMNS:
+        typed[column] = typed[column].astype('category')
+    for column, dtype in COUNT_COLUMNS.items():
+        typed[column] = pd.to_numeric(typed[column], errors='coerce').round().astype(dtype)
+    typed[RATE_COLUMNS] = typed[RATE_COLUMNS].apply(pd.to_numeric, errors='coerce').astype('float32')
+    return typed.reset_index(drop=True)
+
+
+def memory_usage_mb(df):
+    return df.memory_usage(deep=True).sum() / 2 ** 20
+
+
+def clean_player_table(df):
+    with telemetry.span("transform", rows=len(df)):
+        playerstats = df.drop(['Rk', 'team_id'], axis=1, errors='ignore')
+        playerstats = playerstats[playerstats['Tm'] != 'TOT']
+        return apply_player_schema(playerstats)
+
+
+def scrape_player_stats(year):
+    url = settings.BASE_URL + "/leagues/NBA_" + str(year) + "_per_game.html"
+    df = fetch_tables(url, ["per_game_stats"])["per_game_stats"] # Repeating headers are skipped while parsing
+    return clean_player_table(df)
+
+
+def _scrape_player_stats_miss(year):
+    telemetry.annotate(cache="miss")
+    return scrape_player_stats(year)
+
+
+def with_advanced_stats(playerstats, league=None):
+    # TS%, per-36, per-100, usage and PER next to the scraped columns, in the context of the season's team totals;
+    # without the league tables the metrics stay empty
+    with telemetry.span("advanced_stats", rows=len(playerstats)):
+        if league is None:
+            context = team_context(pd.DataFrame())
+        else:
+            context = team_context(league.totals, league.opponent_totals)
+        return playerstats.join(advanced_stats(playerstats, context))
+
+
+def _generation(year):
+    # Completed seasons never change; the in-progress season's memo entries roll over with the cache TTL
+    if settings.is_completed_season(year) or season_cache.ttl <= 0:
+        return 0
+    return int(time.time() // season_cache.ttl)
+
+
+@functools.lru_cache(maxsize=32)
+def _load_players(year, generation):
+    playerstats, shared = season_flights.do(("players", year), season_cache.get_or_load,
+                                            "players", year, _scrape_player_stats_miss)
+    if shared:
+        telemetry.annotate(cache="coalesced")
+    return playerstats
+
+
+def _load_advanced(year, generation):
+    # Computed once per season and process, then shared by every rerun. Only a complete result is memoized:
+    # when the league page fails to load this raises, and the next rerun tries again.
+    playerstats = _advanced.get((year, generation))
+    if playerstats is None:
+        playerstats = with_advanced_stats(_load_players(year, generation), load_league_tables(year))
+        _advanced.put((year, generation), playerstats)
+    return playerstats
+
+
+def load_players(year):
+    """The season's scraped player table only: no league page, no advanced metrics, not indexed."""
+    return _load_players(int(year), _generation(year))
+
+
+def load_data(year):
+    # Served from the on-disk season cache; only a miss (or an expired current season) scrapes
+    with telemetry.span("load_data", year=int(year), cache="hit") as span:
+        generation = _generation(year)
+        scraped = _load_players(int(year), generation)
+        try:
+            playerstats = _load_advanced(int(year), generation)
+        except Cancelled:
+            # A background prefetch was called off: nothing is cached, and the caller stops here
+            raise
+        except Exception:
+            # Upstream is down or throttling us: the table is served with empty metrics for this rerun only
+            span.set(advanced="unavailable")
+            playerstats = with_advanced_stats(scraped)
+        span.set(rows=len(playerstats))
+        player_index.add_season(year, scraped)
+        player_store.add_season(year, scraped)
+        return playerstats
+
+
+def data_version(year, kind="players", playerstats=None):
+    """A cheap key that changes whenever the season's ``kind`` table may change, or None when unknown.
+
+    It is what caches keyed on a season's table (filter masks, leaderboards) pass instead of
+    hashing the frame on every rerun. Reads only the table's small ref in the season cache.
+    Pass the frame ``load_data`` returned as ``playerstats`` to also tell the full table from
+    one served without its advanced metrics, whose values differ.
+    """
+    fetched_at = season_cache.fetched_at(kind, year)
+    if fetched_at is None:
+        return None
+    version = (int(year), _generation(year), fetched_at)
+    if playerstats is None:
+        return version
+    return version + (playerstats is _advanced.get(version[:2]),)
+
+
+################# Web Scraping of the league (team) page ################
+
+class LeagueTables(NamedTuple):
+    totals: pd.DataFrame
+    per_game: pd.DataFrame
+    opponent_totals: pd.DataFrame
+    opponent_per_game: pd.DataFrame
+    standings_east: pd.DataFrame
+    standings_west: pd.DataFrame
+
+
+# Table ids on NBA_{year}.html for every LeagueTables field, in field order. Seasons before the
+# conference split only have division standings, hence the fallbacks.
+LEAGUE_TABLE_IDS = {
+    "totals": ("totals-team",),
+    "per_game": ("per_game-team",),
+    "opponent_totals": ("totals-opponent",),
+    "opponent_per_game": ("per_game-opponent",),
+    "standings_east": ("confs_standings_E", "divs_standings_E"),
+    "standings_west": ("confs_standings_W", "divs_standings_W"),
+}
+
+
+def clean_team_table(df):
+    if 'Rk' in df.columns:
+        df = df.set_index('Rk')
+    if 'Team' in df.columns:
+        df = df[~df['Team'].str.contains('League Average', na=False)]
+    return df
+
+
+def scrape_league_tables(year):
+    url = settings.BASE_URL + "/leagues/NBA_" + str(year) + ".html"
+    # One streaming pass over the page serves every table we need
+    tables = fetch_tables(url, list(LEAGUE_TABLE_IDS.values()))
+    frames = {}
+    with telemetry.span("transform", rows=sum(len(table) for table in tables.values())):
+        for name, table_ids in LEAGUE_TABLE_IDS.items():
+            table_id = next((t for t in table_ids if t in tables), None)
+            # Tables a season does not have (e.g. opponent stats in the 1950s) come back empty
+            frames[name] = clean_team_table(tables[table_id]) if table_id else pd.DataFrame()
+    return frames
+
+
+def _scrape_league_frames_miss(year):
+    telemetry.annotate(cache="miss")
+    return {"league-" + name: df for name, df in scrape_league_tables(year).items()}
+
+
+@functools.lru_cache(maxsize=32)
+def _load_league_tables(year, generation):
+    frames, shared = season_flights.do(("league", year), season_cache.get_or_load_many,
+                                       ["league-" + name for name in LeagueTables._fields], year, _scrape_league_frames_miss)
+    if shared:
+        telemetry.annotate(cache="coalesced")
+    return LeagueTables(*(frames["league-" + name] for name in LeagueTables._fields))
+
+
+def expire_season(year):
+    """Make the next load of ``year`` scrape its pages again (``backfill.py --force``)."""
+    for kind in ["players"] + ["league-" + name for name in LeagueTables._fields]:
+        season_cache.expire(kind, year)
+    # The memos are keyed on the generation, which never moves for a completed season
+    clear_memos()
+
+
+def clear_memos():
+    """Forget every season this process has loaded; the season cache on disk is left as it is."""
+    _load_players.cache_clear()
+    _advanced.clear()
+    _load_league_tables.cache_clear()
+
+
+def stored_team_totals(seasons):
+    """(team totals, opponent totals) of the given seasons with a Season column, from the season cache only.
+
+    Seasons whose league page was never loaded are left out; nothing is scraped.
+    """
+    frames = {"league-totals": [], "league-opponent_totals": []}
+    for year in seasons:
+        for kind, parts in frames.items():
+            frame = season_cache.get(kind, year, allow_stale=True)
+            if frame is not None and len(frame):
+                parts.append(frame.assign(Season=int(year)))
+    return tuple(pd.concat(parts, ignore_index=True) if parts else pd.DataFrame() for parts in frames.values())
+
+
+def load_league_tables(year):
+    # Memoized per process, like the player table
+    with telemetry.span("load_league_tables", year=int(year), cache="hit"):
+        return _load_league_tables(int(year), _generation(year))
@@ -0,0 +1,93 @@
+import hashlib
+import json
+import os
+import threading
+
+import settings
+from season_cache import atomic_write
+
+
+class PlayerIndex:
+    """Persistent name -> basketball-reference player id index built from every loaded season.
+
+    Names are not unique across eras, so each name maps to the ids that carried it and the
+    seasons each id played; ``lookup`` uses the season to pick the right one. Each season is
+    stored with a fingerprint of its (name, id) pairs and indexed again when a refreshed
+    table brings different ones. Where a season's own rows are at hand, ``row_ids`` reads
+    the ids off them instead, which also tells apart two players sharing a name.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(settings.CACHE_DIR, "player-index.json")
+        self._lock = threading.Lock()
+        self._seasons = None
+        self._players = None
+
+    def _load(self):
+        if self._players is not None:
+            return
+        try:
+            with open(self.path) as fh:
+                data = json.load(fh)
+            # Season -> fingerprint; an index written before fingerprints has none, so it is rebuilt season by season
+            seasons = data["seasons"]
+            self._seasons = {int(year): fingerprint for year, fingerprint in seasons.items()} \
+                if isinstance(seasons, dict) else dict.fromkeys(seasons)
+            self._players = data["players"]
+        except (OSError, ValueError, KeyError):
+            self._seasons, self._players = {}, {}
+
+    def add_season(self, year, playerstats):
+        year = int(year)
+        if "player_id" not in playerstats.columns:
+            return
+        pairs = sorted({(name, player_id) for name, player_id in zip(playerstats["Player"], playerstats["player_id"])
+                        if isinstance(player_id, str)})
+        fingerprint = hashlib.sha1(json.dumps(pairs).encode()).hexdigest()[:16]
+        with self._lock:
+            self._load()
+            if self._seasons.get(year) == fingerprint:
+                return
+            # A refreshed season: what it said before goes, so players it no longer lists are dropped too
+            for name in list(self._players):
+                for player_id in list(self._players[name]):
+                    seasons = self._players[name][player_id]
+                    if year in seasons:
+                        seasons.remove(year)
+                        if not seasons:
+                            del self._players[name][player_id]
+                if not self._players[name]:
+                    del self._players[name]
+            for name, player_id in pairs:
+                self._players.setdefault(name, {}).setdefault(player_id, []).append(year)
+            self._seasons[year] = fingerprint
+            data = {"seasons": {str(y): f for y, f in sorted(self._seasons.items())}, "players": self._players}
+            atomic_write(self.path, json.dumps(data).encode())
+
+    def ids(self, name):
+        with self._lock:
+            self._load()
+            return dict(self._players.get(name, {}))
+
+    def lookup(self, name, season=None):
+        # None when the name is unknown: better no headshot than a request for the wrong URL
+        ids = self.ids(name)
+        if season is not None:
+            for player_id, seasons in ids.items():
+                if int(season) in seasons:
+                    return player_id
+        if len(ids) == 1:
+            return next(iter(ids))
+        return None
+
+    def row_ids(self, playerstats, name, season=None):
+        """Ids on ``name``'s rows of a season's table, in row order; ``lookup`` only if the table has none."""
+        if "player_id" in playerstats.columns:
+            ids = list(dict.fromkeys(playerstats.loc[playerstats["Player"] == name, "player_id"].dropna()))
+            if ids:
+                return ids
+        player_id = self.lookup(name, season)
+        return [player_id] if player_id else []
+
+
+player_index = PlayerIndex()
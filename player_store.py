@@ -0,0 +1,150 @@
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+import settings
+import telemetry
+from season_cache import atomic_write, to_parquet_bytes
+
+
+def frame_fingerprint(frame):
+    return int(pd.util.hash_pandas_object(frame, index=False).sum()) & 0xFFFFFFFFFFFF
+
+
+def concat_seasons(frames):
+    # pd.concat turns categoricals with different categories into object columns; unify them first
+    # so the multi-season frame stays as compact as a single season
+    frames = [frame for frame in frames if len(frame)]
+    if not frames:
+        return pd.DataFrame()
+    frames = [frame.copy() for frame in frames]
+    for column in frames[0].columns:
+        if all(column in frame and isinstance(frame[column].dtype, pd.CategoricalDtype) for frame in frames):
+            categories = union_categoricals([frame[column] for frame in frames], ignore_order=True).categories
+            for frame in frames:
+                frame[column] = frame[column].cat.set_categories(categories)
+    return pd.concat(frames, ignore_index=True)
+
+
+def season_averages(rows, stats):
+    # One row per season: players traded mid-season have a row per team, weighted here by games
+    games = rows['G'].fillna(0)
+    weighted = rows[stats].mul(games, axis=0).groupby(rows['Season']).sum(min_count=1)
+    return weighted.div(games.groupby(rows['Season']).sum(), axis=0)
+
+
+class PlayerStore:
+    """Every player-season ever loaded, as Parquet partitioned by season.
+
+    ``players/season=YYYY/part.parquet`` holds one season; ``_index.json`` records the
+    seasons each player id and team appears in, so career and roster queries only open
+    the partitions they need. Partitions read once stay in memory for the process.
+    """
+
+    def __init__(self, root=None):
+        self.root = root or os.path.join(settings.CACHE_DIR, "store", "players")
+        self._lock = threading.Lock()
+        self._index = None
+        self._index_mtime = None
+        self._partitions = {}
+
+    def _partition_path(self, year):
+        return os.path.join(self.root, "season=%d" % year, "part.parquet")
+
+    def _index_path(self):
+        return os.path.join(self.root, "_index.json")
+
+    def _load_index(self):
+        # Re-read when another process (e.g. a backfill) has rewritten the index since we last looked
+        try:
+            mtime = os.stat(self._index_path()).st_mtime_ns
+        except OSError:
+            mtime = None
+        if self._index is None or mtime != self._index_mtime:
+            old = self._index["seasons"] if self._index else {}
+            try:
+                with open(self._index_path()) as fh:
+                    self._index = json.load(fh)
+            except (OSError, ValueError):
+                self._index = {"seasons": {}, "players": {}, "teams": {}}
+            self._index_mtime = mtime
+            for year, meta in old.items():
+                if self._index["seasons"].get(year) != meta:
+                    self._partitions.pop(int(year), None)
+        return self._index
+
+    def _add_to(self, mapping, key, year):
+        seasons = mapping.setdefault(key, [])
+        if year not in seasons:
+            seasons.append(year)
+            seasons.sort()
+
+    def add_season(self, year, playerstats):
+        # Cheap to call on every load: the partition is only rewritten when the season's data changed
+        year = int(year)
+        fingerprint = frame_fingerprint(playerstats)
+        with self._lock:
+            index = self._load_index()
+            if index["seasons"].get(str(year), {}).get("fingerprint") == fingerprint:
+                return
+            frame = playerstats.reset_index(drop=True)
+            frame = frame.assign(Season=np.full(len(frame), year, dtype=np.int16))
+            atomic_write(self._partition_path(year), to_parquet_bytes(frame))
+            index["seasons"][str(year)] = {"fingerprint": fingerprint, "rows": len(frame)}
+            for player_id in frame["player_id"].dropna().unique() if "player_id" in frame else ():
+                if isinstance(player_id, str):
+                    self._add_to(index["players"], player_id, year)
+            for team in frame["Tm"].dropna().unique():
+                self._add_to(index["teams"], str(team), year)
+            atomic_write(self._index_path(), json.dumps(index).encode())
+            self._index_mtime = os.stat(self._index_path()).st_mtime_ns
+            self._partitions[year] = frame
+
+    def seasons(self):
+        with self._lock:
+            return sorted(int(year) for year in self._load_index()["seasons"])
+
+    def version(self):
+        # Changes whenever any season is added or refreshed
+        with self._lock:
+            seasons = self._load_index()["seasons"]
+            digest = hashlib.sha1(json.dumps(seasons, sort_keys=True).encode()).hexdigest()
+        return digest[:16]
+
+    def season(self, year):
+        year = int(year)
+        frame = self._partitions.get(year)
+        if frame is None:
+            frame = pd.read_parquet(self._partition_path(year), engine="pyarrow")
+            self._partitions[year] = frame
+        return frame
+
+    def _read(self, seasons):
+        return concat_seasons([self.season(year) for year in seasons])
+
+    def player_career(self, player_id):
+        """All rows of one player, one per season and team, oldest first."""
+        with telemetry.span("career") as span:
+            with self._lock:
+                seasons = list(self._load_index()["players"].get(player_id, []))
+            career = self._read(seasons)
+            career = career[career["player_id"] == player_id] if len(career) else career
+            span.set(rows=len(career), seasons=len(seasons))
+            return career
+
+    def team_roster(self, team, seasons=None):
+        """Every player-season of a team (by abbreviation), optionally limited to some seasons."""
+        with self._lock:
+            team_seasons = list(self._load_index()["teams"].get(team, []))
+        if seasons is not None:
+            team_seasons = [year for year in team_seasons if year in set(seasons)]
+        roster = self._read(team_seasons)
+        return roster[roster["Tm"] == team] if len(roster) else roster
+
+
+player_store = PlayerStore()
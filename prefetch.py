@@ -0,0 +1,137 @@
+import threading
+
+import nba_data
+import settings
+import telemetry
+from singleflight import recording
+
+
+# The seasons the year selectbox offers
+FIRST_SEASON = 1950
+LAST_SEASON = 2023
+
+
+class _Job:
+    __slots__ = ("key", "flights", "_cancelled")
+
+    def __init__(self, key):
+        self.key = key
+        self.flights = set()  # (SingleFlight, key) of every call the job has started
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def urgent(self):
+        # A session is now blocked on a load this job started: its requests stop yielding to others
+        return any(flights.waiting(key) > 0 for flights, key in list(self.flights))
+
+
+class Prefetcher:
+    """Warms the season cache from one background thread with what a session will likely open next.
+
+    After a season is picked, ``schedule(year, owner)`` plans that season's league page
+    (team stats are usually opened next) and the player pages of the seasons either side
+    of it: three page requests, nothing more (a neighbour's league page waits until the
+    session opens that season). Each owner
+    (a browser session) has one plan; a new one replaces it, and a running prefetch nobody
+    plans for any more is cancelled while it waits for its turn. Requests go through
+    ``http_client`` at background priority, so they share the process-wide rate budget and
+    only use tokens no foreground request is waiting for.
+    """
+
+    def __init__(self, first=FIRST_SEASON, last=LAST_SEASON):
+        self.first = first
+        self.last = last
+        self._cond = threading.Condition()
+        self._plans = {}  # owner -> (kind, year) keys still to warm, the latest schedule last
+        self._running = None
+        self._thread = None
+
+    def plan(self, year):
+        # The year selectbox lists the newest season first, so stepping down it goes back in time
+        keys = [("league", year), ("players", year - 1), ("players", year + 1)]
+        return [key for key in keys if self.first <= key[1] <= self.last]
+
+    def schedule(self, year, owner=None):
+        if not settings.PREFETCH:
+            return
+        with self._cond:
+            self._plans.pop(owner, None)
+            self._plans[owner] = self.plan(int(year))
+            self._cancel_unwanted()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="prefetch", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def cancel(self, owner=None):
+        """Drop the owner's plan, or every plan when no owner is given."""
+        with self._cond:
+            if owner is None:
+                self._plans.clear()
+            else:
+                self._plans.pop(owner, None)
+            self._cancel_unwanted()
+
+    def pending(self):
+        with self._cond:
+            return list(dict.fromkeys(key for keys in self._plans.values() for key in keys))
+
+    def _cancel_unwanted(self):
+        running = self._running
+        if running is not None and not any(running.key in keys for keys in self._plans.values()):
+            running.cancel()
+
+    def _next(self):
+        for keys in reversed(list(self._plans.values())):
+            if keys:
+                return keys[0]
+        return None
+
+    def _finish(self, key):
+        for owner, keys in list(self._plans.items()):
+            if key in keys:
+                keys.remove(key)
+            if not keys:
+                del self._plans[owner]
+
+    def _run(self):
+        while True:
+            with self._cond:
+                key = self._next()
+                while key is None:
+                    self._cond.wait()
+                    key = self._next()
+                job = self._running = _Job(key)
+            try:
+                with telemetry.span("prefetch", kind=key[0], year=key[1]) as span:
+                    span.set(cache="hit" if self._cached(key) else "miss")
+                    if span.attrs["cache"] == "miss":
+                        # Imported here: pulls in requests, which the app itself only loads on a cache miss
+                        import http_client
+                        with http_client.background(job), recording(job.flights):
+                            self._load(key)
+            except Exception:  # Cancelled, or e.g. a season missing upstream; the span records which
+                pass
+            finally:
+                with self._cond:
+                    self._running = None
+                    self._finish(key)
+
+    def _cached(self, key):
+        kind, year = key
+        return nba_data.season_cache.has("players" if kind == "players" else "league-totals", year)
+
+    def _load(self, key):
+        kind, year = key
+        if kind == "players":
+            nba_data.load_players(year)
+        else:
+            nba_data.load_league_tables(year)
+
+
+prefetcher = Prefetcher()
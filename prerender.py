@@ -0,0 +1,141 @@
+"""Render every season's leaderboard charts ahead of time so the app serves them as files.
+
+    python prerender.py                          # every season in the local store, PNG and SVG
+    python prerender.py --start 2000 --formats png --workers 4
+
+Covers the preset team charts and the default (top and bottom 10) custom leaderboard of
+every statistic for team totals, team per-game and player per-game stats. Rendering runs
+in a process pool, one worker per core by default. Files land in ``NBA_CHART_DIR``
+(``<cache dir>/charts``) with a ``manifest.json`` the app reads; charts already rendered
+for unchanged data are skipped unless --force is given. Seasons are read from the local
+cache, so run ``backfill.py`` first.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import charts
+import leaderboards
+from nba_data import load_data, load_league_tables
+from player_store import player_store
+from season_cache import atomic_write
+
+
+# (data source shown in the app, board table name, y axis label) of the custom leaderboards rendered per season
+CUSTOM_SOURCES = [("Team Totals", "totals-team", "Team"), ("Team Per Game", "per_game-team", "Team"),
+                  ("Player Per Game", "per_game_stats", "Player")]
+
+DEFAULT_N = 10
+
+
+def season_boards(season):
+    league = load_league_tables(season)
+    return {
+        "totals-team": leaderboards.Leaderboard(league.totals, 'Team'),
+        "per_game-team": leaderboards.Leaderboard(league.per_game, 'Team'),
+        "per_game_stats": leaderboards.Leaderboard(leaderboards.player_rows(load_data(season)), 'Label'),
+    }
+
+
+def chart_specs(season, boards):
+    # Yields (board, chart_key arguments) for every chart the app can show by default for a season
+    totals = boards["totals-team"]
+    for option in list(charts.TEAM_LEADERBOARDS) + [charts.BOTTOM_TEAM_POINTS]:
+        for metric, title, xlabel, color, value_format in charts.team_charts(option):
+            if metric in totals.metrics:
+                yield totals, dict(season=season, table='totals-team', metric=metric, n=DEFAULT_N,
+                                   bottom=option == charts.BOTTOM_TEAM_POINTS, title=title, xlabel=xlabel,
+                                   ylabel='Team', color=color, value_format=value_format)
+    for source, table, ylabel in CUSTOM_SOURCES:
+        board = boards[table]
+        for metric in board.metrics:
+            if not board.valid[board.metrics.index(metric)]:
+                continue
+            for bottom in (False, True):
+                title, value_format = charts.custom_chart_args(board, metric, DEFAULT_N, bottom, source)
+                yield board, dict(season=season, table=table, metric=metric, n=DEFAULT_N, bottom=bottom, title=title,
+                                  xlabel=metric, ylabel=ylabel, color=None, value_format=value_format)
+
+
+def _render(job):
+    return charts.render_barh(*job)
+
+
+def load_manifest(path):
+    try:
+        with open(path) as fh:
+            return json.load(fh)["charts"]
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def prerender(seasons, image_formats, workers, out_dir, force=False, out=sys.stdout):
+    manifest_path = os.path.join(out_dir, "manifest.json")
+    manifest = load_manifest(manifest_path)
+    rendered = skipped = 0
+    started = time.monotonic()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for season in seasons:
+            try:
+                boards = season_boards(season)
+            except Exception as exc:  # a season missing upstream should not stop the rest
+                print(f"{season}: skipped ({exc})", file=out)
+                continue
+            entries, jobs = {}, []
+            for board, spec in chart_specs(season, boards):
+                for image_format in image_formats:
+                    digest = charts.key_digest(charts.chart_key(board=board, image_format=image_format, **spec))
+                    entries[digest] = {"file": f"{season}/{digest}.{image_format}", "season": season,
+                                       "table": spec["table"], "metric": spec["metric"], "n": spec["n"],
+                                       "bottom": spec["bottom"], "format": image_format}
+                    if not force and digest in manifest and os.path.exists(os.path.join(out_dir, entries[digest]["file"])):
+                        skipped += 1
+                        continue
+                    ranked = board.rank(spec["metric"], spec["n"], spec["bottom"])
+                    # Plain lists keep what is pickled to the workers small
+                    jobs.append((digest, (ranked[board.label_column].astype(str).tolist(), ranked[spec["metric"]].astype(float).tolist(),
+                                          spec["title"], spec["xlabel"], spec["ylabel"], spec["color"], spec["value_format"], image_format)))
+            for (digest, _), image in zip(jobs, pool.map(_render, [job for _, job in jobs], chunksize=8)):
+                atomic_write(os.path.join(out_dir, entries[digest]["file"]), image)
+            rendered += len(jobs)
+            # Charts of this season's older data are no longer reachable: drop them with their files
+            for digest, entry in list(manifest.items()):
+                if entry["season"] == season and entry["format"] in image_formats and digest not in entries:
+                    del manifest[digest]
+                    try:
+                        os.remove(os.path.join(out_dir, entry["file"]))
+                    except OSError:
+                        pass
+            manifest.update(entries)
+            atomic_write(manifest_path, json.dumps({"charts": manifest}).encode())
+            print(f"{season}: {len(jobs)} rendered, {len(entries) - len(jobs)} up to date", file=out)
+    elapsed = time.monotonic() - started
+    print(f"Done: {rendered} charts rendered, {skipped} skipped in {elapsed:.0f}s with {workers} workers; "
+          f"{len(manifest)} charts listed in {manifest_path}", file=out)
+    return rendered
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--start", type=int, help="first season (default: earliest stored)")
+    parser.add_argument("--end", type=int, help="last season (default: latest stored)")
+    parser.add_argument("--formats", nargs="+", choices=["png", "svg"], default=["png", "svg"])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--out", default=charts.PRERENDERED_DIR, help="output directory")
+    parser.add_argument("--force", action="store_true", help="re-render charts that are already up to date")
+    args = parser.parse_args(argv)
+
+    seasons = [season for season in player_store.seasons()
+               if (args.start is None or season >= args.start) and (args.end is None or season <= args.end)]
+    if not seasons:
+        print("No stored seasons in range; run backfill.py first", file=sys.stderr)
+        return 1
+    prerender(seasons, args.formats, args.workers, args.out, args.force)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,334 @@
+import json
+import os
+import re
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+import pandas as pd
+
+import settings
+import telemetry
+from lru import LRUCache
+from season_cache import atomic_write, to_parquet_bytes
+from singleflight import SingleFlight
+
+
+# Upper bound on player downloads in flight at once, shared by every session of this process
+MAX_IN_FLIGHT = 6
+
+_pool = ThreadPoolExecutor(max_workers=MAX_IN_FLIGHT, thread_name_prefix="profiles")
+_MISSING = object()
+_UNAVAILABLE = object()  # a download that failed for now, which is not cached
+
+headshot_cache = LRUCache(maxsize=256)
+profile_cache = LRUCache(maxsize=256)
+
+# Sessions opening the same player at once share one page download and parse
+profile_flights = SingleFlight()
+
+# Table ids on players/{x}/{id}.html (the newer layout's first), and the bio block above them.
+# Nothing else on the page is parsed.
+PROFILE_TABLE_IDS = {
+    "per_game": ("per_game_stats", "per_game"),
+    "advanced": ("advanced",),
+}
+BIO_BLOCK = "meta"
+
+# Bump whenever what is stored per profile changes, so old layouts are fetched again
+PROFILE_VERSION = 1
+
+# Columns of the career tables that are labels; every other column is numeric
+LABEL_COLUMNS = ['Season', 'Tm', 'Team', 'Lg', 'Pos', 'Awards', 'team_id']
+
+# "2003-04" is the 2004 season, as Basketball-Reference names seasons after the year they end in
+_SEASON = re.compile(r"^(\d{4})-(\d{2})$")
+
+# Bio fields read from the lines of the meta block: field -> pattern whose first group is the value
+BIO_FIELDS = {
+    'Position': re.compile(r"Position:\s*(.+?)\s*(?:▪|$)"),
+    'Shoots': re.compile(r"Shoots:\s*(\w+)"),
+    'Height': re.compile(r"\b(\d-\d{1,2}),\s*\d+lb"),
+    'Weight': re.compile(r"\b\d-\d{1,2},\s*(\d+)lb"),
+    'College': re.compile(r"^Colleges?:\s*(.+)$"),
+    'Draft': re.compile(r"^Draft:\s*(.+)$"),
+    'NBA Debut': re.compile(r"^NBA Debut:\s*(.+)$"),
+    'Experience': re.compile(r"^(?:Experience|Career Length):\s*(.+)$"),
+}
+
+
+class Profile(NamedTuple):
+    bio: dict
+    per_game: pd.DataFrame  # one row per season and team, with the season as an int
+    advanced: pd.DataFrame
+    career: dict  # the per-game table's Career row
+    meta: dict  # fetched_at and last_season, which decide when the page is read again
+
+
+def headshot_url(player_id):
+    return f"{settings.BASE_URL}/req/202106291/images/headshots/{player_id}.jpg"
+
+
+def player_url(player_id):
+    return f"{settings.BASE_URL}/players/{player_id[0]}/{player_id}.html"
+
+
+def _fetch_headshot(player_id):
+    import http_client
+    import requests
+
+    try:
+        return http_client.get(headshot_url(player_id))
+    except requests.HTTPError as exc:
+        if exc.response is not None and exc.response.status_code == 404:
+            # Not every player has a headshot; remember that instead of asking again
+            return None
+        # Throttled (429) or upstream trouble (5xx): no photo this time, asked for again next rerun
+        return _UNAVAILABLE
+    except requests.RequestException:
+        # A timeout or dropped connection: the card goes without the photo this time, and it is asked for again
+        return _UNAVAILABLE
+
+
+def _fetch_all(cache, player_ids, fetch_one):
+    results = {}
+    missing = []
+    for player_id in dict.fromkeys(player_ids):
+        value = cache.get(player_id, _MISSING)
+        if value is _MISSING:
+            missing.append(player_id)
+        else:
+            results[player_id] = value
+    # Downloads run on pool threads, so their fetch spans are not part of this rerun's trace
+    telemetry.annotate(rows=len(results) + len(missing), cache="miss" if missing else "hit", fetched=len(missing))
+    for player_id, value in zip(missing, _pool.map(fetch_one, missing)):
+        if value is _UNAVAILABLE:
+            value = None
+        else:
+            cache.put(player_id, value)
+        results[player_id] = value
+    return results
+
+
+def fetch_headshots(player_ids):
+    # Image bytes (or None when the player has no headshot) per id, downloaded concurrently
+    with telemetry.span("headshots"):
+        return _fetch_all(headshot_cache, player_ids, _fetch_headshot)
+
+
+################# Player pages ################
+
+def _line_text(element):
+    return " ".join("".join(element.itertext()).split())
+
+
+def parse_bio(block):
+    """Name, birth date and the labelled lines (position, height, draft, ...) of the page's meta block."""
+    bio = {}
+    name = block.find(".//h1")
+    if name is not None:
+        bio['Name'] = _line_text(name)
+    born = block.find(".//*[@data-birth]")
+    if born is not None:
+        bio['Born'] = born.get("data-birth")
+    for line in block.iter("p"):
+        text = _line_text(line)
+        for field, pattern in BIO_FIELDS.items():
+            match = pattern.search(text)
+            if match and field not in bio:
+                bio[field] = match.group(1)
+    return bio
+
+
+def clean_career_table(df):
+    # (season rows with an int Season and numeric stats, the Career row as a dict)
+    if 'Season' not in df.columns or not len(df):
+        return pd.DataFrame(columns=['Season']), {}
+    df = df.drop(columns=['Rk'], errors='ignore')
+    labels = [column for column in df.columns if column in LABEL_COLUMNS]
+    stats = df.drop(columns=labels).apply(pd.to_numeric, errors='coerce').astype('float32')
+    df = pd.concat([df[labels].fillna(''), stats], axis=1)
+    season = df['Season'].astype(str).str.extract(_SEASON)
+    is_season = season[0].notna()
+    career_rows = df[df['Season'].astype(str) == 'Career']
+    career = {column: float(value) for column, value in career_rows.iloc[0][stats.columns].items()
+              if pd.notna(value)} if len(career_rows) else {}
+    # Seasons spent out of the league ("Did Not Play") have no games
+    seasons = df[is_season].assign(Season=season[0][is_season].astype(int) + 1)
+    if 'G' in seasons:
+        seasons = seasons[seasons['G'].notna()]
+    return seasons.reset_index(drop=True), career
+
+
+def parse_player_page(body):
+    """A ``Profile`` from a player page, parsing only the per-game and advanced tables and the bio block."""
+    from html_tables import extract_page
+
+    table_ids = list(PROFILE_TABLE_IDS.values())
+    with telemetry.span("parse", bytes=len(body)) as span:
+        tables, blocks = extract_page(body, table_ids, [BIO_BLOCK])
+        span.set(rows=sum(len(table) for table in tables.values()), tables=len(tables))
+    frames = {}
+    for name, ids in PROFILE_TABLE_IDS.items():
+        table_id = next((t for t in ids if t in tables), None)
+        frames[name] = tables[table_id] if table_id else pd.DataFrame()
+    with telemetry.span("transform", rows=sum(len(frame) for frame in frames.values())):
+        per_game, career = clean_career_table(frames['per_game'])
+        advanced, _ = clean_career_table(frames['advanced'])
+        bio = parse_bio(blocks[BIO_BLOCK]) if BIO_BLOCK in blocks else {}
+    last_season = int(per_game['Season'].max()) if len(per_game) else None
+    return Profile(bio, per_game, advanced, career, {"fetched_at": time.time(), "last_season": last_season})
+
+
+class ProfileStore:
+    """Parsed player pages on disk, one directory per player id.
+
+    ``<id>/per_game.parquet`` and ``<id>/advanced.parquet`` hold the career tables and
+    ``<id>/profile-v<N>.json`` the bio, the Career row and when the page was read; the JSON is
+    written last, so a profile is only seen once complete. A player whose last season is
+    over (more than a season ago) never changes and is never fetched again. An active
+    player's profile goes stale once the current season's per-game table in the season
+    cache has been scraped again since the page was read (or, if that season was never
+    loaded, after the season cache's TTL), so a season update re-fetches only their pages.
+    """
+
+    def __init__(self, root=None, season_cache=None):
+        self.root = root or os.path.join(settings.CACHE_DIR, "profiles")
+        self._season_cache = season_cache
+
+    def _dir(self, player_id):
+        return os.path.join(self.root, player_id[0], player_id)
+
+    def _json_path(self, player_id):
+        return os.path.join(self._dir(player_id), "profile-v%d.json" % PROFILE_VERSION)
+
+    def season_cache(self):
+        # The season cache current seasons are read from (the app's, unless one was given)
+        if self._season_cache is None:
+            import nba_data
+            return nba_data.season_cache
+        return self._season_cache
+
+    def is_active(self, meta):
+        last_season = meta.get("last_season")
+        return last_season is not None and last_season >= settings.current_season() - 1
+
+    def is_fresh(self, meta):
+        if not self.is_active(meta):
+            return True
+        seasons = self.season_cache()
+        updated = seasons.fetched_at("players", settings.current_season())
+        if updated is None:
+            return time.time() - meta["fetched_at"] < seasons.ttl
+        return meta["fetched_at"] >= updated
+
+    def get(self, player_id, allow_stale=False):
+        try:
+            with open(self._json_path(player_id)) as fh:
+                data = json.load(fh)
+            if not (allow_stale or self.is_fresh(data["meta"])):
+                return None
+            frames = [pd.read_parquet(os.path.join(self._dir(player_id), name + ".parquet"), engine="pyarrow")
+                      for name in ("per_game", "advanced")]
+        except (OSError, ValueError, KeyError):
+            return None
+        return Profile(data["bio"], frames[0], frames[1], data["career"], data["meta"])
+
+    def put(self, player_id, profile):
+        for name, frame in (("per_game", profile.per_game), ("advanced", profile.advanced)):
+            atomic_write(os.path.join(self._dir(player_id), name + ".parquet"), to_parquet_bytes(frame))
+        data = {"bio": profile.bio, "career": profile.career, "meta": profile.meta}
+        atomic_write(self._json_path(player_id), json.dumps(data).encode())
+
+    def player_ids(self):
+        ids = []
+        for letter in sorted(os.listdir(self.root)) if os.path.isdir(self.root) else ():
+            ids += sorted(os.listdir(os.path.join(self.root, letter)))
+        return ids
+
+    def stale(self, player_ids=None):
+        """Stored profiles an update would fetch again: active players whose page is out of date."""
+        stale = []
+        for player_id in self.player_ids() if player_ids is None else player_ids:
+            profile = self.get(player_id, allow_stale=True)
+            if profile is not None and not self.is_fresh(profile.meta):
+                stale.append(player_id)
+        return stale
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+profile_store = ProfileStore()
+
+
+def _scrape_profile(player_id):
+    import http_client
+    import requests
+
+    try:
+        body = http_client.get(player_url(player_id))
+    except requests.HTTPError as exc:
+        # Only a page that is not there (or gone for good) means no profile; a 429 or 5xx is passed on
+        if exc.response is not None and exc.response.status_code in (404, 410):
+            return None
+        raise
+    return parse_player_page(body)
+
+
+def _load_profile(player_id):
+    with telemetry.span("profile", player_id=player_id, cache="hit") as span:
+        profile = profile_store.get(player_id)
+        if profile is None:
+            span.set(cache="miss")
+            try:
+                profile = _scrape_profile(player_id)
+            except Exception:
+                # Upstream is down or throttling us: an out-of-date profile beats none
+                profile = profile_store.get(player_id, allow_stale=True)
+                if profile is None:
+                    raise
+            else:
+                if profile is not None:
+                    profile_store.put(player_id, profile)
+        return profile
+
+
+def load_profile(player_id):
+    """The player's ``Profile`` (or None when there is no such page), read again only once it is stale."""
+    profile = profile_cache.get(player_id, _MISSING)
+    # None: there is no page for this id, which is not asked again
+    if profile is None or (profile is not _MISSING and profile_store.is_fresh(profile.meta)):
+        return profile
+    profile, _ = profile_flights.do(player_id, _load_profile, player_id)
+    profile_cache.put(player_id, profile)
+    return profile
+
+
+def _try_load_profile(player_id):
+    import requests
+
+    try:
+        return load_profile(player_id)
+    except requests.RequestException:
+        # Upstream failed and nothing is stored for this player: nothing was cached, so it is asked again
+        return _UNAVAILABLE
+
+
+def fetch_profiles(player_ids):
+    # Profile (or None) per id; pages not stored or out of date are downloaded concurrently.
+    # A player whose page cannot be had right now gets None this time only.
+    with telemetry.span("profiles") as span:
+        player_ids = list(dict.fromkeys(player_ids))
+        profiles = {player_id: None if profile is _UNAVAILABLE else profile
+                    for player_id, profile in zip(player_ids, _pool.map(_try_load_profile, player_ids))}
+        span.set(rows=len(profiles), unavailable=sum(profile is None for profile in profiles.values()))
+        return profiles
+
+
+def refresh_active(player_ids=None):
+    """Fetch the pages of stored active players that are out of date; returns their ids."""
+    stale = profile_store.stale(player_ids)
+    list(_pool.map(load_profile, stale))
+    return stale
@@ -0,0 +1,141 @@
+import hashlib
+import io
+import json
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+import settings
+
+
+# Bump whenever the cleaning done before a frame is cached changes, so stale layouts are never served
+SCHEMA_VERSION = 4
+
+
+def atomic_write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def to_parquet_bytes(df):
+    df = df.copy()
+    # Parquet needs one type per column; scraped object columns can mix strings with the 0 from fillna
+    for col in df.columns[df.dtypes == object]:
+        if pd.api.types.infer_dtype(df[col], skipna=True) != "string":
+            df[col] = df[col].astype(str)
+    buf = io.BytesIO()
+    df.to_parquet(buf, engine="pyarrow")
+    return buf.getvalue()
+
+
+class SeasonCache:
+    """Persistent, content-addressed store of cleaned per-season frames.
+
+    Frames are written once as Parquet blobs named after the SHA-256 of their bytes
+    (``objects/``); a small JSON ref per (kind, season) points at the current blob
+    (``refs/``). Completed seasons never expire, the in-progress season is re-scraped
+    once its ref is older than ``ttl`` seconds.
+    """
+
+    def __init__(self, root=None, ttl=None):
+        self.root = root or os.path.join(settings.CACHE_DIR, "seasons")
+        self.ttl = settings.CURRENT_SEASON_TTL if ttl is None else ttl
+
+    def _ref_path(self, kind, year):
+        return os.path.join(self.root, "refs", f"{kind}-{year}-v{SCHEMA_VERSION}.json")
+
+    def _object_path(self, digest):
+        return os.path.join(self.root, "objects", digest[:2], digest + ".parquet")
+
+    def _read_ref(self, kind, year):
+        try:
+            with open(self._ref_path(kind, year)) as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+    def _read_object(self, digest):
+        try:
+            return pd.read_parquet(self._object_path(digest), engine="pyarrow")
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self, ref, year):
+        if ref.get("expired"):
+            return False
+        if settings.is_completed_season(year):
+            return True
+        return time.time() - ref["fetched_at"] < self.ttl
+
+    def has(self, kind, year):
+        # A fresh copy is stored; reads only the small ref, not the frame
+        ref = self._read_ref(kind, year)
+        return ref is not None and self.is_fresh(ref, year)
+
+    def fetched_at(self, kind, year):
+        # When the stored copy was scraped (epoch seconds), or None
+        ref = self._read_ref(kind, year)
+        return ref["fetched_at"] if ref is not None else None
+
+    def expire(self, kind, year):
+        # The stored copy is then only the fallback for a failed scrape; the next load scrapes again
+        ref = self._read_ref(kind, year)
+        if ref is not None:
+            ref["expired"] = True
+            atomic_write(self._ref_path(kind, year), json.dumps(ref).encode())
+
+    def get(self, kind, year, allow_stale=False):
+        ref = self._read_ref(kind, year)
+        if ref is None or not (allow_stale or self.is_fresh(ref, year)):
+            return None
+        return self._read_object(ref["digest"])
+
+    def put(self, kind, year, df):
+        data = to_parquet_bytes(df)
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            atomic_write(path, data)
+        ref = {"digest": digest, "fetched_at": time.time(), "rows": len(df)}
+        atomic_write(self._ref_path(kind, year), json.dumps(ref).encode())
+        return digest
+
+    def get_or_load(self, kind, year, loader):
+        df = self.get(kind, year)
+        if df is not None:
+            return df
+        try:
+            df = loader(year)
+        except Exception:
+            # Upstream is down or throttling us: an expired copy beats an error page
+            stale = self.get(kind, year, allow_stale=True)
+            if stale is not None:
+                return stale
+            raise
+        self.put(kind, year, df)
+        return df
+
+    def get_or_load_many(self, kinds, year, loader):
+        # For pages that yield several frames at once: one scrape fills every kind, returned as a dict
+        frames = {kind: self.get(kind, year) for kind in kinds}
+        if all(df is not None for df in frames.values()):
+            return frames
+        try:
+            frames = loader(year)
+        except Exception:
+            stale = {kind: self.get(kind, year, allow_stale=True) for kind in kinds}
+            if all(df is not None for df in stale.values()):
+                return stale
+            raise
+        for kind in kinds:
+            self.put(kind, year, frames[kind])
+        return frames
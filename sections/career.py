@@ -0,0 +1,28 @@
+import streamlit as st
+
+from player_index import player_index
+from player_store import player_store, season_averages
+
+
+CAREER_STATS = ['PTS', 'TRB', 'AST', 'STL', 'BLK', 'TOV', 'MP', 'FG%', '3P%', 'FT%', 'eFG%']
+
+
+def render(selected_year, df_selected_team):
+    st.markdown("## Career Trends")
+    st.markdown("Follow a player's performance over every season stored locally.")
+    career_player = st.selectbox('Select a Player', sorted(df_selected_team['Player'].unique()), key='career_player')
+    career_ids = player_index.row_ids(df_selected_team, career_player, selected_year) if career_player else []
+    if len(career_ids) > 1:
+        # Two players of this season share the name; their teams tell them apart
+        teams = {player_id: ", ".join(df_selected_team.loc[df_selected_team['player_id'] == player_id, 'Tm'].astype(str))
+                 for player_id in career_ids}
+        career_player_id = st.radio('Which one?', career_ids, format_func=lambda player_id: f"{career_player} ({teams[player_id]})",
+                                    key='career_player_id')
+    else:
+        career_player_id = career_ids[0] if career_ids else None
+    if career_player_id:
+        career = player_store.player_career(career_player_id)
+        career_stats = st.multiselect('Statistics', CAREER_STATS, ['PTS', 'TRB', 'AST'], key='career_stats')
+        if career_stats:
+            st.line_chart(season_averages(career, career_stats))
+        st.markdown(f"*{career['Season'].nunique()} season(s) found among the {len(player_store.seasons())} stored locally; run `python backfill.py` to add the rest.*")
@@ -0,0 +1,17 @@
+import streamlit as st
+
+import telemetry
+
+
+def render():
+    if st.sidebar.checkbox('Show diagnostics', key='diagnostics'):
+        spans = telemetry.current_rerun()
+        rerun_ms = telemetry.rerun_ms()
+        st.sidebar.markdown(f"**This rerun:** {rerun_ms:.0f} ms ({telemetry.rerun_cpu_ms():.0f} ms CPU), {len(spans)} timed steps")
+        # One row per step in start order, indented under the step that called it
+        st.sidebar.dataframe(
+            [{'Step': '  ' * span.depth + span.name, 'ms': round(span.ms, 1), 'CPU ms': round(span.cpu_ms, 1), 'Share': 100 * span.ms / rerun_ms if rerun_ms else 0,
+              'Cache': span.attrs.get('cache', ''), 'Rows': span.attrs.get('rows'), 'Bytes': span.attrs.get('bytes')} for span in spans],
+            column_config={'Share': st.column_config.ProgressColumn('Share', format='%.0f%%', min_value=0, max_value=100)},
+            hide_index=True,
+        )
@@ -0,0 +1,87 @@
+# Markdown shown behind the "Show ... Glossary" checkboxes
+
+STAT_COLUMNS = '''
+            * Rk -- Rank
+            * Pos -- Position
+            * Age -- Player's age on February 1 of the season
+            * Tm -- Team
+            * G -- Games
+            * GS -- Games Started
+            * MP -- Minutes Played Per Game
+            * FG -- Field Goals Per Game
+            * FGA -- Field Goal Attempts Per Game
+            * FG% -- Field Goal Percentage
+            * 3P -- 3-Point Field Goals Per Game
+            * 3PA -- 3-Point Field Goal Attempts Per Game
+            * 3P% -- 3-Point Field Goal Percentage
+            * 2P -- 2-Point Field Goals Per Game
+            * 2PA -- 2-Point Field Goal Attempts Per Game
+            * 2P% -- 2-Point Field Goal Percentage
+            * eFG% -- Effective Field Goal Percentage
+            This statistic adjusts for the fact that a 3-point field goal is worth one more point than a 2-point field goal.
+            * FT -- Free Throws Per Game
+            * FTA -- Free Throw Attempts Per Game
+            * FT% -- Free Throw Percentage
+            * ORB -- Offensive Rebounds Per Game
+            * DRB -- Defensive Rebounds Per Game
+            * TRB -- Total Rebounds Per Game
+            * AST -- Assists Per Game
+            * STL -- Steals Per Game
+            * BLK -- Blocks Per Game
+            * TOV -- Turnovers Per Game
+            * PF -- Personal Fouls Per Game
+            * PTS -- Points Per Game'''
+
+ADVANCED_COLUMNS = '''
+            * TS% -- True Shooting Percentage: PTS / (2 * (FGA + 0.44 * FTA))
+            * PTS/36, TRB/36, AST/36, STL/36, BLK/36, TOV/36 -- Per 36 Minutes
+            * PTS/100, TRB/100, AST/100 -- Per 100 Team Possessions while on the floor
+            * USG% -- Usage Percentage: share of the team's plays used while on the floor
+            * PER -- Player Efficiency Rating, adjusted for pace; the league average is 15 every season
+            Metrics whose inputs were not recorded in a season (e.g. turnovers before 1978) are left empty.'''
+
+TEAM_NAMES = '''
+* Atlanta Hawks - ATL
+* Boston Celtics - BOS
+* Brooklyn Nets - BKN
+* Charlotte Hornets - CHA
+* Chicago Bulls - CHI
+* Cleveland Cavaliers - CLE
+* Dallas Mavericks - DAL
+* Denver Nuggets - DEN
+* Detroit Pistons - DET
+* Golden State Warriors - GSW
+* Houston Rockets - HOU
+* Indiana Pacers - IND
+* LA Clippers - LAC
+* Los Angeles Lakers - LAL
+* Memphis Grizzlies - MEM
+* Miami Heat - MIA
+* Milwaukee Bucks - MIL
+* Minnesota Timberwolves - MIN
+* New Orleans Pelicans - NOP
+* New York Knicks - NYK
+* Oklahoma City Thunder - OKC
+* Orlando Magic - ORL
+* Philadelphia 76ers - PHI
+* Phoenix Suns - PHX
+* Portland Trail Blazers - POR
+* Sacramento Kings - SAC
+* San Antonio Spurs - SAS
+* Toronto Raptors - TOR
+* Utah Jazz - UTA
+* Washington Wizards - WAS \n
+Please note that some teams have changed their names or relocated during this period, and the abbreviations have remained consistent with the teams' histories.
+'''
+
+POSITIONS = '''
+- **Point Guard (PG):** The point guard, often referred to as the "floor general," is responsible for running the team's offense. They are known for their ball-handling skills, passing, and court vision. Point guards set up plays, distribute the ball to teammates, and often take on a leadership role.
+
+- **Shooting Guard (SG):**  The shooting guard is primarily a scoring position. They are usually one of the team's primary perimeter shooters and are expected to score points from long-range shots (three-pointers) and mid-range jumpers. Shooting guards also play a role in perimeter defense.
+
+- **Small Forward (SF):**  Small forwards are versatile players who can contribute both offensively and defensively. They often play on the wing and are expected to score, rebound, and defend. Small forwards can be a crucial part of a team's transition game and can play a "point forward" role if they have strong playmaking skills.
+
+- **Power Forward (PF):** Power forwards are known for their physicality and strength. They play close to the basket and are responsible for scoring in the post, grabbing rebounds, and providing interior defense. Some power forwards also have the ability to stretch the floor with their shooting.
+
+- **Center (C):** The center is typically the tallest player on the team and plays near the basket. They are essential for shot-blocking, rebounding, and scoring in the paint. Centers are often the anchors of a team's defense, protecting the rim and altering opponents' shots.
+'''
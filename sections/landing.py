@@ -0,0 +1,43 @@
+import streamlit as st
+
+
+LOGO = 'https://pngimg.com/uploads/nba/nba_PNG8.png'
+
+INTRO = ''' 
+Welcome to the NBA Player Statistic Explorer, a powerful tool for basketball enthusiasts and data analysts! This application performs web scraping of NBA player statistics from [Basketball-Reference](https://www.basketball-reference.com/), providing you with a wealth of information on player performance.
+
+### Features:
+* Explore NBA player statistics from various seasons.
+* Compare player statistics across different years.
+* Analyze team performance with various metrics.
+
+### Python Libraries Used:
+This application is powered by a set of Python libraries:
+* `pandas`: Used for data manipulation and analysis.
+* `seaborn` and `matplotlib`: Utilized for data visualization, allowing us to create insightful charts and plots.
+* `BeautifulSoup`: Enables us to scrape data from the web.
+* `requests`: Used to fetch data from web pages.
+
+### Data Source:
+We retrieve NBA player statistics from [Basketball-Reference](https://www.basketball-reference.com/), a reputable source for basketball data. The data includes player performance, team statistics, and much more.
+
+### How to Use:
+1. Select the year you want to explore using the dropdown menu.
+2. Choose your preferred analysis option from the radio buttons.
+3. Enjoy in-depth insights into NBA player and team statistics!
+
+Get ready to dive into the world of NBA data and uncover fascinating insights. Explore player stats, track team performance, and gain a deeper understanding of the game. Let's start analyzing the numbers and discovering the true MVPs of the NBA!
+         
+            '''
+
+
+def render():
+    # Only streamlit is needed here, so this shows while the data and plotting modules are still loading
+    st.markdown("<h1 style='text-align: center;'>NBA Player Statistic Explorer</h1>", unsafe_allow_html=True)
+    st.markdown(
+        f'<div style="display: flex; justify-content: center;"><img src="{LOGO}" width="200" /></div>',
+        unsafe_allow_html=True
+    )
+    st.markdown("<h4 style='text-align: center;'>Developed by Raihan Rasheed</h4>", unsafe_allow_html=True)
+    st.markdown("---")
+    st.markdown(INTRO)
@@ -0,0 +1,139 @@
+import pandas as pd
+import streamlit as st
+
+import charts
+import settings
+import similarity
+import telemetry
+from player_index import player_index
+from shared_dataset import shared_dataset
+
+
+def comparison_chart(data, order, value_vars, title):
+    data = data.melt(id_vars=["Player"], value_vars=value_vars)
+    if settings.CHART_BACKEND == charts.VEGA_LITE:
+        # The browser draws it: nothing is rasterized here and plotting libraries are never imported
+        st.vega_lite_chart(charts.grouped_bar_spec(data[["Player", "variable", "value"]].itertuples(index=False), order, title),
+                           use_container_width=True)
+        return
+
+    # pyplot and seaborn are by far the slowest imports of the app, so they wait for the first chart
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    # Create a bar chart with hues
+    fig = plt.figure(figsize=(12, 6))
+    ax = sns.barplot(data=data, x="Player", y="value", hue="variable", order=order)
+    plt.xlabel(" ")
+    plt.ylabel("Performance Metrics")
+    plt.title(title)
+    plt.xticks(rotation=0, ha="center")
+    # Display numerical values on the bars
+    for p in ax.patches:
+        ax.annotate(f'{p.get_height():.2f}', (p.get_x() + p.get_width() / 2., p.get_height()), ha='center', va='center', fontsize=10, color='black', xytext=(0, 5), textcoords='offset points')
+    # Show the plot in Streamlit, then free the figure
+    st.pyplot(fig)
+    plt.close(fig)
+
+
+def render(selected_year, df_selected_team):
+    st.markdown("## Select Players for Individual Comparision")
+    st.markdown("You may choose more than one player of your choice to compare performances between them.")
+    st.markdown( "*Note: The data will be shown only for the year selected earlier, selected teams and positions.*")
+    selected_players = st.multiselect('Select Player(s)', list(df_selected_team['Player'].unique()), key='players')
+    if not selected_players:
+        return
+
+    ################
+    #player profile section
+    st.header('Player Profile')
+    ################
+    import profiles
+
+    # Each player's basketball-reference ids, read off their rows: two players sharing a name each get
+    # their own; players without a known id are not fetched
+    player_ids = {selected_player: player_index.row_ids(df_selected_team, selected_player, selected_year)
+                  for selected_player in selected_players}
+    all_ids = [player_id for ids in player_ids.values() for player_id in ids]
+
+    # Headshots of all selected players are downloaded together instead of one after another
+    headshots = profiles.fetch_headshots(all_ids)
+    # Bio and career tables from each player's page, stored once and re-read only for active players
+    show_profiles = st.checkbox('Show Bio and Career Tables', key='show_profiles')
+    player_profiles = {}
+    if show_profiles:
+        import requests
+
+        try:
+            player_profiles = profiles.fetch_profiles(all_ids)
+        except requests.RequestException:
+            # The cards are still shown, without the bio and career tables
+            st.caption("Player bios are unavailable right now; try again in a moment.")
+
+    for selected_player in selected_players:
+        # Display the selected player's statistics
+        player_data = df_selected_team[df_selected_team['Player'] == selected_player]
+        st.subheader(selected_player)
+        st.dataframe(player_data)
+
+        for player_id in player_ids[selected_player]:
+            headshot = headshots.get(player_id)
+            if headshot is not None:
+                st.image(headshot)
+
+            profile = player_profiles.get(player_id)
+            if profile is not None:
+                st.markdown(" · ".join(f"**{field}:** {value}" for field, value in profile.bio.items() if field != 'Name'))
+                st.markdown("*Career per game*")
+                st.dataframe(profile.per_game)
+                if profile.career:
+                    st.dataframe([profile.career])
+                if len(profile.advanced):
+                    st.markdown("*Career advanced*")
+                    st.dataframe(profile.advanced)
+
+    st.subheader('Player Stats for Selected Player(s)')
+    df_selected_players = df_selected_team[df_selected_team['Player'].isin(selected_players)]
+    st.dataframe(df_selected_players)
+    if st.checkbox('Show Charts', key='show_charts'):
+        with telemetry.span("render", chart="comparison", rows=len(df_selected_players)):
+            # Define the order of players for proper grouping
+            order = selected_players
+
+            ################################# Player Statistics Chart #################################
+            comparison_chart(df_selected_players, order, ["3P%", "2P%", "FT%", "FG%", 'eFG%'], "Player Offence Statistics Comparison")
+
+            ################################# Player Defensive Charts #################################
+            comparison_chart(df_selected_players, order, ['ORB', 'DRB', 'STL', 'BLK', 'PF'], "Player Defence Statistics Comparison")
+
+    ################################# Similar Player-Seasons #################################
+    if st.checkbox('Find Similar Player-Seasons', key='show_similar'):
+        st.markdown("*Nearest player-seasons of any era in the local store, by per-game stats and advanced rates "
+                    "measured against each season's league.*")
+        rows = df_selected_players[['Player', 'Tm']].drop_duplicates()
+        labels = [f"{player} ({team})" for player, team in rows.itertuples(index=False)]
+        choice = st.selectbox('Player-season', labels, key='similar_player')
+        k = st.slider('Number of similar player-seasons', 1, 20, 5, key='similar_k')
+        version, history = shared_dataset.snapshot()
+        if history is None:
+            st.markdown("*No seasons stored locally yet.*")
+            return
+        player, team = rows.iloc[labels.index(choice)]
+        with telemetry.span("similar", k=k) as span:
+            index = similarity.similarity_index('all-seasons', history, version)
+            row = index.row_of(player, selected_year, team)
+            similar = index.similar(row, k) if row is not None else None
+            span.set(rows=len(history))
+        if similar is None:
+            st.markdown(f"*{choice} {selected_year} is not in the local store yet.*")
+            return
+        st.dataframe(similar)
+        # The same comparison charts, with the chosen season first and each bar labelled with its season
+        compared = pd.concat([df_selected_players[(df_selected_players['Player'] == player) & (df_selected_players['Tm'] == team)]
+                              .assign(Season=selected_year), similar], ignore_index=True)
+        compared['Player'] = [f"{name} ({tm} {int(season)})" for name, tm, season in
+                              compared[['Player', 'Tm', 'Season']].itertuples(index=False)]
+        with telemetry.span("render", chart="similar", rows=len(compared)):
+            order = list(compared['Player'])
+            comparison_chart(compared, order, ["3P%", "2P%", "FT%", "FG%", 'eFG%'], "Similar Player-Seasons Offence Statistics Comparison")
+            comparison_chart(compared, order, ['ORB', 'DRB', 'STL', 'BLK', 'PF'], "Similar Player-Seasons Defence Statistics Comparison")
@@ -0,0 +1,49 @@
+from typing import NamedTuple
+
+import streamlit as st
+
+import filters
+from sections import glossary
+
+
+class Selection(NamedTuple):
+    teams: list
+    positions: list
+    min_games: int
+    min_minutes: int
+
+    def apply(self, frame, key, fingerprint=None):
+        # Answered from per-season team and position masks rather than by scanning the string columns
+        return filters.select(frame, key, teams=self.teams, positions=self.positions,
+                              min_games=self.min_games, min_minutes=self.min_minutes, fingerprint=fingerprint)
+
+    def count(self, frame, key, fingerprint=None):
+        return filters.count(frame, key, teams=self.teams, positions=self.positions,
+                             min_games=self.min_games, min_minutes=self.min_minutes, fingerprint=fingerprint)
+
+    def apply_by_season(self, frame, key, fingerprint=None):
+        # The same rows as apply(), one season at a time
+        return filters.select_by_season(frame, key, teams=self.teams, positions=self.positions,
+                                        min_games=self.min_games, min_minutes=self.min_minutes, fingerprint=fingerprint)
+
+
+def render(playerstats):
+    ################
+    # Team selection, every team of the season selected by default
+    ################
+    sorted_unique_team = sorted(playerstats.Tm.unique())
+    st.markdown("## Select one or more Teams of your choice")
+    selected_team = st.multiselect('Team', sorted_unique_team, sorted_unique_team, key='teams')
+    if st.checkbox("Show Team Name Glossary", key='show_team_glossary'):
+        st.markdown(glossary.TEAM_NAMES)
+
+    ################# Position selection #################
+    selected_pos = ['C','PF','SF','PG','SG']
+    unique_pos = filters.POSITIONS
+    selected_pos = st.multiselect('Position', unique_pos, selected_pos, key='positions')
+    min_games = st.slider('Minimum games played', 0, 82, 0, key='min_games')
+    min_minutes = st.slider('Minimum minutes per game', 0, 40, 0, key='min_minutes')
+    if st.checkbox("Show Position Glossary", key='show_position_glossary'):
+        st.markdown(glossary.POSITIONS)
+
+    return Selection(selected_team, selected_pos, min_games, min_minutes)
@@ -0,0 +1,61 @@
+import streamlit as st
+
+import export
+from nba_data import memory_usage_mb
+from sections import glossary
+from shared_dataset import shared_dataset
+
+
+################
+# Download NBA player stats data
+# The file is only built when asked for, one season and CHUNK_ROWS rows at a time, into a temp file
+# that spills to disk past 8 MB. Streamlit 1.28's download button takes the finished file as one
+# bytes object and keeps it in memory while the button is shown, so that copy is the export's size.
+################
+
+EXPORT_SCOPES = ['Selected season', 'All stored seasons']
+
+
+def export_frames(scope, df_selected_team, selection):
+    if scope == 'Selected season':
+        yield df_selected_team
+        return
+    # Filtered on the shared memory-mapped dataset and copied out one season at a time
+    version, history = shared_dataset.snapshot()
+    if history is None:
+        return  # nothing published yet; render() does not get this far
+    yield from selection.apply_by_season(history, 'all-seasons', fingerprint=version)
+
+
+def export_rows(scope, df_selected_team, selection):
+    # Rows the export would hold, or None while the all-seasons dataset is not published yet
+    if scope == 'Selected season':
+        return len(df_selected_team)
+    version, history = shared_dataset.snapshot()
+    if history is None:
+        return None
+    return selection.count(history, 'all-seasons', fingerprint=version)
+
+
+def render(selected_year, df_selected_team, selection):
+    if st.checkbox("Show Players Statistics of the selected Team(s)", key='show_player_stats'):
+        st.header('Player Statistics of Selected Team(s)')
+        st.write('Data Dimension: ' + str(df_selected_team.shape[0]) + ' rows and ' + str(df_selected_team.shape[1]) + ' columns, ' + f'{memory_usage_mb(df_selected_team):.2f}' + ' MB in memory.')
+        st.dataframe(df_selected_team)
+        if st.checkbox("Show Advanced Stats Glossary", key='show_advanced_glossary'):
+            st.markdown(glossary.ADVANCED_COLUMNS)
+        export_format = st.selectbox('Export format', list(export.FORMATS), key='export_format')
+        export_scope = st.radio('Export seasons', EXPORT_SCOPES, key='export_scope')
+        if st.button('Prepare download', key='prepare_export'):
+            rows = export_rows(export_scope, df_selected_team, selection)
+            if rows is None:
+                st.info('The all-seasons dataset is still being published; try again in a moment.')
+                return
+            if not rows:
+                st.info('No players match the current filters, so there is nothing to download.')
+                return
+            extension, mime, _ = export.FORMATS[export_format]
+            chunks = export.iter_export(export_frames(export_scope, df_selected_team, selection), export_format)
+            with export.spool(chunks) as fh:
+                name = 'playerstats-' + (str(selected_year) if export_scope == 'Selected season' else 'all-seasons')
+                st.download_button('Download ' + export_format, fh.read(), file_name=name + extension, mime=mime)
@@ -0,0 +1,67 @@
+import json
+
+import streamlit as st
+
+import charts
+import leaderboards
+from nba_data import data_version, load_league_tables
+from player_store import player_store
+from shared_dataset import shared_dataset
+
+
+CUSTOM_LEADERBOARD = "Custom Leaderboard (any statistic, teams or players)"
+
+
+def show_chart(chart, image_format):
+    # An image rendered here, or a Vega-Lite spec the browser draws
+    if image_format == charts.VEGA_LITE:
+        st.vega_lite_chart(json.loads(chart), use_container_width=True)
+    else:
+        st.image(chart)
+
+
+def render(selected_year, playerstats):
+    st.markdown("## Compare Team Performances")
+
+    selected_option = st.radio("Select Team Performance Statistics",
+                               tuple(charts.TEAM_LEADERBOARDS) + (charts.BOTTOM_TEAM_POINTS, CUSTOM_LEADERBOARD), key='team_leaderboard')
+
+    if selected_option == CUSTOM_LEADERBOARD:
+        league = load_league_tables(selected_year)
+        leaderboard_source = st.selectbox("Data", ("Team Totals", "Team Per Game", "Player Per Game", "Player Per Game (All Seasons)"), key='leaderboard_source')
+        if leaderboard_source == "Player Per Game (All Seasons)":
+            # Every player-season in the local store, ranked once per version of the shared memory-mapped dataset
+            version, history = shared_dataset.snapshot()
+            if history is None:
+                st.markdown("*The all-seasons dataset is still being published; rerun in a moment.*")
+                return
+            board = leaderboards.leaderboard('all-seasons', history, 'Label', fingerprint=version, exclude=('Season',))
+            board_table, label_axis = 'all-seasons-' + version, 'Player'
+            st.markdown(f"*Ranking {len(player_store.seasons())} season(s) stored locally; run `python backfill.py` to add the rest.*")
+        elif leaderboard_source == "Player Per Game":
+            # Found by the season's version on a rerun; the labelled rows are built and hashed only when the board is not
+            board = leaderboards.leaderboard((selected_year, 'per_game_stats'), lambda: leaderboards.player_rows(playerstats),
+                                             'Label', version=data_version(selected_year, playerstats=playerstats))
+            board_table, label_axis = 'per_game_stats', 'Player'
+        else:
+            board_table = 'totals-team' if leaderboard_source == "Team Totals" else 'per_game-team'
+            team_kind = 'totals' if leaderboard_source == "Team Totals" else 'per_game'
+            board = leaderboards.leaderboard((selected_year, board_table), getattr(league, team_kind), 'Team',
+                                             version=data_version(selected_year, 'league-' + team_kind))
+            label_axis = 'Team'
+        metric = st.selectbox("Statistic", board.metrics, index=board.metrics.index('PTS') if 'PTS' in board.metrics else 0, key='leaderboard_metric')
+        top_n = st.slider("Number of entries", 1, leaderboards.MAX_N, 10, key='leaderboard_n')
+        bottom = st.radio("Ranking", ("Top", "Bottom"), key='leaderboard_ranking') == "Bottom"
+        image_format = charts.app_format()
+        show_chart(charts.custom_leaderboard_chart(selected_year, board_table, board, metric, top_n, bottom, leaderboard_source, label_axis,
+                                                   image_format=image_format), image_format)
+    else:
+        # One cached ranking of every totals-team column serves all of the preset charts
+        board = leaderboards.leaderboard((selected_year, 'totals-team'), load_league_tables(selected_year).totals, 'Team',
+                                         version=data_version(selected_year, 'league-totals'))
+        image_format = charts.app_format()
+        for metric, title, xlabel, color, value_format in charts.team_charts(selected_option):
+            # Rendered once per season and metric (or ahead of time by prerender.py), then served from the chart cache
+            show_chart(charts.leaderboard_chart(selected_year, 'totals-team', board, metric, 10, selected_option == charts.BOTTOM_TEAM_POINTS,
+                                                title=title, xlabel=xlabel, color=color, value_format=value_format,
+                                                image_format=image_format), image_format)
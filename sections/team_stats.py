@@ -0,0 +1,19 @@
+import streamlit as st
+
+from nba_data import load_league_tables
+from sections import glossary
+
+
+def render(selected_year):
+    if st.checkbox('Show Team Stats of the selected Year', key='show_team_stats'):
+        league = load_league_tables(selected_year)
+        df_team = league.totals
+        df_pg_team = league.per_game
+
+        if st.radio("Select a table to display", ("Total Team Stats", "Per Game Team Stats"), key='team_table') == "Total Team Stats":
+            st.dataframe(df_team)
+        else:
+            st.dataframe(df_pg_team)
+        st.markdown("Use the checkbox below to explore the explaination of columns")
+        if st.checkbox("Show Table Glossary", key='show_table_glossary'):
+            st.markdown(glossary.STAT_COLUMNS)
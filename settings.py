@@ -0,0 +1,42 @@
+import os
+from datetime import date
+
+
+# Where pages are scraped from; point it at a local stand-in server to run offline
+BASE_URL = os.environ.get("NBA_BASE_URL", "https://www.basketball-reference.com").rstrip("/")
+
+# Root directory for everything that is persisted between runs (season cache, stores, ...)
+CACHE_DIR = os.environ.get(
+    "NBA_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "nba-explorer")
+)
+
+# Seconds a cached copy of the in-progress season is served before it is scraped again
+CURRENT_SEASON_TTL = int(os.environ.get("NBA_CURRENT_SEASON_TTL", 6 * 60 * 60))
+
+# Upstream requests per second allowed from this process, across every session and worker (0 = unlimited),
+# and how many may go out back to back before the rate applies
+UPSTREAM_RATE = float(os.environ.get("NBA_UPSTREAM_RATE", 1.0))
+UPSTREAM_BURST = int(os.environ.get("NBA_UPSTREAM_BURST", 5))
+
+# Warm the cache in the background with the seasons next to the selected one and its league page (0 = off)
+PREFETCH = os.environ.get("NBA_PREFETCH", "1") not in ("", "0")
+
+# How charts are drawn: "matplotlib" renders images on the server, "vega-lite" sends a Vega-Lite spec with the
+# data embedded and the browser draws it
+CHART_BACKEND = os.environ.get("NBA_CHART_BACKEND", "matplotlib").strip().lower()
+
+# Telemetry: write every timing span as a JSON line to stderr, and/or serve Prometheus metrics on this port (0 = off)
+TELEMETRY_LOG = os.environ.get("NBA_TELEMETRY_LOG", "") not in ("", "0")
+METRICS_PORT = int(os.environ.get("NBA_METRICS_PORT", 0))
+# Interface the metrics endpoint listens on: this host only unless set (e.g. 0.0.0.0 for a scraper on another host)
+METRICS_HOST = os.environ.get("NBA_METRICS_HOST", "127.0.0.1")
+
+
+def current_season(today=None):
+    # Basketball-Reference names a season after the year it ends in, and seasons tip off in October
+    today = today or date.today()
+    return today.year + 1 if today.month >= 10 else today.year
+
+
+def is_completed_season(year):
+    return int(year) < current_season()
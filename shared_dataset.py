@@ -0,0 +1,214 @@
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import settings
+import telemetry
+from advanced_stats import advanced_stats, team_context
+from player_store import player_store
+from season_cache import atomic_write
+
+
+# Dictionary-encoded label columns of the published table
+LABEL_COLUMNS = ['Player', 'Pos', 'Tm', 'player_id']
+
+# Columns of the store that advanced_stats reads
+ADVANCED_INPUTS = ['Season', 'Tm', 'G', 'MP', 'FG', 'FGA', '3P', 'FT', 'FTA', 'ORB', 'TRB', 'AST', 'STL', 'BLK', 'TOV',
+                   'PF', 'PTS']
+
+# Bump whenever build() changes what goes into the file, so stale files are republished
+LAYOUT_VERSION = 2
+
+# Published files kept besides the current one, for readers that still have an older one mapped
+KEEP_PREVIOUS = 1
+
+
+def to_pandas(table):
+    # Nullable Arrow ints come back as pandas nullable ints, like the store's own frames, not as float64
+    import pyarrow as pa
+    mapping = {pa.int8(): pd.Int8Dtype(), pa.int16(): pd.Int16Dtype(), pa.int32(): pd.Int32Dtype(),
+               pa.int64(): pd.Int64Dtype()}
+    return table.to_pandas(types_mapper=mapping.get)
+
+
+def numeric_columns(frame):
+    if isinstance(frame, pd.DataFrame):
+        return [c for c in frame.columns if pd.api.types.is_numeric_dtype(frame[c])]
+    import pyarrow as pa
+    return [f.name for f in frame.schema if pa.types.is_integer(f.type) or pa.types.is_floating(f.type)]
+
+
+def column_values(frame, column):
+    # One column as floats with NaN for missing values, from a DataFrame or an Arrow table
+    if isinstance(frame, pd.DataFrame):
+        return frame[column].to_numpy(dtype=float, na_value=np.nan)
+    values = frame.column(column)
+    if values.num_chunks == 1 and values.null_count == 0:
+        values = values.chunk(0).to_numpy(zero_copy_only=False)  # zero-copy for the float columns
+    else:
+        values = values.to_numpy()
+    return values if values.dtype.kind == 'f' else values.astype(float)
+
+
+def column_codes(frame, column):
+    # (integer code per row, -1 when missing; labels by code) from a DataFrame or an Arrow table
+    if isinstance(frame, pd.DataFrame):
+        column = frame[column].astype('category')
+        return column.cat.codes.to_numpy(), list(column.cat.categories)
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    column = frame.column(column)
+    if not pa.types.is_dictionary(column.type):
+        column = pc.dictionary_encode(column)
+    column = column.combine_chunks() if isinstance(column, pa.ChunkedArray) else column
+    return pc.fill_null(column.indices, -1).to_numpy(), column.dictionary.to_pylist()
+
+
+class SharedDataset:
+    """The cleaned all-seasons player table, published as one Arrow IPC file every process memory-maps.
+
+    ``table()`` returns a ``pyarrow.Table`` whose buffers point into the mapped file, so all
+    Streamlit workers on a host share one copy in the page cache instead of each holding
+    its own pandas frame. Float columns are written without null bitmaps (NaN marks a
+    missing value), so ``column.to_numpy()`` is zero-copy for them.
+
+    ``publish()`` writes ``all-seasons-<version>.arrow`` next to the store and then
+    atomically replaces ``CURRENT.json``, which names the file to open. Readers check the
+    pointer on every call and switch to a new file without a restart; a file that is still
+    mapped somewhere stays readable after it is unlinked. When the store has moved on,
+    ``snapshot()`` starts one background publish and keeps serving the last published file
+    until the new one is in place, so no rerun waits for a rebuild.
+    """
+
+    def __init__(self, store=None, root=None):
+        self.store = store or player_store
+        self.root = root or os.path.join(settings.CACHE_DIR, "store", "dataset")
+        self._lock = threading.Lock()
+        self._current = None  # (version, table)
+        self._publisher = None  # the background publish thread, while one runs
+
+    def version(self):
+        return "%s-v%d" % (self.store.version(), LAYOUT_VERSION)
+
+    def _pointer_path(self):
+        return os.path.join(self.root, "CURRENT.json")
+
+    def _read_pointer(self):
+        try:
+            with open(self._pointer_path()) as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+    def build(self):
+        # One table from every stored season partition; labels are re-encoded with one shared dictionary
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.parquet as pq
+
+        tables = []
+        for year in self.store.seasons():
+            table = pq.read_table(self.store._partition_path(year)).replace_schema_metadata(None)
+            columns = []
+            for field, column in zip(table.schema, table.columns):
+                if pa.types.is_dictionary(field.type) or pa.types.is_null(field.type):
+                    column = column.cast(pa.string())
+                elif pa.types.is_floating(field.type):
+                    column = pc.fill_null(column, float('nan'))
+                columns.append(column)
+            tables.append(pa.table(columns, names=table.column_names))
+        if not tables:
+            return None
+        table = pa.concat_tables(tables).combine_chunks()
+        columns = {name: table.column(name) for name in table.column_names}
+        columns.update(self._advanced_columns(table))
+        for name in LABEL_COLUMNS:
+            if name in columns:
+                columns[name] = pc.dictionary_encode(columns[name]).combine_chunks()
+        # Bar labels for leaderboards over every season, computed once here instead of in every process
+        columns['Label'] = pc.binary_join_element_wise(
+            table.column('Player'), ' (', table.column('Tm'), ' ', table.column('Season').cast(pa.string()), ')', '')
+        return pa.table(list(columns.values()), names=list(columns))
+
+    def _advanced_columns(self, table):
+        # The same metrics load_data adds to a season, computed for the whole history in one vectorized pass
+        import pyarrow as pa
+        from nba_data import stored_team_totals
+
+        inputs = [name for name in table.column_names if name in ADVANCED_INPUTS]
+        players = table.select(inputs).to_pandas()
+        context = team_context(*stored_team_totals(players['Season'].unique()))
+        stats = advanced_stats(players, context)
+        return {name: pa.array(stats[name].to_numpy(dtype=np.float32, na_value=np.nan)) for name in stats.columns}
+
+    def publish(self):
+        """Write the store's current contents as a new file and swap readers over to it; returns the version."""
+        import pyarrow as pa
+
+        version = self.version()
+        table = self.build()
+        if table is None:
+            return None
+        name = "all-seasons-%s.arrow" % version
+        path = os.path.join(self.root, name)
+        os.makedirs(self.root, exist_ok=True)
+        tmp = "%s.%d.%d.tmp" % (path, os.getpid(), threading.get_ident())
+        with pa.OSFile(tmp, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp, path)
+        atomic_write(self._pointer_path(), json.dumps(
+            {"file": name, "version": version, "rows": table.num_rows, "published_at": time.time()}).encode())
+        self._prune(keep={name})
+        return version
+
+    def _prune(self, keep):
+        files = [f for f in os.listdir(self.root) if f.startswith("all-seasons-") and f.endswith(".arrow")]
+        old = sorted((f for f in files if f not in keep), key=lambda f: os.stat(os.path.join(self.root, f)).st_mtime)
+        for name in old[:max(len(old) - KEEP_PREVIOUS, 0)]:
+            try:
+                os.remove(os.path.join(self.root, name))
+            except OSError:
+                pass
+
+    def _publish_in_background(self):
+        # Called under the lock; one publish at a time per process
+        if self._publisher is not None and self._publisher.is_alive():
+            return
+        self._publisher = threading.Thread(target=self._background_publish, name="dataset-publish", daemon=True)
+        self._publisher.start()
+
+    def _background_publish(self):
+        try:
+            with telemetry.span("publish") as span:
+                span.set(version=self.publish())
+        except Exception:  # e.g. a partition being rewritten; the next snapshot() tries again
+            pass
+
+    def snapshot(self):
+        """(version, table) of the last published file; (None, None) if nothing is published yet.
+
+        Starts a background publish when the store has moved on since that file was written.
+        """
+        import pyarrow as pa
+
+        with self._lock:
+            pointer = self._read_pointer()
+            if pointer is None or pointer["version"] != self.version():
+                self._publish_in_background()
+            if pointer is None:
+                return None, None
+            if self._current is None or self._current[0] != pointer["version"]:
+                source = pa.memory_map(os.path.join(self.root, pointer["file"]), "r")
+                self._current = (pointer["version"], pa.ipc.open_file(source).read_all())
+            return self._current
+
+    def table(self):
+        return self.snapshot()[1]
+
+
+shared_dataset = SharedDataset()
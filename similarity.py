@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+
+import telemetry
+from lru import LRUCache
+from shared_dataset import column_codes, column_values, to_pandas
+
+
+# Per-game volume, shooting and the advanced rates; together they describe a player's role and efficiency
+FEATURES = ['MP', 'PTS', 'ORB', 'DRB', 'AST', 'STL', 'BLK', 'TOV', 'PF', 'FGA', '3PA', 'FTA',
+            'eFG%', 'FT%', 'TS%', 'USG%']
+
+# Player-seasons with fewer games are too noisy to be suggested (they can still be the query)
+MIN_GAMES = 10
+
+# Rows per matrix product, which bounds the distance block held in memory per query
+BLOCK_ROWS = 8192
+
+_indexes = LRUCache(maxsize=4)
+
+
+class SimilarityIndex:
+    """k nearest player-seasons by Euclidean distance between standardized stat vectors.
+
+    Every feature is turned into a z-score within its own season, so a player is compared
+    with other eras by how they stood against their league rather than by raw numbers
+    that pace and rules changed. A statistic not recorded in a season scores 0 (the
+    league average). Vectors are float32; a query scores every row with matrix products
+    over blocks of ``BLOCK_ROWS`` rows and keeps the running k best, using
+    ``|x - q|^2 = |x|^2 - 2 x.q + |q|^2``. ``frame`` may be a DataFrame or a
+    ``pyarrow.Table`` (e.g. the shared all-seasons dataset).
+    """
+
+    def __init__(self, frame, features=FEATURES):
+        self.frame = frame
+        self.features = [f for f in features if _has(frame, f)]
+        season_codes, _ = column_codes(frame, 'Season')
+        self.vectors = np.zeros((len(frame), len(self.features)), dtype=np.float32)
+        for j, feature in enumerate(self.features):
+            self.vectors[:, j] = _standardize(column_values(frame, feature), season_codes)
+        self.norms = np.einsum('ij,ij->i', self.vectors, self.vectors)
+        self.games = column_values(frame, 'G')
+        # Other seasons of the same player would crowd the results; they are left out
+        self.players, _ = column_codes(frame, 'player_id' if _has(frame, 'player_id') else 'Player')
+
+    def neighbours(self, rows, k=10, min_games=MIN_GAMES):
+        """(row numbers, distances), each of shape (len(rows), k), nearest first."""
+        rows = np.asarray(rows, dtype=np.intp)
+        queries = self.vectors[rows]
+        players = self.players[rows][:, None]
+        eligible = self.games >= min_games
+        best_rows = np.empty((len(rows), 0), dtype=np.intp)
+        best_scores = np.empty((len(rows), 0), dtype=np.float32)
+        for start in range(0, len(self.vectors), BLOCK_ROWS):
+            stop = min(start + BLOCK_ROWS, len(self.vectors))
+            # |x|^2 - 2 x.q: the distance up to the query's own |q|^2, which does not change the ranking
+            scores = self.norms[start:stop] - 2 * (queries @ self.vectors[start:stop].T)
+            block = np.arange(start, stop)
+            excluded = (~eligible[start:stop] | (block == rows[:, None])
+                        | ((self.players[start:stop] == players) & (players >= 0)))
+            scores[excluded] = np.inf
+            block_rows = np.broadcast_to(block, scores.shape)
+            scores = np.concatenate([best_scores, scores], axis=1)
+            candidates = np.concatenate([best_rows, block_rows], axis=1)
+            if scores.shape[1] > k:
+                keep = np.argpartition(scores, k - 1, axis=1)[:, :k]
+                scores = np.take_along_axis(scores, keep, axis=1)
+                candidates = np.take_along_axis(candidates, keep, axis=1)
+            best_scores, best_rows = scores, candidates
+        order = np.argsort(best_scores, axis=1, kind='stable')
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_rows = np.take_along_axis(best_rows, order, axis=1)
+        distances = np.sqrt(np.maximum(best_scores + self.norms[rows][:, None], 0))
+        return best_rows, distances
+
+    def similar(self, row, k=10, min_games=MIN_GAMES):
+        """The k player-seasons nearest to row ``row``, nearest first, with a Distance column."""
+        rows, distances = self.neighbours([row], k, min_games)
+        found = np.isfinite(distances[0])
+        rows, distances = rows[0][found], distances[0][found]
+        result = self.frame.iloc[rows] if isinstance(self.frame, pd.DataFrame) else to_pandas(self.frame.take(rows))
+        return result.reset_index(drop=True).assign(Distance=distances)
+
+    def row_of(self, player, season, team=None):
+        # Row number of a player's season (on one team), or None
+        mask = column_values(self.frame, 'Season') == season
+        for column, label in (('Player', player), ('Tm', team)):
+            if label is None:
+                continue
+            codes, labels = column_codes(self.frame, column)
+            mask &= codes == (labels.index(label) if label in labels else -2)
+        found = np.flatnonzero(mask)
+        return int(found[0]) if len(found) else None
+
+
+def _has(frame, column):
+    return column in (frame.columns if isinstance(frame, pd.DataFrame) else frame.column_names)
+
+
+def _standardize(values, seasons):
+    # z-scores within each season; missing values and constant columns score 0
+    present = ~np.isnan(values)
+    filled = np.where(present, values, 0.0)
+    count = np.bincount(seasons, weights=present)
+    mean = np.bincount(seasons, weights=filled) / np.maximum(count, 1)
+    variance = np.bincount(seasons, weights=filled * filled) / np.maximum(count, 1) - mean * mean
+    std = np.sqrt(np.maximum(variance, 0))[seasons]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = (values - mean[seasons]) / std
+    return np.where(present & (std > 0), z, 0.0)
+
+
+def similarity_index(key, frame, fingerprint):
+    """Cached SimilarityIndex for ``frame``; ``fingerprint`` is the data's version (e.g. the dataset's)."""
+    cache_key = (key, fingerprint)
+    index = _indexes.get(cache_key)
+    if index is None:
+        telemetry.annotate(cache="miss")
+        index = SimilarityIndex(frame)
+        _indexes.put(cache_key, index)
+    return index
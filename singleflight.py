@@ -0,0 +1,86 @@
+import contextlib
+import threading
+
+
+class Cancelled(Exception):
+    """Raised by a call its owner gave up on; other callers waiting on it run it again themselves."""
+
+
+_local = threading.local()
+
+
+@contextlib.contextmanager
+def recording(entered):
+    """Add ``(flights, key)`` for every call this thread leads meanwhile, in any SingleFlight, to the set ``entered``."""
+    previous = getattr(_local, "entered", None)
+    _local.entered = entered
+    try:
+        yield entered
+    finally:
+        _local.entered = previous
+
+
+class _Call:
+    __slots__ = ("done", "value", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Collapses concurrent calls for the same key into one.
+
+    The first caller of ``do(key, fn, ...)`` runs ``fn``; callers arriving with the same key
+    while it runs wait for it and get the same result, or the same exception; if it was
+    ``Cancelled``, one of them runs ``fn`` again. Once the call has finished the key is
+    forgotten, so a later call runs ``fn`` again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, *args):
+        """Return ``(value, shared)``, where ``shared`` is True when the value came from another caller's run."""
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+                else:
+                    call.waiters += 1
+            if leader:
+                entered = getattr(_local, "entered", None)
+                if entered is not None:
+                    entered.add((self, key))
+                break
+            call.done.wait()
+            if isinstance(call.error, Cancelled):
+                continue
+            if call.error is not None:
+                raise call.error
+            return call.value, True
+        try:
+            call.value = fn(*args)
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value, False
+
+    def waiting(self, key):
+        # Callers blocked on the call running for key right now
+        with self._lock:
+            call = self._calls.get(key)
+            return call.waiters if call is not None else 0
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,209 @@
+import json
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import settings
+
+
+log = logging.getLogger("nba.telemetry")
+
+# Upper bounds, in seconds, of the span duration histogram buckets
+BUCKETS = (0.001, 0.005, 0.025, 0.1, 0.25, 1.0, 2.5, 10.0)
+
+_local = threading.local()
+
+
+class Span:
+    # One timed step, in wall time and in CPU time of its thread. Attributes the metrics know about:
+    # bytes, rows and cache ("hit", "miss", ...)
+    __slots__ = ("name", "depth", "offset", "ms", "cpu_ms", "attrs")
+
+    def __init__(self, name, depth, offset, attrs):
+        self.name = name
+        self.depth = depth
+        self.offset = offset
+        self.ms = None
+        self.cpu_ms = None
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def as_dict(self):
+        return {"span": self.name, "depth": self.depth, "ms": round(self.ms, 3), "cpu_ms": round(self.cpu_ms, 3), **self.attrs}
+
+
+class Metrics:
+    """Per-span-name totals since the process started, rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._spans = {}
+        self._gauges = {}
+
+    def gauge(self, name, help_text, read):
+        # A value read when /metrics is scraped, e.g. how many requests are queued right now
+        with self._lock:
+            self._gauges[name] = (help_text, read)
+
+    def observe(self, span):
+        seconds = span.ms / 1000
+        with self._lock:
+            entry = self._spans.get(span.name)
+            if entry is None:
+                entry = self._spans[span.name] = {"buckets": [0] * len(BUCKETS), "count": 0, "sum": 0.0, "cpu": 0.0,
+                                                  "bytes": 0, "rows": 0, "cache": {}}
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    entry["buckets"][i] += 1
+            entry["count"] += 1
+            entry["sum"] += seconds
+            entry["cpu"] += span.cpu_ms / 1000
+            entry["bytes"] += span.attrs.get("bytes") or 0
+            entry["rows"] += span.attrs.get("rows") or 0
+            result = span.attrs.get("cache")
+            if result:
+                entry["cache"][result] = entry["cache"].get(result, 0) + 1
+
+    def render(self):
+        with self._lock:
+            spans = {name: dict(entry, buckets=list(entry["buckets"]), cache=dict(entry["cache"]))
+                     for name, entry in self._spans.items()}
+            gauges = dict(self._gauges)
+        lines = ["# HELP nba_span_seconds Time spent in an instrumented step.", "# TYPE nba_span_seconds histogram"]
+        for name, entry in sorted(spans.items()):
+            for bound, count in zip(BUCKETS, entry["buckets"]):
+                lines.append(f'nba_span_seconds_bucket{{span="{name}",le="{bound}"}} {count}')
+            lines.append(f'nba_span_seconds_bucket{{span="{name}",le="+Inf"}} {entry["count"]}')
+            lines.append(f'nba_span_seconds_sum{{span="{name}"}} {entry["sum"]:.6f}')
+            lines.append(f'nba_span_seconds_count{{span="{name}"}} {entry["count"]}')
+        lines += ["# HELP nba_span_cpu_seconds_total CPU time of the thread running a step.",
+                  "# TYPE nba_span_cpu_seconds_total counter"]
+        lines += [f'nba_span_cpu_seconds_total{{span="{name}"}} {entry["cpu"]:.6f}' for name, entry in sorted(spans.items())]
+        for metric, key, help_text in (("nba_span_bytes_total", "bytes", "Bytes handled by a step."),
+                                       ("nba_span_rows_total", "rows", "Rows produced by a step.")):
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+            lines += [f'{metric}{{span="{name}"}} {entry[key]}' for name, entry in sorted(spans.items())]
+        lines += ["# HELP nba_span_cache_total Cache lookups of a step by result.", "# TYPE nba_span_cache_total counter"]
+        for name, entry in sorted(spans.items()):
+            for result, count in sorted(entry["cache"].items()):
+                lines.append(f'nba_span_cache_total{{span="{name}",result="{result}"}} {count}')
+        for name, (help_text, read) in sorted(gauges.items()):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {read()}"]
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+def begin_rerun():
+    # Called at the top of the script: spans on this thread from here on belong to the new rerun
+    _local.trace = []
+    _local.stack = []
+    _local.started = time.perf_counter()
+    _local.cpu_started = time.thread_time()
+
+
+def rerun_ms():
+    started = getattr(_local, "started", None)
+    return (time.perf_counter() - started) * 1000 if started is not None else 0.0
+
+
+def rerun_cpu_ms():
+    # CPU time this rerun's thread has used so far; work on other threads (e.g. prefetches) is not counted
+    started = getattr(_local, "cpu_started", None)
+    return (time.thread_time() - started) * 1000 if started is not None else 0.0
+
+
+def current_rerun():
+    """Finished spans of this thread's rerun so far, in start order (parents before their children)."""
+    return sorted(getattr(_local, "trace", ()), key=lambda s: (s.offset, s.depth))
+
+
+def annotate(**attrs):
+    # Set attributes on the innermost open span of this thread, e.g. cache="miss" from inside a loader
+    stack = getattr(_local, "stack", None)
+    if stack:
+        stack[-1].set(**attrs)
+
+
+@contextmanager
+def span(name, **attrs):
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    start = time.perf_counter()
+    cpu_start = time.thread_time()
+    current = Span(name, len(stack), start - getattr(_local, "started", start), attrs)
+    stack.append(current)
+    try:
+        yield current
+    except Exception as exc:
+        current.set(error=type(exc).__name__)
+        raise
+    finally:
+        current.ms = (time.perf_counter() - start) * 1000
+        current.cpu_ms = (time.thread_time() - cpu_start) * 1000
+        if stack and stack[-1] is current:
+            stack.pop()
+        trace = getattr(_local, "trace", None)
+        if trace is not None:
+            trace.append(current)
+        metrics.observe(current)
+        if log.isEnabledFor(logging.INFO):
+            log.info(json.dumps({"ts": round(time.time(), 3), "thread": threading.current_thread().name,
+                                 **current.as_dict()}, default=str))
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def serve_metrics(port=None, host=None):
+    """Serve ``/metrics`` from a daemon thread, once per process; a no-op when the port is 0.
+
+    Listens on ``settings.METRICS_HOST`` (this host only by default) unless ``host`` is given.
+    """
+    global _server
+    port = settings.METRICS_PORT if port is None else port
+    host = settings.METRICS_HOST if host is None else host
+    with _server_lock:
+        if _server is not None or not port:
+            return _server
+        try:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        except OSError as exc:
+            # Another process (e.g. a second app worker) already serves this port
+            log.warning("metrics endpoint not started on %s:%d: %s", host, port, exc)
+            return None
+        _server.daemon_threads = True
+        threading.Thread(target=_server.serve_forever, daemon=True).start()
+        return _server
+
+
+if settings.TELEMETRY_LOG and not log.handlers:
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    log.addHandler(handler)
+    log.setLevel(logging.INFO)
+    log.propagate = False
@@ -0,0 +1,17 @@
+import os
+import shutil
+import sys
+import tempfile
+
+# Repo modules are imported from the root, as the app does, and read their cache location at
+# import time, so point them at a scratch directory before any test imports them
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+SCRATCH_DIR = tempfile.mkdtemp(prefix="nba-tests-")
+os.environ["NBA_CACHE_DIR"] = SCRATCH_DIR
+# The stand-in serves the committed synthetic pages, whatever a local setup points at
+os.environ["NBA_FIXTURE_DIR"] = os.path.join(ROOT, "bench", "fixtures")
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(SCRATCH_DIR, ignore_errors=True)
@@ -0,0 +1,31 @@
+import pandas as pd
+import pytest
+
+from advanced_stats import advanced_stats, team_context
+from bench.advanced_stats import EXPECTED, PLAYERS, TEAMS, reference_per
+
+
+@pytest.fixture(scope="module")
+def stats():
+    return advanced_stats(PLAYERS, team_context(TEAMS)).set_index(PLAYERS['Player'])
+
+
+@pytest.mark.parametrize("player, column", [(p, c) for p, values in EXPECTED.items() for c in values])
+def test_matches_hand_computed_value(stats, player, column):
+    assert float(stats.loc[player, column]) == pytest.approx(EXPECTED[player][column], rel=1e-5)
+
+
+def test_per_matches_row_by_row_formula(stats):
+    assert list(stats['PER']) == pytest.approx(reference_per(PLAYERS, TEAMS), rel=1e-5)
+
+
+def test_league_average_per_is_15(stats):
+    minutes = PLAYERS['MP'] * PLAYERS['G']
+    assert float((stats['PER'] * minutes.to_numpy()).sum() / minutes.sum()) == pytest.approx(15, rel=1e-5)
+
+
+def test_missing_team_totals_leave_metrics_empty():
+    # What load_data serves while the league page cannot be loaded
+    stats = advanced_stats(PLAYERS, team_context(pd.DataFrame()))
+    assert stats[['PER', 'USG%', 'PTS/100']].isna().all().all()
+    assert float(stats['TS%'].iloc[0]) == pytest.approx(EXPECTED['One']['TS%'], rel=1e-5)
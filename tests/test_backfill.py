@@ -0,0 +1,72 @@
+import io
+import os
+
+import pytest
+
+import nba_data
+import settings
+from backfill import backfill
+from bench.fixtures import season_pages
+from bench.standin import StandInServer
+from player_store import player_store
+from season_cache import SeasonCache
+from shared_dataset import shared_dataset
+
+
+SEASONS = [1955, 1985, 2023]
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    server = StandInServer().start()
+    monkeypatch.setattr(settings, "BASE_URL", server.base_url)
+    # An empty season cache and no memos, as on a fresh host
+    monkeypatch.setattr(nba_data, "season_cache", SeasonCache(str(tmp_path / "seasons")))
+    nba_data.clear_memos()
+    yield server
+    server.shutdown()
+
+
+def run(tmp_path, seasons=SEASONS, force=False):
+    out = io.StringIO()
+    failed = backfill(seasons, workers=2, rate=0, checkpoint_path=str(tmp_path / "checkpoint.json"), force=force, out=out)
+    return failed, out.getvalue()
+
+
+def test_ingests_every_season_once_and_publishes(server, tmp_path):
+    failed, _ = run(tmp_path)
+    assert failed == {}
+    assert server.snapshot() == {page: 1 for year in SEASONS for page in season_pages(year)}
+    assert set(SEASONS) <= set(player_store.seasons())
+    _, history = shared_dataset.snapshot()
+    assert set(SEASONS) <= set(history.column('Season').to_pylist())
+
+
+def test_resumes_from_the_checkpoint(server, tmp_path):
+    run(tmp_path, SEASONS[:1])
+    server.reset()
+    failed, output = run(tmp_path)
+    assert failed == {}
+    assert "Resuming: 1 season(s) already ingested" in output
+    assert set(server.snapshot()) == {page for year in SEASONS[1:] for page in season_pages(year)}
+
+
+def test_force_scrapes_cached_seasons_again(server, tmp_path):
+    run(tmp_path)
+    # Without --force a fresh checkpoint still finds every season in the season cache
+    os.remove(tmp_path / "checkpoint.json")
+    server.reset()
+    run(tmp_path)
+    assert server.snapshot() == {}
+    failed, _ = run(tmp_path, force=True)
+    assert failed == {}
+    assert server.snapshot() == {page: 1 for year in SEASONS for page in season_pages(year)}
+
+
+def test_a_missing_season_fails_without_being_checkpointed(server, tmp_path):
+    failed, _ = run(tmp_path, [1985, 1990])
+    assert list(failed) == [1990]
+    server.reset()
+    failed, output = run(tmp_path, [1985, 1990])
+    assert "Resuming: 1 season(s) already ingested" in output
+    assert list(failed) == [1990]
@@ -0,0 +1,10 @@
+import pytest
+
+from bench.import_budget import APP_BUDGET_MS, LANDING_BUDGET_MS, measure
+
+
+@pytest.mark.parametrize("stage, budget_ms", [("landing", LANDING_BUDGET_MS), ("app", APP_BUDGET_MS)])
+def test_stage_imports_within_budget(stage, budget_ms):
+    median, loaded = measure(stage, repeat=3)
+    assert loaded == []
+    assert median <= budget_ms
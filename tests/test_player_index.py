@@ -0,0 +1,39 @@
+import json
+
+import pandas as pd
+
+from player_index import PlayerIndex
+
+
+def season(*rows):
+    return pd.DataFrame(rows, columns=['Player', 'Tm', 'player_id'])
+
+
+def test_refreshed_season_is_indexed_again(tmp_path):
+    index = PlayerIndex(str(tmp_path / "index.json"))
+    index.add_season(2023, season(('John Smith', 'BOS', 'smithjo01')))
+    # The in-progress season is scraped again with a rookie in it and one player gone
+    index.add_season(2023, season(('Mike Jones', 'NYK', 'jonesmi01')))
+    assert index.lookup('Mike Jones', 2023) == 'jonesmi01'
+    assert index.lookup('John Smith', 2023) is None
+    # And it survives a restart
+    assert PlayerIndex(index.path).lookup('Mike Jones', 2023) == 'jonesmi01'
+
+
+def test_index_written_without_fingerprints_is_rebuilt(tmp_path):
+    path = tmp_path / "index.json"
+    path.write_text(json.dumps({"seasons": [2023], "players": {"John Smith": {"smithjo01": [2023]}}}))
+    index = PlayerIndex(str(path))
+    index.add_season(2023, season(('John Smith', 'BOS', 'smithjo01'), ('Mike Jones', 'NYK', 'jonesmi01')))
+    assert index.lookup('Mike Jones', 2023) == 'jonesmi01'
+
+
+def test_row_ids_tell_namesakes_apart(tmp_path):
+    index = PlayerIndex(str(tmp_path / "index.json"))
+    rows = season(('Marcus Thomas', 'BOS', 'thomama01'), ('Marcus Thomas', 'LAL', 'thomama02'),
+                  ('John Smith', 'BOS', 'smithjo01'), ('John Smith', 'NYK', 'smithjo01'))
+    index.add_season(2023, rows)
+    assert index.row_ids(rows, 'Marcus Thomas', 2023) == ['thomama01', 'thomama02']
+    assert index.row_ids(rows, 'John Smith', 2023) == ['smithjo01']
+    # Without ids on the rows the index answers
+    assert index.row_ids(rows.drop(columns=['player_id']), 'John Smith', 2023) == ['smithjo01']
@@ -0,0 +1,50 @@
+import threading
+
+from http_client import TokenBucket
+from singleflight import Cancelled
+
+
+class Job:
+    # A background request that never turns urgent
+    def __init__(self):
+        self.cancel = threading.Event()
+
+    def urgent(self):
+        return False
+
+    def cancelled(self):
+        return self.cancel.is_set()
+
+
+def in_background(bucket, job):
+    # A background request on its own thread; the event is set once it has its token
+    got = threading.Event()
+
+    def run():
+        try:
+            bucket.acquire(job)
+            got.set()
+        except Cancelled:
+            pass
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread, got
+
+
+def test_burst_below_two_is_raised():
+    assert TokenBucket(1.0, 1).burst == TokenBucket.MIN_BURST == 2
+
+
+def test_background_leaves_a_token_for_the_foreground():
+    bucket = TokenBucket(0.01, 1)
+    _, got = in_background(bucket, Job())
+    assert got.wait(1)
+    # The background request took one of the two tokens; the foreground one is served at once
+    assert bucket.acquire() == 0.0
+    # With the last token gone, the next background request keeps waiting
+    job = Job()
+    thread, got = in_background(bucket, job)
+    assert not got.wait(0.5)
+    job.cancel.set()
+    thread.join(1)
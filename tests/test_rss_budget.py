@@ -0,0 +1,6 @@
+from bench.rss_check import rss_growth
+
+
+def test_chart_cache_keeps_rss_flat():
+    # Three seasons' charts overflow the 2 MB cache, so renders and evictions keep alternating
+    assert rss_growth(reruns=300, seasons=3, warmup=100, report=lambda line: None) <= 15.0